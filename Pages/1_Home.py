@@ -1,35 +1,57 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import os
-
-# --- File Path ---
-MEETING_PATH = os.path.join("data", "processed", "Database", "Meeting_Table.csv")
-
-# --- Load Data ---
-def load_meeting_data():
-    try:
-        df = pd.read_csv(MEETING_PATH)
-    except Exception:
-        df = pd.DataFrame(columns=["Team Name", "Audit Level", "Point of discussion", "Severity (High/Low)", "Responsibility", "Target date", "Status (Done/Pending)", "Remarks"])
-    return df
+from datetime import date
+from logbook import aggregates, data, figures, search
 
 # --- Dashboard ---
 st.set_page_config(page_title="📊 Analytical Dashboard", layout="wide")
 st.title("📈 Interactive Analytical Dashboard")  # Removed duplicate main heading
 
-# Load data
-df_meeting = load_meeting_data()
+# --- Search across meeting and audit points ---
+query = st.text_input("🔎 Search meeting and audit points", placeholder="e.g. gas leak, scaffolding, Ravi")
+if query.strip():
+    hits = search.search(query)
+    if hits.empty:
+        st.info("No matching points found.")
+    else:
+        st.caption(f"Top {len(hits)} matches")
+        for hit in hits.itertuples(index=False):
+            where = " · ".join(str(v) for v in (hit.Area, hit.Department) if v)
+            st.markdown(f"**{'Audit' if hit.Source == 'audit' else 'Meeting'} #{hit[1]}** {where}  \n{hit.Match}")
+            if hit.Responsibility:
+                st.caption(f"Responsibility: {hit.Responsibility}")
 
 # --- Display all three charts: bar chart on left, two pie charts stacked on right ---
+# Figures are cached per process until the meeting table changes (logbook/figures.py)
 col1, col2 = st.columns([2, 1])
 
 # 1. Team Name-wise Meeting Count Bar Graph
+def team_chart():
+    team_counts = aggregates.meeting_counts("Team Name")
+    if team_counts.empty:
+        return None
+    team_counts.columns = ["Team Name", "Meeting Count"]
+    return px.bar(team_counts, x="Team Name", y="Meeting Count",title="Team Name-wise Meeting Count", color="Team Name")
+
+
+def status_chart():
+    status_counts = aggregates.meeting_counts("Status (Done/Pending)")
+    if status_counts.empty:
+        return None
+    return px.pie(status_counts, names="Status (Done/Pending)", values="Count",title="Meeting Status Distribution", height=300)
+
+
+def severity_chart():
+    severity_counts = aggregates.pending_severity_counts()
+    if severity_counts.empty:
+        return None
+    return px.pie(severity_counts, names="Severity (High/Low)", values="Count",title="Severity Distribution for Pending Meetings", height=300)
+
+
 with col1:
-    if not df_meeting.empty and "Team Name" in df_meeting.columns:
-        team_counts = df_meeting["Team Name"].value_counts().reset_index()
-        team_counts.columns = ["Team Name", "Meeting Count"]
-        fig1 = px.bar(team_counts, x="Team Name", y="Meeting Count",title="Team Name-wise Meeting Count", color="Team Name")
+    fig1 = figures.figure("home_team_meetings", ["meetings"], team_chart)
+    if fig1 is not None:
         st.plotly_chart(fig1, use_container_width=True)
     else:
         st.warning("No meeting data or 'Team Name' column not found.")
@@ -37,21 +59,16 @@ with col1:
 # 2 & 3. Pie Charts stacked vertically
 with col2:
     # Status Pie Chart
-    if not df_meeting.empty and "Status (Done/Pending)" in df_meeting.columns:
-        status_counts = df_meeting["Status (Done/Pending)"].value_counts().reset_index()
-        status_counts.columns = ["Status (Done/Pending)", "Count"]
-        fig2 = px.pie(status_counts, names="Status (Done/Pending)", values="Count",title="Meeting Status Distribution", height=300)
+    fig2 = figures.figure("home_meeting_status", ["meetings"], status_chart)
+    if fig2 is not None:
         st.plotly_chart(fig2, use_container_width=True)
     else:
         st.warning("No meeting data or 'Status (Done/Pending)' column not found.")
     st.markdown("<div style='margin-bottom: 10px;'></div>", unsafe_allow_html=True)  # Small gap
     # Severity Pie Chart for Pending Meetings
-    if not df_meeting.empty and "Status (Done/Pending)" in df_meeting.columns and "Severity (High/Low)" in df_meeting.columns:
-        pending_meetings = df_meeting[df_meeting["Status (Done/Pending)"].str.lower() == "pending"]
-        if not pending_meetings.empty:
-            severity_counts = pending_meetings["Severity (High/Low)"].value_counts().reset_index()
-            severity_counts.columns = ["Severity (High/Low)", "Count"]
-            fig3 = px.pie(severity_counts, names="Severity (High/Low)", values="Count",title="Severity Distribution for Pending Meetings", height=300)
+    if fig2 is not None:
+        fig3 = figures.figure("home_pending_severity", ["meetings"], severity_chart)
+        if fig3 is not None:
             st.plotly_chart(fig3, use_container_width=True)
         else:
             st.info("No pending meetings found.")
@@ -63,15 +80,10 @@ row_col1, row_col2 = st.columns(2)
 
 with row_col1:
     st.markdown('<span style="font-size:15px;font-weight:600;">Person-wise Responsibility Count</span>', unsafe_allow_html=True)
-    if not df_meeting.empty and "Team Name" in df_meeting.columns and "Target date" in df_meeting.columns and "Responsibility" in df_meeting.columns:
-        df_meeting["Target date"] = pd.to_datetime(df_meeting["Target date"], errors="coerce")
-        df_meeting = df_meeting.dropna(subset=["Target date"])  # Remove rows with invalid dates
-        df_meeting["Year"] = df_meeting["Target date"].apply(lambda x: x.year if x.month >= 4 else x.year - 1)
-        df_meeting["FY"] = df_meeting["Year"].astype(str) + "-" + (df_meeting["Year"]+1).astype(str)
-
-        team_options = sorted(df_meeting["Team Name"].dropna().unique())
-        fy_options = sorted(df_meeting["FY"].unique(), reverse=True)
-
+    team_options = aggregates.teams("meetings")
+    fy_options = aggregates.financial_years("meetings")
+    filtered = pd.DataFrame(columns=["Responsibility"])
+    if team_options and fy_options:
         filter_col1, filter_col2 = st.columns([1,1])
         with filter_col1:
             st.markdown('<span style="font-size:13px;font-weight:500;">Team Name</span>', unsafe_allow_html=True)
@@ -80,43 +92,48 @@ with row_col1:
             st.markdown('<span style="font-size:13px;font-weight:500;">Financial Year (April-March)</span>', unsafe_allow_html=True)
             selected_fy = st.selectbox(" ", fy_options, key="fy_select", label_visibility="collapsed")
 
-        filtered = df_meeting[(df_meeting["Team Name"] == selected_team) & (df_meeting["FY"] == selected_fy)]
+        # Counts come from the aggregate store; rows are only loaded for the per-person chart
+        filtered = data.view("meetings", columns=["Responsibility", "Target date", "Severity (High/Low)"], filters={"Team Name": selected_team, "FY": selected_fy})
 
-        # Group by Responsibility, count occurrences
-        resp_counts = filtered["Responsibility"].value_counts().reset_index()
-        resp_counts.columns = ["Responsibility", "Count"]
+        def responsibility_chart():
+            resp_counts = aggregates.responsibility_counts(selected_team, selected_fy)
+            return px.bar(resp_counts, x="Responsibility", y="Count", title=f"Person-wise Responsibility Count for {selected_team} ({selected_fy})")
 
-        fig_fy = px.bar(resp_counts, x="Responsibility", y="Count", title=f"Person-wise Responsibility Count for {selected_team} ({selected_fy})")
+        fig_fy = figures.figure("home_responsibility", ["meetings"], responsibility_chart, team=selected_team, fy=selected_fy)
         st.plotly_chart(fig_fy, use_container_width=True)
     else:
         st.info("Meeting data, Team Name, Responsibility, or Target date column not found.")
 
 with row_col2:
     st.markdown('<span style="font-size:15px;font-weight:600;">Pending Responsibility Count for Selected Person by Due Date (Stacked by Severity)</span>', unsafe_allow_html=True)
-    if not df_meeting.empty and "Target date" in df_meeting.columns and "Severity (High/Low)" in df_meeting.columns and "Responsibility" in df_meeting.columns and "Team Name" in df_meeting.columns:
+    if not filtered.empty:
         # Use the same selected_team and selected_fy as above
         person_options = sorted(filtered["Responsibility"].dropna().unique())
         if person_options:
             selected_person = st.selectbox("Select Responsible Person", person_options, key="pending_person_select")
-            pending_df = filtered[(filtered["Responsibility"] == selected_person) & (filtered["Target date"] > pd.Timestamp(pd.Timestamp.now().date()))].copy()
-            pending_df["Target date"] = pd.to_datetime(pending_df["Target date"], errors="coerce")
-            pending_df = pending_df.dropna(subset=["Target date"])  # Remove rows with invalid dates
-            pending_df["TargetDateStr"] = pending_df["Target date"].dt.strftime("%Y-%m-%d")
-            # Group by due date and severity for this person
-            stacked_counts = pending_df.groupby(["TargetDateStr", "Severity (High/Low)"]).size().reset_index(name="Count")
-            stacked_counts = stacked_counts.sort_values(["TargetDateStr", "Severity (High/Low)"])
-            import plotly.express as px
-            severity_color_map = {"Low": "#7ec8e3", "High": "#003366"}  # Low: light blue, High: dark blue
-            fig_stacked = px.bar(
-                stacked_counts,
-                x="TargetDateStr",
-                y="Count",
-                color="Severity (High/Low)",
-                barmode="stack",
-                title=f"Pending Responsibility Count for {selected_person} by Due Date ({selected_team}, {selected_fy}) (Stacked by Severity)",
-                color_discrete_map=severity_color_map
-            )
-            fig_stacked.update_xaxes(title="Pending Due Date")
+
+            def pending_chart():
+                pending_df = filtered[(filtered["Responsibility"] == selected_person) & (filtered["Target date"] > pd.Timestamp(pd.Timestamp.now().date()))].copy()
+                pending_df = pending_df.dropna(subset=["Target date"])  # Remove rows with invalid dates
+                pending_df["TargetDateStr"] = pending_df["Target date"].dt.strftime("%Y-%m-%d")
+                # Group by due date and severity for this person
+                stacked_counts = pending_df.groupby(["TargetDateStr", "Severity (High/Low)"]).size().reset_index(name="Count")
+                stacked_counts = stacked_counts.sort_values(["TargetDateStr", "Severity (High/Low)"])
+                severity_color_map = {"Low": "#7ec8e3", "High": "#003366"}  # Low: light blue, High: dark blue
+                fig = px.bar(
+                    stacked_counts,
+                    x="TargetDateStr",
+                    y="Count",
+                    color="Severity (High/Low)",
+                    barmode="stack",
+                    title=f"Pending Responsibility Count for {selected_person} by Due Date ({selected_team}, {selected_fy}) (Stacked by Severity)",
+                    color_discrete_map=severity_color_map
+                )
+                fig.update_xaxes(title="Pending Due Date")
+                return fig
+
+            # "Pending" is relative to today, so the day is part of the key
+            fig_stacked = figures.figure("home_pending_by_date", ["meetings"], pending_chart, team=selected_team, fy=selected_fy, person=selected_person, today=date.today())
             st.plotly_chart(fig_stacked, use_container_width=True)
         else:
             st.info("No responsible persons found for the selected team and year.")
@@ -124,24 +141,11 @@ with row_col2:
         st.info("No pending responsibilities with valid target dates, severity, or person found for stacked chart.")
 
 # --- Attendance Present Count by Member (Team & Year) ---
-import datetime
-ATTENDANCE_RECORDS_PATH = os.path.join("data", "processed", "Database", "attendance_records.csv")
-
 st.markdown('<span style="font-size:15px;font-weight:600;">Attendance Present Count by Member</span>', unsafe_allow_html=True)
-try:
-    att_df = pd.read_csv(ATTENDANCE_RECORDS_PATH)
-except Exception:
-    att_df = pd.DataFrame(columns=["Date", "Team Name", "Names", "Status"])
-
-if not att_df.empty and "Team Name" in att_df.columns and "Date" in att_df.columns and "Names" in att_df.columns and "Status" in att_df.columns:
-    att_df["Date"] = pd.to_datetime(att_df["Date"], errors="coerce")
-    att_df = att_df.dropna(subset=["Date"])  # Remove rows with invalid dates
-    att_df["Year"] = att_df["Date"].apply(lambda x: x.year if x.month >= 4 else x.year - 1)
-    att_df["FY"] = att_df["Year"].astype(str) + "-" + (att_df["Year"]+1).astype(str)
-
-    team_options_att = sorted(att_df["Team Name"].dropna().unique())
-    fy_options_att = sorted(att_df["FY"].unique(), reverse=True)
+team_options_att = aggregates.teams("attendance")
+fy_options_att = aggregates.financial_years("attendance")
 
+if team_options_att and fy_options_att:
     filter_col1_att, filter_col2_att = st.columns([1,1])
     with filter_col1_att:
         st.markdown('<span style="font-size:13px;font-weight:500;">Team Name</span>', unsafe_allow_html=True)
@@ -150,17 +154,11 @@ if not att_df.empty and "Team Name" in att_df.columns and "Date" in att_df.colum
         st.markdown('<span style="font-size:13px;font-weight:500;">Financial Year (April-March)</span>', unsafe_allow_html=True)
         selected_fy_att = st.selectbox(" ", fy_options_att, key="fy_select_att", label_visibility="collapsed")
 
-    filtered_att = att_df[(att_df["Team Name"] == selected_team_att) & (att_df["FY"] == selected_fy_att) & (att_df["Status"].str.lower() == "present")]
-
-    # Explode the 'Names' column to get one row per present member
-    filtered_att = filtered_att.copy()
-    filtered_att["Names"] = filtered_att["Names"].str.split(",")
-    exploded_att = filtered_att.explode("Names")
-    exploded_att["Names"] = exploded_att["Names"].str.strip()
-    present_counts = exploded_att["Names"].value_counts().reset_index()
-    present_counts.columns = ["Member Name", "Present Count"]
+    def present_chart():
+        present_counts = aggregates.present_counts(selected_team_att, selected_fy_att)
+        return px.bar(present_counts, x="Member Name", y="Present Count", title=f"Present Count by Member for {selected_team_att} ({selected_fy_att})")
 
-    fig_present = px.bar(present_counts, x="Member Name", y="Present Count", title=f"Present Count by Member for {selected_team_att} ({selected_fy_att})")
+    fig_present = figures.figure("home_present_counts", ["attendance", "members"], present_chart, team=selected_team_att, fy=selected_fy_att)
     st.plotly_chart(fig_present, use_container_width=True)
 else:
     st.info("Attendance records, Team Name, Date, or Names column not found for attendance present count graph.")
@@ -1,29 +1,15 @@
 import streamlit as st
-import pandas as pd
 import os
-from datetime import date
+from datetime import date, timedelta
 import pathlib
 import numpy as np
-
-# Paths
-meeting_path = r"E:\internship work\Zips\KFA GRT TF Logbook\data\processed\Database\Meeting_Table.csv"
-attendance_data_path = r"E:\internship work\Zips\KFA GRT TF Logbook\data\processed\Database\attendance_data.csv"
+from logbook import config, data, editing, schema
 
 # MoM CSV path (in script directory)
 mom_file = str(pathlib.Path(__file__).parent.resolve() / "data/mom_records.csv")
 
 # Load Data
-try:
-    meetings_df = pd.read_csv(meeting_path)
-except FileNotFoundError:
-    meetings_df = pd.DataFrame(columns=["Team Name", "Point of discussion", "Severity (High/Low)", "Responsibility", "Target date", "Status (Done/Pending)", "Remarks"])
-
-try:
-    attendance_df = pd.read_csv(attendance_data_path)
-    team_names = attendance_df["Team Name"].dropna().unique().tolist()
-except FileNotFoundError:
-    attendance_df = pd.DataFrame(columns=["Team Name", "Name"])
-    team_names = []
+team_names = data.distinct("members", "Team Name")
 
 # Page Config
 st.set_page_config(page_title="Meetings Tracker", layout="wide")
@@ -39,7 +25,7 @@ def add_meeting():
         with row1_col1:
             team_name = st.selectbox("Team Name", team_names)
         with row1_col2:
-            responsibility_names = attendance_df[attendance_df["Team Name"] == team_name]["Name"].dropna().unique().tolist()
+            responsibility_names = data.distinct("members", "Name", filters={"Team Name": team_name})
             responsibility = st.selectbox("Responsibility", responsibility_names)
 
         # Second row: Point of Discussion, Remarks
@@ -59,61 +45,91 @@ def add_meeting():
             status = st.selectbox("Status (Done/Pending)", ["Done", "Pending"])
 
         if st.button("Save Meeting"):
-            new_meeting = pd.DataFrame({
-                "Team Name": [team_name],
-                "Point of discussion": [point_of_discussion],
-                "Severity (High/Low)": [severity],
-                "Responsibility": [responsibility],
-                "Target date": [target_date],
-                "Status (Done/Pending)": [status],
-                "Remarks": [remarks]
-            })
-            updated_meetings_df = pd.concat([meetings_df, new_meeting], ignore_index=True)
-            updated_meetings_df.to_csv(meeting_path, index=False)
+            new_meeting = {
+                "Team Name": team_name,
+                "Point of discussion": point_of_discussion,
+                "Severity (High/Low)": severity,
+                "Responsibility": responsibility,
+                "Target date": target_date,
+                "Status (Done/Pending)": status,
+                "Remarks": remarks
+            }
+            data.append("meetings", [new_meeting])
             st.success(f"✅ Meeting added successfully!")
     st.markdown("</div>", unsafe_allow_html=True)
 
 # --- Function to View Meetings ---
+MEETING_VIEW_COLUMNS = ["Team Name", "Point of discussion", "Severity (High/Low)", "Responsibility", "Target date", "Status (Done/Pending)", "Remarks"]
+
 def view_meetings():
     st.subheader("📋 View Meetings")
-    status_filter = st.selectbox("Filter by Status", ["All", "Done", "Pending"])
+
+    # Filters and sort are applied by the data layer; only one page is rendered
+    f_col1, f_col2, f_col3, f_col4 = st.columns([2, 1, 1, 2])
+    with f_col1:
+        team_filter = st.selectbox("Filter by Team", ["All"] + team_names)
+    with f_col2:
+        status_filter = st.selectbox("Filter by Status", ["All", "Done", "Pending"])
+    with f_col3:
+        severity_filter = st.selectbox("Filter by Severity", ["All", "High", "Low"])
+    with f_col4:
+        date_filter = st.date_input("Target date between", value=(), key="meeting_date_filter")
+
+    s_col1, s_col2, s_col3, s_col4 = st.columns([2, 1, 1, 2])
+    with s_col1:
+        sort_by = st.selectbox("Sort by", MEETING_VIEW_COLUMNS, index=MEETING_VIEW_COLUMNS.index("Target date"))
+    with s_col2:
+        descending = st.checkbox("Descending", value=True)
+    with s_col3:
+        page_sizes = sorted({25, 50, 100, 200, config.PAGE_SIZE})
+        page_size = st.selectbox("Rows per page", page_sizes, index=page_sizes.index(config.PAGE_SIZE))
+
+    filters = {}
+    if team_filter != "All":
+        filters["Team Name"] = team_filter
     if status_filter != "All":
-        filtered_meetings = meetings_df[meetings_df["Status (Done/Pending)"] == status_filter].copy()
-    else:
-        filtered_meetings = meetings_df.copy()
-
-    # Editable Status column (Done/Pending) for each row
-    if not filtered_meetings.empty:
-        # Add header row
-        header_cols = st.columns([2,2,1.5,2,2,2,2])
-        header_cols[0].markdown('**Team Name**')
-        header_cols[1].markdown('**Point of discussion**')
-        header_cols[2].markdown('**Severity (High/Low)**')
-        header_cols[3].markdown('**Responsibility**')
-        header_cols[4].markdown('**Target date**')
-        header_cols[5].markdown('**Status (Done/Pending)**')
-        header_cols[6].markdown('**Remarks**')
-        edited_status = []
-        for idx, row in filtered_meetings.iterrows():
-            cols = st.columns([2,2,1.5,2,2,2,2])
-            cols[0].write(row["Team Name"])
-            cols[1].write(row["Point of discussion"])
-            cols[2].write(row["Severity (High/Low)"])
-            cols[3].write(row["Responsibility"])
-            cols[4].write(row["Target date"])
-            # Editable dropdown for status, no label
-            new_status = cols[5].selectbox(" ", ["Done", "Pending"], index=0 if row["Status (Done/Pending)"]=="Done" else 1, key=f"status_{idx}", label_visibility="collapsed")
-            edited_status.append(new_status)
-            cols[6].write(row["Remarks"])
-        if st.button("Save Status Changes"):
-            filtered_meetings["Status (Done/Pending)"] = edited_status
-            # Update the main DataFrame and save
-            for idx, new_stat in zip(filtered_meetings.index, edited_status):
-                meetings_df.at[idx, "Status (Done/Pending)"] = new_stat
-            meetings_df.to_csv(meeting_path, index=False)
-            st.success("Status updated!")
-    else:
+        filters["Status (Done/Pending)"] = status_filter
+    if severity_filter != "All":
+        filters["Severity (High/Low)"] = severity_filter
+    date_range = None
+    if len(date_filter) == 2:
+        date_range = ("Target date", date_filter[0].isoformat(), (date_filter[1] + timedelta(days=1)).isoformat())
+
+    _, total = data.page("meetings", filters, date_range, limit=1)
+    page_count = max((total - 1) // page_size + 1, 1)
+    with s_col4:
+        page_number = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+
+    page_df, total = data.page("meetings", filters, date_range, sort_by=sort_by, ascending=not descending, offset=(page_number - 1) * page_size, limit=page_size)
+
+    if page_df.empty:
         st.info("No meetings found for the selected filter.")
+        return
+
+    st.caption(f"Showing {len(page_df)} of {total} meetings")
+    # One editor per filtered page; edits are mapped to the Row IDs it showed when they began
+    editor = editing.editor_key(st.session_state, "meeting_status_editor", filters, date_range, sort_by, descending, page_size, page_number)
+    row_ids = editing.shown_keys(st.session_state, editor, page_df, "Row ID")
+    page_df = schema.editable(page_df[MEETING_VIEW_COLUMNS]).reset_index(drop=True)
+    # Only Status is editable; the grid renders the page lazily as one widget
+    st.data_editor(
+        page_df,
+        use_container_width=True,
+        hide_index=True,
+        disabled=[c for c in MEETING_VIEW_COLUMNS if c != "Status (Done/Pending)"],
+        column_config={
+            "Status (Done/Pending)": st.column_config.SelectboxColumn(options=["Done", "Pending"], required=True),
+            "Target date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+        },
+        key=editor
+    )
+    if st.button("Save Status Changes"):
+        # Send only the rows whose status changed, as one batch
+        edited = editing.change_set(row_ids, st.session_state.get(editor), "Row ID")["edited"]
+        changes = {row_id: {"Status (Done/Pending)": v["Status (Done/Pending)"]} for row_id, v in edited.items() if "Status (Done/Pending)" in v}
+        data.apply_changes("meetings", edited=changes)
+        editing.saved(st.session_state, "meeting_status_editor", editor)
+        st.success(f"Status updated for {len(changes)} meeting(s)!")
 
 # --- MoM Section ---
 st.header("Minutes of Meeting (MoM)")
@@ -128,19 +144,24 @@ if mom_mode == "Single Point":
 else:
     st.subheader("Edit Meeting Data (Multiple Point)")
     # Show meetings_df as editable table
+    meetings_df = schema.editable(data.load("meetings"))
+    # Edits are mapped to the Row IDs shown when they began
+    editor = editing.editor_key(st.session_state, "meeting_multi_editor")
+    shown_ids = editing.shown_keys(st.session_state, editor, meetings_df, "Row ID")
     editable_meetings = st.data_editor(
         meetings_df,
         num_rows="dynamic",
         use_container_width=True,
-        key="meeting_multi_editor"
+        key=editor,
+        column_config={
+            "Row ID": st.column_config.Column(disabled=True),
+            "Target date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+            "FY": st.column_config.Column(disabled=True, help="Derived from Target date on save")
+        }
     )
     if st.button("Save Changes to Meetings"):
-        editable_meetings.to_csv(meeting_path, index=False)
-        st.success("Meeting records updated!")
-
-# Robust date handling
-for col in ["Target date"]:
-    if col in meetings_df.columns:
-        # Try to parse dates, set errors to NaT, then convert to string in YYYY-MM-DD or empty
-        meetings_df[col] = pd.to_datetime(meetings_df[col], errors='coerce').dt.strftime('%Y-%m-%d')
-        meetings_df[col] = meetings_df[col].replace('NaT', '')
+        # Only the rows touched in the editor are written
+        changes = editing.change_set(shown_ids, st.session_state.get(editor), "Row ID", date_columns=["Target date"])
+        data.apply_changes("meetings", **changes)
+        editing.saved(st.session_state, "meeting_multi_editor", editor)
+        st.success(f"Meeting records updated! ({editing.summary(changes)})")
@@ -1,33 +1,17 @@
 import streamlit as st
 import pandas as pd
 from datetime import date
-import os
-import pathlib
+from logbook import aggregates, attendance as attendance_store, auth, data, editing, schema
 
 st.title("Attendance Marking System")
 
-# Use the provided CSV file
-file_path = "E:\internship work\Zips\KFA GRT TF Logbook\data\processed\Database\\attendance_data.csv"
-
-# Get the directory of mom.py
-mom_file = os.path.join("data", "mom_records.csv")  # Path for future MoM records
-att_file = "E:\\internship work\\Zips\\KFA GRT TF Logbook\\data\\processed\\Database\\attendance_records.csv"  # Attendance records remain as before
-
-if not os.path.exists(file_path):
-    st.error(f"File {file_path} not found. Please make sure it exists in the app directory.")
-    st.stop()
-
-# Read the data
+# Read the member master table (Department is renamed to Team Name on load)
 try:
-    df = pd.read_csv(file_path)
+    df = attendance_store.members()
 except Exception as e:
-    st.error(f"Error reading CSV file: {e}")
+    st.error(f"Error reading member table: {e}")
     st.stop()
 
-# Rename Department column to Team Name for consistency
-if "Department" in df.columns:
-    df = df.rename(columns={"Department": "Team Name"})
-
 # Check required columns
 if not {"Team Name", "Name"}.issubset(df.columns):
     st.error("CSV file must have 'Team Name' and 'Name' columns.")
@@ -64,18 +48,11 @@ with attendance_tab:
                 "Names": ", ".join(absent_names),
                 "Status": "Absent"
             })
-        att_df = pd.DataFrame(records)
-        columns = ["Date", "Team Name", "Names", "Status"]
-        if os.path.exists(att_file):
-            old_att = pd.read_csv(att_file)
-            att_df = pd.concat([old_att, att_df], ignore_index=True)
-            att_df = att_df[columns]
-        else:
-            att_df = att_df[columns]
-        att_df.to_csv(att_file, index=False)
+        # Stored as one row per member; the joined summary is only for display
+        attendance_store.mark(today, selected_team, attendance)
         st.success("Attendance saved!")
         st.write("Today's Attendance:")
-        st.dataframe(att_df)
+        st.dataframe(pd.DataFrame(records, columns=attendance_store.LEGACY_COLUMNS))
 
 with add_member_tab:
     st.subheader("📝 View & Edit Attendance Master Table")
@@ -83,23 +60,41 @@ with add_member_tab:
     # Ensure 'Password' column exists
     if "Password" not in df.columns:
         df["Password"] = ""
+    # Passwords are stored as hashes and never shown; older plaintext ones are hashed here
+    if auth.hash_member_passwords():
+        df = attendance_store.members()
 
-    st.markdown("You can edit the Team Name, Name, or Password directly in the table below:")
+    st.markdown("You can edit the Team Name or Name directly in the table below:")
 
+    # Edits are mapped to the Member IDs shown when they began
+    editor = editing.editor_key(st.session_state, "attendance_editor")
+    shown_ids = editing.shown_keys(st.session_state, editor, df, "Member ID")
     edited_df = st.data_editor(
-        df,
+        schema.editable(df),
         num_rows="dynamic",  # Allows adding/removing rows
         use_container_width=True,
-        key="attendance_editor"
+        key=editor,
+        column_config={"Member ID": st.column_config.Column(disabled=True), "Password": None}
     )
 
     if st.button("💾 Save Changes to Attendance Master"):
         try:
-            edited_df.to_csv(file_path, index=False)
+            # New rows get the next free Member ID; existing IDs never change
+            changes = editing.change_set(shown_ids, st.session_state.get(editor), "Member ID")
+            data.apply_changes("members", **changes)
+            editing.saved(st.session_state, "attendance_editor", editor)
             st.success("✅ Changes saved to attendance master file.")
         except Exception as e:
             st.error(f"❌ Failed to save changes: {e}")
 
+    with st.expander("🔑 Set member password"):
+        with st.form("member_password"):
+            member = st.selectbox("Member", df["Member ID"].tolist(), format_func=lambda m: " — ".join(map(str, df.loc[df["Member ID"] == m, ["Team Name", "Name"]].iloc[0])))
+            new_password = st.text_input("New password", type="password")
+            if st.form_submit_button("Set password") and new_password:
+                data.apply_changes("members", edited={int(member): {"Password": auth.hash_password(new_password)}})
+                st.success("✅ Password updated.")
+
 
 with view_record_tab:
     st.subheader("📋 View Attendance Records")
@@ -116,11 +111,49 @@ with view_record_tab:
         </style>
     """, unsafe_allow_html=True)
 
-    if os.path.exists(att_file):
-        att_df = pd.read_csv(att_file)
-        if not att_df.empty:
-            st.dataframe(att_df, use_container_width=True, height=600)
-        else:
-            st.info("No attendance records found.")
+    # Matrices are pivoted from the per-member log for one team and FY
+    v_col1, v_col2 = st.columns(2)
+    with v_col1:
+        view_team = st.selectbox("Team Name", sorted(df["Team Name"].dropna().unique()), key="attendance_view_team")
+    with v_col2:
+        fy_options = aggregates.financial_years("attendance")
+        view_fy = st.selectbox("Financial Year (April-March)", fy_options, key="attendance_view_fy") if fy_options else None
+
+    if view_fy is None:
+        st.info("No attendance records found. Please mark attendance first.")
     else:
-        st.info("Attendance records file does not exist. Please mark attendance first.")
\ No newline at end of file
+        matrix_tab, monthly_tab, records_tab = st.tabs(["Member × Date", "Monthly %", "Records"])
+        with matrix_tab:
+            matrix = attendance_store.wide(view_team, view_fy)
+            if matrix.empty:
+                st.info(f"No attendance recorded for {view_team} in {view_fy}.")
+            else:
+                st.dataframe(matrix, use_container_width=True, height=600)
+                csv = matrix.to_csv().encode("utf-8")
+                st.download_button("⬇️ Download Member × Date CSV", csv, f"attendance_{view_team}_{view_fy}.csv", "text/csv")
+        with monthly_tab:
+            monthly = attendance_store.monthly_percentages(view_team, view_fy)
+            if monthly.empty:
+                st.info(f"No attendance recorded for {view_team} in {view_fy}.")
+            else:
+                st.dataframe(monthly, use_container_width=True)
+        with records_tab:
+            att_df = attendance_store.legacy_records()
+            if not att_df.empty:
+                st.dataframe(att_df, use_container_width=True, height=600)
+                csv = att_df.to_csv(index=False).encode("utf-8")
+                st.download_button("⬇️ Download Attendance Records CSV", csv, "attendance_records.csv", "text/csv")
+            else:
+                st.info("No attendance records found. Please mark attendance first.")
+
+    # A wide sheet (Date + one column per member, e.g. Attendance_Table.xlsx) is converted into the log
+    with st.expander("📥 Import a Date × Member attendance sheet"):
+        import_team = st.selectbox("Record under team", sorted(df["Team Name"].dropna().unique()), key="attendance_import_team")
+        uploaded = st.file_uploader("Attendance sheet", type=["xlsx", "csv"], key="attendance_import_file")
+        if uploaded is not None and st.button("Import attendance"):
+            try:
+                wide_df = pd.read_csv(uploaded) if uploaded.name.lower().endswith(".csv") else pd.read_excel(uploaded)
+                added = attendance_store.import_wide(wide_df, import_team)
+                st.success(f"✅ Imported {added} attendance marks.")
+            except Exception as e:
+                st.error(f"❌ Failed to import attendance: {e}")
\ No newline at end of file
@@ -1,110 +1,145 @@
 import streamlit as st
 import pandas as pd
-import os
-from datetime import datetime
+import plotly.express as px
+from datetime import date
+from logbook import alerts, calibration, data, due, editing, figures, schema
 
 # Set the layout to wide to maximize table width
 st.set_page_config(layout="wide")
 
 st.title("Equipment Management")
+alerts.start()
 
-tab1, tab2 = st.tabs(["Analytics", "Equipment Details"])
+tab1, tab2, tab3 = st.tabs(["Analytics", "Equipment Details", "Calibration History"])
 
 with tab2:
     st.header("Equipment Data Editor")
-    # Define path to CSV
-    csv_path = r"E:\internship work\Zips\KFA GRT TF Logbook\data\processed\Database\equipment_data.csv"
-
     # Load data
-    try:
-        df = pd.read_csv(csv_path)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=["SN", "Equipment name", "Previous Test date", "Test date ", "Due date"])
-
-    # Convert date columns to datetime for compatibility with DateColumn
-    for col in ["Previous Test date", "Test date ", "Due date"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
+    # Date columns load as datetime64, as DateColumn expects
+    df = schema.editable(data.load("equipment"))
 
     # Column configuration
     column_config = {
-        "SN": st.column_config.Column(disabled=True),
-        "Equipment name": st.column_config.Column(disabled=True),
-        "Previous Test date": st.column_config.DateColumn("Previous Test date", format="YYYY-MM-DD", help="Enter the date in YYYY-MM-DD format (e.g., 2024-07-01)"),
-        "Test date ": st.column_config.DateColumn("Test date", format="YYYY-MM-DD", help="Enter the date in YYYY-MM-DD format (e.g., 2024-07-01)"),
-        "Due date": st.column_config.DateColumn("Due date", format="YYYY-MM-DD", help="Enter the date in YYYY-MM-DD format (e.g., 2024-07-01)")
+        "Row ID": st.column_config.Column(disabled=True),
+        # Test dates move only through calibration.record(), so the calibration log stays complete
+        "Previous Test date": st.column_config.DateColumn("Previous Test date", format="YYYY-MM-DD", disabled=True),
+        "Test date ": st.column_config.DateColumn("Test date", format="YYYY-MM-DD", disabled=True),
+        "Due date": st.column_config.DateColumn("Due date", format="YYYY-MM-DD", disabled=True)
     }
 
-    st.info("For 'Previous Test date', 'Test date', and 'Due date', enter the date in DD-MM-YYYY format (e.g., 01-07-2025). and Save the Changes to update.")
+    st.info("Add or rename equipment here. Test and due dates are updated by recording a calibration in the Calibration History tab.")
 
     # Save button in top right
     save_col1, save_col2 = st.columns([8,1])
     with save_col2:
         save_clicked = st.button("Save Changes", key="save_changes_top")
 
-    # Display editable table
+    # Display editable table; edits are mapped to the Row IDs shown when they began
+    editor = editing.editor_key(st.session_state, "equipment_editor")
+    shown_ids = editing.shown_keys(st.session_state, editor, df, "Row ID")
     edited_df = st.data_editor(
         df,
         num_rows="dynamic",
         use_container_width=True,
-        key="equipment_editor",
+        key=editor,
         column_config=column_config,
         height=700  # Adjust height for larger table display
     )
 
     # Save logic
     if save_clicked:
-        # Convert date columns to string in YYYY-MM-DD before saving
-        for col in ["Previous Test date", "Test date ", "Due date"]:
-            if col in edited_df.columns:
-                edited_df[col] = pd.to_datetime(edited_df[col], errors='coerce').dt.strftime('%Y-%m-%d')
-                edited_df[col] = edited_df[col].replace('NaT', '')
-        edited_df.to_csv(csv_path, index=False)
-        st.success("Equipment data updated!")
+        # Write only the edited rows
+        changes = editing.change_set(shown_ids, st.session_state.get(editor), "Row ID")
+        data.apply_changes("equipment", **changes)
+        editing.saved(st.session_state, "equipment_editor", editor)
+        st.success(f"Equipment data updated! ({editing.summary(changes)})")
 
 with tab1:
     st.header("Equipment Analytics")
-    csv_path = r"E:\internship work\Zips\KFA GRT TF Logbook\data\processed\Database\equipment_data.csv"
-    try:
-        df = pd.read_csv(csv_path)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=["SN", "Equipment name", "Previous Test date", "Test date ", "Due date"])
+    df = data.view("equipment", columns=["Due date"])
 
     # Only keep rows with valid due dates
-    df["Due date"] = pd.to_datetime(df["Due date"], errors='coerce')
     df = df.dropna(subset=["Due date"])
 
     if not df.empty:
-        import plotly.express as px
-        col1, col2 = st.columns(2)
-        with col1:
-            # --- Month-Year Bar Chart ---
-            df["MonthYear"] = df["Due date"].dt.strftime("%b %Y")
-            monthyear_counts = df["MonthYear"].value_counts().sort_index()
+        def month_chart():
+            monthyear_counts = due.month_counts(df["Due date"])
             monthyear_df = pd.DataFrame({"MonthYear": monthyear_counts.index, "Equipment Count": monthyear_counts.values})
             fig = px.bar(monthyear_df, x="MonthYear", y="Equipment Count", title="Month-Year wise Equipment Due Count", text=monthyear_df['Equipment Count'], color="Equipment Count", color_continuous_scale="YlGnBu")
             fig.update_traces(textfont_size=40, texttemplate='%{text:.0f}')
-            st.plotly_chart(fig, use_container_width=True)
-        with col2:
-            # --- Urgent/Incoming/Expired Bar Chart ---
-            today = pd.Timestamp(datetime.now().date())
-            df["DaysToDue"] = (df["Due date"] - today).dt.days
-            def due_category(days):
-                if days < 0:
-                    return "Expired"
-                elif days <= 10:
-                    return "Urgent"
-                elif days <= 30:
-                    return "Incoming"
-                else:
-                    return "Other"
-            df["DueCategory"] = df["DaysToDue"].apply(due_category)
-            # Only keep Urgent, Incoming, Expired for the chart
-            cat_counts = df["DueCategory"].value_counts().reindex(["Urgent", "Incoming", "Expired"], fill_value=0)
+            return fig
+
+        def status_chart():
+            cat_counts = due.status_counts(df["Due date"])
             cat_df = pd.DataFrame({"Category": cat_counts.index, "Equipment Count": cat_counts.values})
             color_map = {"Incoming": "green", "Urgent": "orange", "Expired": "red"}
             fig2 = px.bar(cat_df, x="Category", y="Equipment Count", title="Equipment Due Status (Urgent / Incoming / Expired)", text=cat_df['Equipment Count'], color="Category", color_discrete_map=color_map)
             fig2.update_traces(textfont_size=40, texttemplate='%{text:.0f}')
-            st.plotly_chart(fig2, use_container_width=True)
+            return fig2
+
+        # Cached until the equipment table changes (logbook/figures.py)
+        col1, col2 = st.columns(2)
+        with col1:
+            # --- Month-Year Bar Chart (in date order) ---
+            st.plotly_chart(figures.figure("equipment_due_months", ["equipment"], month_chart), use_container_width=True)
+        with col2:
+            # --- Urgent/Incoming/Expired Bar Chart (statuses move with the date) ---
+            st.plotly_chart(figures.figure("equipment_due_status", ["equipment"], status_chart, today=date.today()), use_container_width=True)
+
+        # --- Due in the next N days ---
+        days = st.number_input("Show equipment due in the next N days", min_value=0, value=due.INCOMING_DAYS, step=1)
+        row_ids = due.due_within(due.table_index("equipment", key="Row ID"), days)
+        upcoming = data.load("equipment", filters={"Row ID": row_ids.tolist()}).sort_values("Due date")
+        st.dataframe(upcoming, use_container_width=True, hide_index=True)
     else:
         st.info("No equipment with valid due dates found for analytics.")
+
+with tab3:
+    st.header("Calibration History")
+    calibration.seed()
+    equipment = calibration.summary()
+
+    if equipment.empty:
+        st.info("No equipment found. Add equipment in the Equipment Details tab first.")
+    else:
+        st.dataframe(equipment[["SN", "Equipment name", "Test date ", "Due date", "Calibrations", "Last meeting"]], use_container_width=True, hide_index=True, height=300)
+
+        labels = {row["SN"]: f"{row['SN']} - {row['Equipment name']}" for row in equipment[["SN", "Equipment name"]].to_dict("records")}
+        selected_sn = st.selectbox("Equipment", list(labels), format_func=labels.get)
+
+        # One slice of the sorted calibration log; linked meetings are looked up by Row ID
+        history = calibration.timeline(selected_sn)
+        if history.empty:
+            st.info("No calibrations recorded for this equipment yet.")
+        else:
+            def timeline_chart():
+                chart = history.assign(Equipment=labels[selected_sn], **{"Valid until": history["Due date"].fillna(history["Test date"])})
+                fig = px.timeline(chart, x_start="Test date", x_end="Valid until", y="Equipment", hover_data=["Meeting_ID", "Remarks"], title=f"Calibration timeline: {labels[selected_sn]}")
+                fig.update_yaxes(visible=False)
+                return fig
+
+            fig = figures.figure("equipment_calibrations", ["calibrations", "equipment"], timeline_chart, sn=selected_sn)
+            st.plotly_chart(fig, use_container_width=True)
+
+            points = calibration.meetings(history["Meeting_ID"].dropna().tolist()).rename(columns={"Row ID": "Meeting_ID", "Target date": "Meeting target date"})
+            points["Meeting_ID"] = pd.to_numeric(points["Meeting_ID"], errors="coerce")
+            shown = history.drop(columns=["Row ID", "SN"]).assign(Meeting_ID=pd.to_numeric(history["Meeting_ID"], errors="coerce"))
+            shown = shown.merge(points, how="left", on="Meeting_ID")
+            st.dataframe(shown.sort_values("Test date", ascending=False), use_container_width=True, hide_index=True)
+
+        # --- Record a calibration ---
+        with st.form("calibration_form"):
+            st.subheader("Record a calibration")
+            c1, c2 = st.columns(2)
+            with c1:
+                test_date = st.date_input("Test date", value=date.today())
+                due_date = st.date_input("Due date", value=date.today())
+            with c2:
+                meeting_options = calibration.meetings().sort_values("Target date", ascending=False)
+                meeting_labels = {None: "No linked meeting"}
+                meeting_labels.update({int(r["Row ID"]): f"#{int(r['Row ID'])} {r['Team Name']}: {str(r['Point of discussion'])[:60]}" for r in meeting_options.to_dict("records")})
+                meeting_id = st.selectbox("Raised in meeting", list(meeting_labels), format_func=meeting_labels.get)
+                remarks = st.text_input("Remarks")
+            if st.form_submit_button("Save calibration"):
+                calibration.record(selected_sn, test_date, due_date, meeting_id=meeting_id, remarks=remarks)
+                st.success(f"Calibration recorded for {labels[selected_sn]}.")
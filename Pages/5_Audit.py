@@ -1,27 +1,28 @@
 import streamlit as st
-import pandas as pd
-import os
 from datetime import date
+from logbook import aggregates, config, data
 
-CSV_FILE = "data/processed/Database/audit_data.csv"
 AUDIT_LEVELS = ["L1", "L2", "L3", "Monthly Audit"]
+SECTION_TITLES = {"L1": "L1 Audit", "L2": "L2 Audit", "L3": "L3 Audit", "Monthly Audit": "Monthly Audit"}
 
 st.set_page_config(page_title="Audit Entry & Records", layout="wide")
 st.title("Audit Entry & Records")
 
-# Load data
-if os.path.exists(CSV_FILE):
-    df = pd.read_csv(CSV_FILE)
-else:
-    df = pd.DataFrame(columns=[
-        "Audit Level", "Point", "Area", "Department", "Responsibility", "Target date", "Status (Done/Pending)", "Remarks"
-    ])
+# --- Sections: Add Audit Entry, then one per level ---
+# Only the selected section runs, so a level's rows are read only when it is opened
+level_counts = aggregates.audit_level_counts().set_index("Audit Level")
 
-# --- Tabs: Add Audit Entry, L1, L2, L3, Monthly ---
-tab_add, tab_l1, tab_l2, tab_l3, tab_monthly = st.tabs(["Add Audit Entry", "L1 Audit", "L2 Audit", "L3 Audit", "Monthly Audit"])
+def section_label(section):
+    title = SECTION_TITLES.get(section, section)
+    if section not in level_counts.index:
+        return title
+    counts = level_counts.loc[section]
+    return f"{title} ({counts['Pending']} pending, {counts['Overdue']} overdue)"
 
-# --- Audit Entry Form in Add Audit Entry Tab ---
-with tab_add:
+section = st.radio("Section", ["Add Audit Entry"] + AUDIT_LEVELS, format_func=section_label, horizontal=True, label_visibility="collapsed")
+
+# --- Audit Entry Form ---
+if section == "Add Audit Entry":
     st.header("Add New Audit Entry")
     with st.form("audit_entry_form"):
         col1, col2 = st.columns(2)
@@ -37,7 +38,7 @@ with tab_add:
             responsibility = st.text_input("Responsibility")
         submitted = st.form_submit_button("Submit Entry")
         if submitted:
-            new_row = pd.DataFrame([{
+            new_row = {
                 "Audit Level": audit_level,
                 "Point": point,
                 "Area": area,
@@ -46,24 +47,48 @@ with tab_add:
                 "Target date": target_date,
                 "Status (Done/Pending)": status,
                 "Remarks": remarks
-            }])
-            df = pd.concat([df, new_row], ignore_index=True)
-            df.to_csv(CSV_FILE, index=False)
+            }
+            data.append("audit", [new_row])
             st.success("Audit entry added!")
 
-# --- Tabs to Show Data by Audit Level ---
+# --- One Audit Level, a page at a time ---
+AUDIT_VIEW_COLUMNS = ["Point", "Area", "Department", "Responsibility", "Target date", "Status (Done/Pending)", "Remarks"]
+
 def show_audit_table(audit_level):
-    filtered = df[df["Audit Level"] == audit_level]
-    if not filtered.empty:
-        st.dataframe(filtered, use_container_width=True)
-    else:
+    if audit_level in level_counts.index:
+        counts = level_counts.loc[audit_level]
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Points", int(counts["Points"]))
+        m2.metric("Pending", int(counts["Pending"]))
+        m3.metric("Overdue", int(counts["Overdue"]))
+
+    f_col1, f_col2, f_col3, f_col4 = st.columns([1, 1, 1, 1])
+    with f_col1:
+        fy_filter = st.selectbox("Financial Year", ["All"] + aggregates.audit_financial_years(audit_level), key=f"audit_fy_{audit_level}")
+    with f_col2:
+        status_filter = st.selectbox("Status", ["All", "Done", "Pending"], key=f"audit_status_{audit_level}")
+    with f_col3:
+        page_sizes = sorted({25, 50, 100, 200, config.PAGE_SIZE})
+        page_size = st.selectbox("Rows per page", page_sizes, index=page_sizes.index(config.PAGE_SIZE), key=f"audit_page_size_{audit_level}")
+
+    # The level (and FY) pick the partition files; nothing else is read
+    filters = {"Audit Level": audit_level}
+    if fy_filter != "All":
+        filters["FY"] = fy_filter
+    if status_filter != "All":
+        filters["Status (Done/Pending)"] = status_filter
+
+    _, total = data.page("audit", filters, limit=1)
+    page_count = max((total - 1) // page_size + 1, 1)
+    with f_col4:
+        page_number = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1, key=f"audit_page_{audit_level}")
+
+    page_df, total = data.page("audit", filters, sort_by="Target date", offset=(page_number - 1) * page_size, limit=page_size)
+    if page_df.empty:
         st.info(f"No records found for {audit_level}.")
+        return
+    st.caption(f"Showing {len(page_df)} of {total} points")
+    st.dataframe(page_df[AUDIT_VIEW_COLUMNS], use_container_width=True, hide_index=True)
 
-with tab_l1:
-    show_audit_table("L1")
-with tab_l2:
-    show_audit_table("L2")
-with tab_l3:
-    show_audit_table("L3")
-with tab_monthly:
-    show_audit_table("Monthly Audit")
+if section in AUDIT_LEVELS:
+    show_audit_table(section)
@@ -5,24 +5,20 @@ import base64
 from datetime import date
 from pathlib import Path
 import urllib.parse
+from logbook import alerts, certificates, config, data, due, figures
 
 # Constants
-CSV_FILE = "data/processed/Database/entrant_attendant_data.csv"
-UPLOAD_DIR = "certificates"
+UPLOAD_DIR = config.CERTIFICATE_DIR
 
 st.set_page_config(page_title="Entrant Attendant Card Form", layout="wide")
 st.title("Entrant Attendant Card Management")
+alerts.start()
 
 # Ensure upload directory exists
 Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 
 # Load existing data
-if os.path.exists(CSV_FILE):
-    df = pd.read_csv(CSV_FILE)
-else:
-    df = pd.DataFrame(columns=[
-        "SN", "Name", "Role", "Training date", "Due date", "Agency", "Certificate File Name", "Certificate Link"
-    ])
+df = data.load("training")
 
 # Tabs
 tab1, tab2, tab_analytics = st.tabs(["➕ Add Entry", "📋 View Records", "📊 Analytics"])
@@ -30,21 +26,29 @@ tab1, tab2, tab_analytics = st.tabs(["➕ Add Entry", "📋 View Records", "📊
 # ========== Analytics Tab ==========
 with tab_analytics:
     st.subheader("Month-wise Training Due Date Count")
-    if not df.empty and "Due date" in df.columns:
-        df["Due date"] = pd.to_datetime(df["Due date"], errors="coerce")
-        df_valid = df.dropna(subset=["Due date"])
-        if not df_valid.empty:
-            df_valid["MonthYear"] = df_valid["Due date"].dt.strftime("%b %Y")
-            monthyear_counts = df_valid["MonthYear"].value_counts().sort_index()
+    due_dates = data.view("training", columns=["Due date"])["Due date"].dropna()
+    if not due_dates.empty:
+        import plotly.express as px
+
+        def month_chart():
+            monthyear_counts = due.month_counts(due_dates)
             monthyear_df = pd.DataFrame({"MonthYear": monthyear_counts.index, "Due Count": monthyear_counts.values})
-            import plotly.express as px
             fig = px.bar(monthyear_df, x="MonthYear", y="Due Count", title="Month-wise Training Due Date Count", text=monthyear_df['Due Count'], color="Due Count", color_continuous_scale="Blues")
             fig.update_traces(textfont_size=20, texttemplate='%{text:.0f}')
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No valid due dates found for analytics.")
+            return fig
+
+        # Cached until the training table changes (logbook/figures.py)
+        st.plotly_chart(figures.figure("training_due_months", ["training"], month_chart), use_container_width=True)
+
+        status_counts = due.status_counts(due_dates)
+        st.caption(" | ".join(f"{status}: {count}" for status, count in status_counts.items()))
+
+        days = st.number_input("Show trainings due in the next N days", min_value=0, value=due.INCOMING_DAYS, step=1)
+        sns = due.due_within(due.table_index("training", key="SN"), days)
+        upcoming = data.load("training", filters={"SN": sns.tolist()}).sort_values("Due date")
+        st.dataframe(upcoming.drop(columns=["Certificate Link", "Certificate SHA256"], errors="ignore"), use_container_width=True, hide_index=True)
     else:
-        st.info("No data or 'Due date' column not found.")
+        st.info("No valid due dates found for analytics.")
 
 # ========== Tab 1 ==========
 with tab1:
@@ -70,9 +74,6 @@ with tab1:
 
         if submitted:
             if name and training_cert:
-                # Auto-generated SN
-                new_sn = len(df) + 1
-
                 # Clean and create custom filename
                 extension = os.path.splitext(training_cert.name)[-1]
                 safe_name = name.replace(" ", "_")
@@ -81,26 +82,26 @@ with tab1:
                 safe_due = str(due_date).replace("-", "")  # Format as YYYYMMDD
                 new_filename = f"{safe_name}_{safe_role}_{safe_due}_{safe_agency}{extension}"
 
-                # Save file
-                cert_path = os.path.join(UPLOAD_DIR, new_filename)
-                with open(cert_path, "wb") as f:
-                    f.write(training_cert.read())
+                # Save file (content-addressed: identical uploads share one copy)
+                cert_sha, cert_path, _ = certificates.store(training_cert)
 
-                # Prepare data
-                cert_link = f"{UPLOAD_DIR}/{urllib.parse.quote(new_filename)}"
-                new_row = pd.DataFrame([{
-                    "SN": new_sn,
+                # Prepare data; SN is assigned under the table's write lock
+                cert_link = urllib.parse.quote(cert_path.replace("\\", "/"))
+                new_row = {
                     "Name": name,
                     "Role": role,
                     "Training date": training_date,
                     "Due date": due_date,
                     "Agency": agency,
                     "Certificate File Name": new_filename,
-                    "Certificate Link": cert_link
-                }])
-
-                df = pd.concat([df, new_row], ignore_index=True)
-                df.to_csv(CSV_FILE, index=False)
+                    "Certificate Link": cert_link,
+                    "Certificate SHA256": cert_sha
+                }
+
+                # The certificate is referenced under the SN data.append() assigns
+                new_row = data.append("training", [new_row])[0]
+                new_sn = new_row["SN"]
+                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
                 st.success(f"Entry added with SN: {new_sn}")
             else:
                 st.error("Please complete all required fields and upload a certificate.")
@@ -112,49 +113,36 @@ with tab2:
     if df.empty:
         st.info("No records found.")
     else:
-        # Ensure 'Certificate Link' exists
-        if "Certificate Link" not in df.columns:
-            df["Certificate Link"] = df["Certificate File Name"].apply(
-                lambda x: os.path.join(UPLOAD_DIR, x).replace("\\", "/") if pd.notna(x) else ""
-            )
-
         st.markdown("### All Entries")
 
-        # Display headers
-        header_cols = st.columns([1, 2, 2, 2, 2, 2, 3])
-        header_cols[0].markdown("**SN**")
-        header_cols[1].markdown("**Name**")
-        header_cols[2].markdown("**Role**")
-        header_cols[3].markdown("**Training Date**")
-        header_cols[4].markdown("**Due Date**")
-        header_cols[5].markdown("**Agency**")
-        header_cols[6].markdown("**Download Certificate**")
-
-        # Show each row in a horizontal layout
-        for i, row in df.iterrows():
-            cols = st.columns([1, 2, 2, 2, 2, 2, 3])
-            cols[0].write(row["SN"])
-            cols[1].write(row["Name"])
-            cols[2].write(row["Role"])
-            cols[3].write(row["Training date"])
-            cols[4].write(row["Due date"])
-            cols[5].write(row["Agency"])
-
-            cert_path = row["Certificate Link"]
-            # Only check if cert_path is a valid string and not NaN/float
-            if isinstance(cert_path, str) and cert_path and os.path.exists(cert_path):
-                with open(cert_path, "rb") as file:
-                    file_data = file.read()
-                    file_name = os.path.basename(cert_path)
-                    cols[6].download_button(
+        # Metadata only; certificate files are read when a download is requested
+        st.dataframe(df.drop(columns=["Certificate Link", "Certificate SHA256"], errors="ignore"), use_container_width=True, hide_index=True)
+
+        st.markdown("### Download Certificate")
+        with_files = certificates.records_with_files(df)
+        if with_files.empty:
+            st.info("No certificates uploaded yet.")
+        else:
+            records = with_files.to_dict("records")
+            choice = st.selectbox("Select record", range(len(records)), format_func=lambda i: certificates.option_label(records[i]), key="certificate_choice")
+            if st.button("📄 Prepare download", key="certificate_prepare"):
+                st.session_state["certificate_ready"] = choice
+            if st.session_state.get("certificate_ready") == choice:
+                record = records[choice]
+                cert_path = certificates.path_for(record.get("Certificate Link"), record.get("Certificate File Name"), record.get("Certificate SHA256"))
+                if cert_path:
+                    download_name = record.get("Certificate File Name")
+                    if not isinstance(download_name, str) or not download_name:
+                        download_name = os.path.basename(cert_path)
+                    st.download_button(
                         label="📄 Click here to download",
-                        data=file_data,
-                        file_name=file_name,
-                        mime="application/octet-stream",
-                        key=f"download_{i}"
+                        data=certificates.read(cert_path),
+                        file_name=download_name,
+                        mime=certificates.mime_type(download_name),
+                        key="certificate_download"
                     )
-            else:
-                cols[6].warning("File not found")
+                else:
+                    st.warning("File not found")
 
         # Allow downloading the full CSV
         csv = df.to_csv(index=False).encode("utf-8")
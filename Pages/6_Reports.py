@@ -0,0 +1,53 @@
+import streamlit as st
+from logbook import data, reports
+
+st.set_page_config(page_title="Reports", layout="wide")
+st.title("Reports")
+
+# Reports render in worker processes; finished files are cached until the data changes
+jobs = st.session_state.setdefault("report_jobs", [])
+
+with st.form("report_form"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        report = st.selectbox("Report", list(reports.REPORTS), format_func=lambda r: reports.REPORTS[r][0])
+    with col2:
+        fmt = st.selectbox("Format", reports.formats(), format_func=lambda f: {"xlsx": "Excel", "csv": "CSV (zip)", "pdf": "PDF"}[f])
+    with col3:
+        fy_options = ["All"] + data.financial_years("meetings")
+        fy = st.selectbox("Financial Year (meetings and attendance)", fy_options)
+    submitted = st.form_submit_button("Generate Report")
+
+if submitted:
+    params = {"fy": fy} if reports.REPORTS[report][3] and fy != "All" else {}
+    job_id = reports.submit(report, fmt, params)
+    if job_id in jobs:
+        jobs.remove(job_id)
+    jobs.insert(0, job_id)
+
+st.subheader("Generated Reports")
+if not jobs:
+    st.info("No reports generated in this session yet.")
+else:
+    st.button("🔄 Refresh status")
+    for job_id in jobs:
+        job = reports.job(job_id)
+        if job is None:
+            continue
+        state, error = reports.status(job_id)
+        title = reports.REPORTS[job["report"]][0]
+        fy_note = f" ({job['params']['fy']})" if job["params"].get("fy") else ""
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.markdown(f"**{title}**{fy_note} · {job['format'].upper()} · {state}")
+            if error:
+                st.error(error)
+        with col2:
+            if state == "done":
+                st.download_button(
+                    "⬇️ Download",
+                    data=reports.read(job_id),
+                    file_name=reports.file_name(job_id),
+                    mime=reports.MIME_TYPES[job["format"]],
+                    key=f"download_{job_id}"
+                )
@@ -0,0 +1,84 @@
+import os
+import streamlit as st
+from logbook import auth, config, settings
+
+st.set_page_config(page_title="Settings", layout="wide")
+st.title("Settings")
+
+# Admins only, once any users exist
+if not auth.allowed(st.session_state, "Admin"):
+    st.warning("Sign in as an Admin on the home page to change settings.")
+    st.stop()
+
+# Pick up changes saved by another server process
+settings.refresh()
+current = settings.current()
+
+st.caption(f"Stored in {os.path.abspath(config.SETTINGS_PATH)}. Saved changes apply to every page without a restart.")
+
+with st.form("settings_form"):
+    st.subheader("Storage")
+    data_dir = st.text_input("Data folder", current["data_dir"], help="Folder holding the logbook tables")
+    backend = st.radio(
+        "Storage backend",
+        settings.BACKENDS,
+        index=settings.BACKENDS.index(current["backend"]),
+        horizontal=True,
+        format_func=lambda b: {"csv": "CSV/Excel files", "sqlite": "SQLite database"}[b],
+    )
+    if os.environ.get("LOGBOOK_BACKEND"):
+        st.info(f"The LOGBOOK_BACKEND environment variable ({os.environ['LOGBOOK_BACKEND']}) overrides this on startup.")
+
+    st.subheader("Tables and caches")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        page_size = st.number_input("Rows per page", *settings.LIMITS["page_size"], value=current["page_size"], step=10)
+    with col2:
+        table_cache_entries = st.number_input("Cached tables per process", *settings.LIMITS["table_cache_entries"], value=current["table_cache_entries"])
+    with col3:
+        certificate_cache_mb = st.number_input("Certificate cache (MB)", *settings.LIMITS["certificate_cache_mb"], value=current["certificate_cache_mb"])
+    with col4:
+        figure_cache_mb = st.number_input("Chart cache (MB)", *settings.LIMITS["figure_cache_mb"], value=current["figure_cache_mb"])
+
+    st.subheader("Background work")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        mirror_refresh_seconds = st.number_input("Excel mirror check (seconds)", *settings.LIMITS["mirror_refresh_seconds"], value=current["mirror_refresh_seconds"])
+    with col2:
+        alert_check_seconds = st.number_input("Due-date alert check (seconds)", *settings.LIMITS["alert_check_seconds"], value=current["alert_check_seconds"])
+    with col3:
+        report_workers = st.number_input("Report worker processes", *settings.LIMITS["report_workers"], value=min(current["report_workers"], settings.LIMITS["report_workers"][1]))
+
+    st.subheader("Sign-in")
+    password_iterations = st.number_input(
+        "Password hash iterations",
+        *settings.LIMITS["password_iterations"],
+        value=current["password_iterations"],
+        step=50000,
+        help="PBKDF2 work factor for new passwords; stored ones are upgraded at their user's next sign-in",
+    )
+
+    col_save, col_reset = st.columns([1, 8])
+    with col_save:
+        save_clicked = st.form_submit_button("💾 Save")
+    with col_reset:
+        reset_clicked = st.form_submit_button("Reset to defaults")
+
+if save_clicked or reset_clicked:
+    values = dict(config.DEFAULT_SETTINGS) if reset_clicked else {
+        "data_dir": data_dir.strip(),
+        "backend": backend,
+        "page_size": page_size,
+        "table_cache_entries": table_cache_entries,
+        "certificate_cache_mb": certificate_cache_mb,
+        "figure_cache_mb": figure_cache_mb,
+        "mirror_refresh_seconds": mirror_refresh_seconds,
+        "alert_check_seconds": alert_check_seconds,
+        "report_workers": report_workers,
+        "password_iterations": password_iterations,
+    }
+    try:
+        settings.save(values)
+        st.success("Settings saved.")
+    except ValueError as e:
+        st.error(f"Not saved: {e}")
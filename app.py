@@ -1,5 +1,28 @@
 import streamlit as st
 import os
+from logbook import alerts, auth, settings
+
+# Settings saved by another server process since this one loaded them
+settings.refresh()
+# Due-date alert digests are written to the outbox in the background
+alerts.start()
+
+# Sign-in (users and password hashes: logbook/auth.py)
+with st.sidebar:
+    user = auth.current_user(st.session_state)
+    if user is not None:
+        st.write(f"Signed in as **{user['name'] or user['user_id']}** ({user['role']})")
+        if st.button("Sign out"):
+            auth.logout(st.session_state)
+            st.rerun()
+    elif auth.has_users():
+        with st.form("sign_in"):
+            identifier = st.text_input("Name, User ID or email")
+            password = st.text_input("Password", type="password")
+            if st.form_submit_button("Sign in"):
+                if auth.login(st.session_state, identifier, password):
+                    st.rerun()
+                st.error("Unknown user or wrong password.")
 
 # Display the banner image at the top, full width
 if os.path.exists('landing/banner3.png'):
@@ -0,0 +1,255 @@
+import json
+import threading
+
+import pandas as pd
+
+from logbook import cache, config, fy, locking
+
+# Dashboard counts kept up to date on every write instead of being
+# recomputed from the full history on every rerun. The store is a JSON file
+# of nested count dicts:
+#
+#   meetings:   team, status, pending_severity, team_fy[team][fy],
+#               responsibility[team][fy][person]
+#   attendance: days[member id][fy], present[member id][fy]  (member-days)
+#   audit:      level[level], level_fy[level][fy],
+#               pending[level][target date]  (overdue = pending dated before today)
+#
+# Attendance is counted by Member ID and resolved to Team Name / Name when
+# read, so renaming a member or moving them to another team needs no
+# recount.
+#
+# data.append() and data.apply_changes() feed rows in through update(). A
+# table file changed outside the app (different mtime/size than the one
+# recorded) is rebuilt the next time its counts are read.
+TABLES = ("meetings", "attendance", "audit")
+VERSION = 2  # bumped when the shape of the counts changes; older entries are rebuilt
+
+_store = None
+_store_signature = None
+_lock = threading.RLock()
+
+
+# --- Helpers ---
+def _bump(d, keys, n=1):
+    # Counts that reach zero are removed, and so are the dicts they leave
+    # empty, so the counts match a rebuild
+    path = []
+    for key in keys[:-1]:
+        path.append((d, key))
+        d = d.setdefault(key, {})
+    d[keys[-1]] = d.get(keys[-1], 0) + n
+    if d[keys[-1]] <= 0:
+        del d[keys[-1]]
+        for parent, key in reversed(path):
+            if parent[key]:
+                break
+            del parent[key]
+
+
+def _text(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return str(value).strip()
+
+
+def _fy(row, source):
+    # Rows written through data carry FY already; derive it for anything else
+    value = _text(row.get("FY"))
+    return value if value else fy.of(row.get(source))
+
+
+def _source_signature(table):
+    if config.BACKEND == "sqlite":
+        return None  # only this app writes the database
+    from logbook import data
+
+    return [list(s) for s in data.source_signature(table)]
+
+
+# --- Per-row updates ---
+def _add_meeting(agg, row, n=1):
+    team = _text(row.get("Team Name"))
+    status = _text(row.get("Status (Done/Pending)"))
+    severity = _text(row.get("Severity (High/Low)"))
+    person = _text(row.get("Responsibility"))
+    fy_label = _fy(row, "Target date")
+    if team:
+        _bump(agg, ["team", team], n)
+    if status:
+        _bump(agg, ["status", status], n)
+        if status.lower() == "pending" and severity:
+            _bump(agg, ["pending_severity", severity], n)
+    if team and fy_label:
+        _bump(agg, ["team_fy", team, fy_label], n)
+        if person:
+            _bump(agg, ["responsibility", team, fy_label, person], n)
+
+
+def _add_attendance(agg, row, n=1):
+    member_id = pd.to_numeric(row.get("Member ID"), errors="coerce")
+    fy_label = _fy(row, "Date")
+    if pd.isna(member_id) or not fy_label:
+        return
+    member = str(int(member_id))  # JSON object keys are strings
+    _bump(agg, ["days", member, fy_label], n)
+    if (_text(row.get("Status")) or "").lower() == "present":
+        _bump(agg, ["present", member, fy_label], n)
+
+
+def _add_audit(agg, row, n=1):
+    level = _text(row.get("Audit Level"))
+    if not level:
+        return
+    _bump(agg, ["level", level], n)
+    fy_label = _fy(row, "Target date")
+    if fy_label:
+        _bump(agg, ["level_fy", level, fy_label], n)
+    if (_text(row.get("Status (Done/Pending)")) or "").lower() == "pending":
+        target = pd.to_datetime(row.get("Target date"), errors="coerce")
+        _bump(agg, ["pending", level, "" if pd.isna(target) else target.date().isoformat()], n)
+
+
+_ADDERS = {"meetings": _add_meeting, "attendance": _add_attendance, "audit": _add_audit}
+
+
+# --- Store ---
+# Writers in any process hold the store's file lock while they re-read,
+# change and replace it, so their updates don't overwrite each other.
+def _load():
+    """The store, re-read whenever another process has replaced the file."""
+    global _store, _store_signature
+    signature = cache.signature([config.AGGREGATES_PATH])
+    if _store is None or signature != _store_signature:
+        try:
+            with open(config.AGGREGATES_PATH, encoding="utf-8") as f:
+                _store = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _store = {}
+        _store_signature = signature
+    return _store
+
+
+def _persist():
+    global _store_signature
+    locking.write_text(config.AGGREGATES_PATH, json.dumps(_store))
+    _store_signature = cache.signature([config.AGGREGATES_PATH])
+
+
+def rebuild(table):
+    from logbook import data
+
+    if table == "attendance":
+        from logbook import attendance
+
+        # Before taking the locks: it may write the attendance tables
+        attendance.migrate_legacy()
+    add = _ADDERS[table]
+    with _lock, locking.lock(config.AGGREGATES_PATH):
+        source = _source_signature(table)
+        agg = {}
+        for row in data.load(table).to_dict("records"):
+            add(agg, row)
+        _load()[table] = {"source": source, "counts": agg, "version": VERSION}
+        _persist()
+        return agg
+
+
+def update(table, rows, removed=()):
+    """Fold written rows into the stored counts; removed rows (deleted, or
+    the previous version of edited ones) are subtracted."""
+    if table not in _ADDERS:
+        return
+    add = _ADDERS[table]
+    with _lock, locking.lock(config.AGGREGATES_PATH):
+        store = _load()
+        if store.get(table, {}).get("version") == VERSION:
+            agg = store[table]["counts"]
+            for row in removed:
+                add(agg, row, n=-1)
+            for row in rows:
+                add(agg, row)
+            store[table]["source"] = _source_signature(table)
+            _persist()
+            return
+    rebuild(table)  # the new rows are already on disk
+
+
+def counts(table):
+    """Current counts for a table, rebuilding them if the source changed."""
+    with _lock:
+        entry = _load().get(table)
+        if entry is not None and entry.get("version") == VERSION and entry["source"] == _source_signature(table):
+            return entry["counts"]
+    return rebuild(table)
+
+
+# --- Dashboard reads ---
+def _frame(d, label, value="Count"):
+    df = pd.DataFrame(list(d.items()), columns=[label, value])
+    return df.sort_values(value, ascending=False, kind="stable").reset_index(drop=True)
+
+
+def meeting_counts(column):
+    key = {"Team Name": "team", "Status (Done/Pending)": "status"}[column]
+    return _frame(counts("meetings").get(key, {}), column)
+
+
+def pending_severity_counts():
+    return _frame(counts("meetings").get("pending_severity", {}), "Severity (High/Low)")
+
+
+def _by_team(key):
+    # Attendance counts per member id -> [team][fy][member name], through
+    # the member table as it is now
+    from logbook import attendance
+
+    lookup = attendance.member_lookup()
+    out = {}
+    for member_id, by_fy in counts("attendance").get(key, {}).items():
+        team, name = lookup.get(int(member_id), (None, None))
+        if not _text(team):
+            continue
+        for fy_label, n in by_fy.items():
+            _bump(out, [team, fy_label, name], n)
+    return out
+
+
+def _team_fy(table):
+    if table == "attendance":
+        return _by_team("days")
+    return counts(table).get("team_fy", {})
+
+
+def teams(table):
+    return sorted(_team_fy(table))
+
+
+def financial_years(table):
+    years = {fy for by_fy in _team_fy(table).values() for fy in by_fy}
+    return sorted(years, reverse=True)
+
+
+def responsibility_counts(team, fy):
+    return _frame(counts("meetings").get("responsibility", {}).get(team, {}).get(fy, {}), "Responsibility")
+
+
+def present_counts(team, fy):
+    d = _by_team("present").get(team, {}).get(fy, {})
+    return _frame(d, "Member Name", "Present Count")
+
+
+def audit_level_counts(today=None):
+    """Points, Pending and Overdue (pending with a target date before today) per audit level."""
+    agg = counts("audit")
+    today = pd.Timestamp(today if today is not None else pd.Timestamp.now()).date().isoformat()
+    rows = []
+    for level, points in agg.get("level", {}).items():
+        pending = agg.get("pending", {}).get(level, {})
+        overdue = sum(n for target, n in pending.items() if target and target < today)
+        rows.append({"Audit Level": level, "Points": points, "Pending": sum(pending.values()), "Overdue": overdue})
+    return pd.DataFrame(rows, columns=["Audit Level", "Points", "Pending", "Overdue"])
+
+
+def audit_financial_years(level):
+    return sorted(counts("audit").get("level_fy", {}).get(level, {}), reverse=True)
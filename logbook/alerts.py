@@ -0,0 +1,185 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from logbook import config, locking
+
+# Due-date alerts for equipment tests and training renewals, written as
+# digests to OUTBOX_DIR; nothing is sent anywhere.
+#
+# Each row with a due date has one pending alert in a heap ordered by the
+# time it fires: Incoming INCOMING_DAYS before the date, Urgent URGENT_DAYS
+# before it, Expired the day after. When an alert fires the row's next stage
+# is pushed. data.append()/apply_changes() pass written rows to update(), so
+# a change costs one heap push instead of a rescan; entries made stale by an
+# edit or delete are skipped when they reach the top of the heap.
+#
+# One scheduler thread per process, and only the process holding the
+# outbox lock writes digests. The last stage alerted for each row is kept in
+# state.json so restarts don't repeat alerts.
+WATCHED = {
+    # table -> (key column, due date column, label column)
+    "equipment": ("Row ID", "Due date", "Equipment name"),
+    "training": ("SN", "Due date", "Name"),
+}
+STAGES = [("Incoming", config.INCOMING_DAYS), ("Urgent", config.URGENT_DAYS), ("Expired", -1)]
+
+_heap = []  # (fires_at, table, key, due ISO date, stage index)
+_current = {}  # (table, key) -> (due ISO date, label)
+_state = {}  # "table:key" -> [due ISO date, last stage alerted]
+log = logging.getLogger(__name__)
+_lock = threading.Lock()
+_wake = threading.Event()
+_reload = threading.Event()
+_thread = None
+
+
+def _state_path():
+    return os.path.join(config.OUTBOX_DIR, "state.json")
+
+
+# --- Queue ---
+def _fires_at(due_iso, stage):
+    return pd.Timestamp(due_iso) - pd.Timedelta(days=STAGES[stage][1])
+
+
+def _sent_stage(table, key, due_iso):
+    sent = _state.get(f"{table}:{key}")
+    return sent[1] if sent and sent[0] == due_iso else -1
+
+
+def _push(table, key, due_iso, label):
+    # Caller holds _lock
+    _current[(table, key)] = (due_iso, label)
+    stage = _sent_stage(table, key, due_iso) + 1
+    if stage < len(STAGES):
+        heapq.heappush(_heap, (_fires_at(due_iso, stage), table, str(key), due_iso, stage))
+
+
+def _row_entry(table, row):
+    key_col, due_col, label_col = WATCHED[table]
+    key, due_date = row.get(key_col), pd.to_datetime(row.get(due_col), errors="coerce")
+    if key is None or pd.isna(key):
+        return None
+    key = str(int(key)) if isinstance(key, float) and key.is_integer() else str(key)
+    return key, (None if pd.isna(due_date) else due_date.date().isoformat()), row.get(label_col)
+
+
+def update(table, rows=(), deleted=()):
+    """Queue written rows and drop deleted keys (no-op until start())."""
+    if table not in WATCHED or _thread is None:
+        return
+    with _lock:
+        for key in deleted:
+            _current.pop((table, str(key)), None)
+        for row in rows:
+            entry = _row_entry(table, row)
+            if entry is None:
+                continue
+            key, due_iso, label = entry
+            if due_iso is None:
+                _current.pop((table, key), None)
+            elif _current.get((table, key), (None,))[0] != due_iso:
+                _push(table, key, due_iso, label)
+            else:
+                _current[(table, key)] = (due_iso, label)
+    _wake.set()
+
+
+def reload():
+    """Rebuild the queue from the tables (after a whole table was replaced or
+    the data folder changed)."""
+    _reload.set()
+    _wake.set()
+
+
+def _load_all():
+    from logbook import data
+
+    with _lock:
+        _heap.clear()
+        _current.clear()
+    for table, (key_col, due_col, label_col) in WATCHED.items():
+        rows = data.view(table, columns=[key_col, due_col, label_col]).to_dict("records")
+        update(table, rows)
+
+
+def _due_alerts(now):
+    """Pop every alert that has fired; returns the digest items."""
+    items = []
+    with _lock:
+        while _heap and _heap[0][0] <= now:
+            _, table, key, due_iso, stage = heapq.heappop(_heap)
+            current = _current.get((table, key))
+            if current is None or current[0] != due_iso or stage <= _sent_stage(table, key, due_iso):
+                continue  # edited, deleted or already alerted
+            # Catching up (e.g. after downtime): report only the latest stage
+            while stage + 1 < len(STAGES) and _fires_at(due_iso, stage + 1) <= now:
+                stage += 1
+            _state[f"{table}:{key}"] = [due_iso, stage]
+            items.append({"table": table, "key": key, "label": None if pd.isna(current[1]) else str(current[1]), "due": due_iso, "status": STAGES[stage][0]})
+            _push(table, key, due_iso, current[1])
+    return items
+
+
+# --- Outbox ---
+def _load_state():
+    global _state
+    try:
+        with open(_state_path(), encoding="utf-8") as f:
+            _state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        _state = {}
+
+
+def write_digest(items, now):
+    """Write one digest file to the outbox; returns its path."""
+    path = os.path.join(config.OUTBOX_DIR, f"digest-{now:%Y%m%d-%H%M%S}.json")
+    digest = {"created": now.isoformat(timespec="seconds"), "alerts": sorted(items, key=lambda i: (i["due"], i["table"], i["key"]))}
+    locking.write_text(path, json.dumps(digest, indent=1))
+    with _lock:
+        locking.write_text(_state_path(), json.dumps(_state))
+    return path
+
+
+def check(now=None):
+    """Fire everything that is due; returns the digest path, if one was written."""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+    items = _due_alerts(now)
+    return write_digest(items, now) if items else None
+
+
+# --- Scheduler ---
+def _run(interval=None):
+    while True:
+        try:
+            os.makedirs(config.OUTBOX_DIR, exist_ok=True)
+            # Whoever holds the lock is the one process writing digests
+            with locking.lock(os.path.join(config.OUTBOX_DIR, "scheduler"), timeout=0.1):
+                _reload.clear()
+                _load_state()
+                _load_all()
+                while not _reload.is_set():
+                    _wake.clear()
+                    check()
+                    _wake.wait(interval or config.ALERT_CHECK_SECONDS)
+        except TimeoutError:
+            time.sleep(interval or config.ALERT_CHECK_SECONDS)  # another process is scheduling; take over if it stops
+        except Exception:
+            # e.g. a table mid-replace; start over with a fresh queue
+            log.exception("Due-date alert check failed; retrying in 60 seconds")
+            time.sleep(60)
+
+
+def start(interval=None):
+    """Start the scheduler thread once per process."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(interval,), daemon=True, name="logbook-alerts")
+            _thread.start()
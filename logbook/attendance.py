@@ -0,0 +1,205 @@
+import os
+import threading
+
+import pandas as pd
+
+from logbook import config, data, locking, storage
+
+# Attendance is stored one row per member per day: Date, Member ID, Status.
+# Member IDs are small integers assigned in the member master table
+# (attendance_data.csv), which holds the Team Name / Name for each ID.
+# The old attendance_records.csv layout (one row per date/team/status with
+# comma-joined Names) is migrated on first use and can still be produced
+# for display and export with legacy_records().
+#
+# The log is the only stored format. Wide sheets (Date x one column per
+# member, like Attendance_Table.xlsx) are converted into it by import_wide();
+# the member-by-date matrix and monthly attendance % per member are pivoted
+# from it on demand and cached per (team, FY) until the log or the member
+# table changes.
+MEMBER_ID = "Member ID"
+LEGACY_FILE = "attendance_records.csv"
+LEGACY_COLUMNS = ["Date", "Team Name", "Names", "Status"]
+# Cell values of a wide sheet; anything else (blank included) isn't recorded
+WIDE_VALUES = {
+    **dict.fromkeys(["p", "present", "yes", "y", "1", "1.0", "true"], "Present"),
+    **dict.fromkeys(["a", "absent", "no", "n", "0", "0.0", "false"], "Absent"),
+}
+
+_pivots = {}  # (kind, team, fy) -> (source signatures, DataFrame)
+_pivot_lock = threading.Lock()
+
+
+# --- Members ---
+def members():
+    """The member master table; IDs are written to the file on first use."""
+    data.ensure_columns("members")
+    df = data.load("members")
+    if "Department" in df.columns:
+        df = df.rename(columns={"Department": "Team Name"})
+    df[MEMBER_ID] = df[MEMBER_ID].astype(int)
+    return df
+
+
+def member_lookup():
+    """Member ID -> (Team Name, Name)."""
+    df = members()
+    return dict(zip(df[MEMBER_ID], zip(df["Team Name"], df["Name"])))
+
+
+def member_ids(team, names):
+    """{name: Member ID} for names in a team; names the master table
+    doesn't have yet are added to it."""
+    with locking.lock(config.table_path("members")):
+        master = members()
+        ids = dict(zip(master.loc[master["Team Name"] == team, "Name"], master.loc[master["Team Name"] == team, MEMBER_ID]))
+        new = [name for name in dict.fromkeys(names) if name not in ids]
+        if new:
+            data.append("members", [{"Team Name": team, "Name": name} for name in new])
+            master = members()
+            ids = dict(zip(master.loc[master["Team Name"] == team, "Name"], master.loc[master["Team Name"] == team, MEMBER_ID]))
+    return {name: int(ids[name]) for name in names if name in ids}
+
+
+# --- Migration from the comma-joined layout ---
+def legacy_path():
+    return os.path.join(config.DATA_DIR, LEGACY_FILE)
+
+
+def migrate_legacy():
+    """Convert attendance_records.csv into the per-member log, once.
+
+    Names that aren't in the master table are added to it under the team
+    they were recorded with, so every old row maps to an ID.
+    """
+    if not os.path.exists(legacy_path()) or data.exists("attendance"):
+        return 0
+    with locking.lock(config.table_path("attendance")):
+        if data.exists("attendance"):
+            return 0  # another process migrated it while we waited
+        legacy = storage.read_table(legacy_path())
+        legacy = legacy.assign(Name=legacy["Names"].fillna("").str.split(",")).explode("Name")
+        legacy["Name"] = legacy["Name"].str.strip()
+        legacy = legacy[legacy["Name"] != ""]
+
+        master = members()
+        known = master[["Team Name", "Name"]].assign(known=True)
+        new = legacy[["Team Name", "Name"]].drop_duplicates().merge(known, how="left", on=["Team Name", "Name"])
+        new = new[new["known"].isna()].drop(columns="known")
+        if not new.empty:
+            data.append("members", new.to_dict("records"))
+            master = members()
+
+        rows = legacy.merge(master[[MEMBER_ID, "Team Name", "Name"]], on=["Team Name", "Name"])
+        rows = rows[["Date", MEMBER_ID, "Status"]]
+        data.append("attendance", rows.to_dict("records"))
+        return len(rows)
+
+
+# --- Reads / writes ---
+def mark(day, team, present_by_name):
+    """Record one day's attendance for a team from {name: is_present}."""
+    migrate_legacy()
+    master = members()
+    ids = dict(zip(master.loc[master["Team Name"] == team, "Name"], master.loc[master["Team Name"] == team, MEMBER_ID]))
+    rows = [
+        {"Date": day, MEMBER_ID: ids[name], "Status": "Present" if present else "Absent"}
+        for name, present in present_by_name.items()
+        if name in ids
+    ]
+    data.append("attendance", rows)
+    return rows
+
+
+def load_long(filters=None, date_range=None):
+    """Attendance rows joined with the member table: Date, Member ID, Team Name, Name, Status."""
+    migrate_legacy()
+    log = data.load("attendance", filters=filters, date_range=date_range)
+    master = members()[[MEMBER_ID, "Team Name", "Name"]]
+    log[MEMBER_ID] = pd.to_numeric(log[MEMBER_ID], errors="coerce")
+    return log.merge(master, on=MEMBER_ID, how="left")[["Date", MEMBER_ID, "Team Name", "Name", "Status"]]
+
+
+def legacy_records(long_df=None):
+    """The old Date/Team Name/Names/Status shape, for display and export."""
+    if long_df is None:
+        long_df = load_long()
+    if long_df.empty:
+        return pd.DataFrame(columns=LEGACY_COLUMNS)
+    long_df = long_df.dropna(subset=["Name"])
+    long_df = long_df.assign(Date=pd.to_datetime(long_df["Date"]).dt.strftime("%Y-%m-%d"), Name=long_df["Name"].astype(str))
+    # observed=True: only the combinations that occur, not every category product
+    grouped = long_df.groupby(["Date", "Team Name", "Status"], sort=False, observed=True)["Name"]
+    out = grouped.agg(", ".join).reset_index().rename(columns={"Name": "Names"})
+    return out[LEGACY_COLUMNS]
+
+
+# --- Wide matrices ---
+def import_wide(df, team, date_column="Date"):
+    """Record a wide sheet (one row per date, one column per member of team)
+    in the log. Members missing from the master table are added; days a
+    member already has recorded are left as they are. Returns the rows added."""
+    migrate_legacy()
+    names = [c for c in df.columns if c != date_column and not str(c).startswith("Unnamed")]
+    long_df = df.melt(id_vars=[date_column], value_vars=names, var_name="Name", value_name="Status")
+    long_df["Date"] = pd.to_datetime(long_df[date_column], errors="coerce").dt.normalize()
+    long_df["Status"] = long_df["Status"].astype(str).str.strip().str.lower().map(WIDE_VALUES)
+    long_df = long_df.dropna(subset=["Date", "Status"])
+    if long_df.empty:
+        return 0
+    ids = member_ids(team, [str(n) for n in names])
+    long_df[MEMBER_ID] = long_df["Name"].astype(str).map(ids)
+    with locking.lock(config.table_path("attendance")):
+        start, end = long_df["Date"].min(), long_df["Date"].max() + pd.Timedelta(days=1)
+        date_range = ("Date", start.date().isoformat(), end.date().isoformat())
+        recorded = data.load("attendance", filters={MEMBER_ID: list(ids.values())}, date_range=date_range, columns=["Date", MEMBER_ID])
+        recorded = recorded.assign(**{MEMBER_ID: pd.to_numeric(recorded[MEMBER_ID], errors="coerce"), "recorded": True})
+        new = long_df.merge(recorded.drop_duplicates(["Date", MEMBER_ID]), how="left", on=["Date", MEMBER_ID])
+        rows = new[new["recorded"].isna()].drop_duplicates(["Date", MEMBER_ID], keep="last")[["Date", MEMBER_ID, "Status"]]
+        data.append("attendance", rows.to_dict("records"))
+    return len(rows)
+
+
+def _team_log(team, fy):
+    master = members()
+    ids = master.loc[master["Team Name"] == team, MEMBER_ID].tolist()
+    log = load_long(filters={MEMBER_ID: ids, "FY": fy})
+    # A day marked twice counts once, as its last mark
+    return log.dropna(subset=["Date", "Name"]).drop_duplicates(["Date", MEMBER_ID], keep="last")
+
+
+def _pivot(kind, team, fy, build):
+    source = (data.source_signature("attendance"), data.source_signature("members"))
+    with _pivot_lock:
+        entry = _pivots.get((kind, team, fy))
+        if entry is not None and entry[0] == source:
+            return entry[1].copy()
+    log = _team_log(team, fy)
+    df = build(log) if not log.empty else pd.DataFrame()
+    with _pivot_lock:
+        _pivots[(kind, team, fy)] = (source, df)
+    return df.copy()
+
+
+def wide(team, fy):
+    """Member-by-date matrix of "P"/"A" marks (blank where not recorded)."""
+    def build(log):
+        marks = log["Status"].astype(str).str.strip().str.lower().map({"present": "P", "absent": "A"})
+        out = log.assign(Mark=marks).pivot_table(index="Name", columns="Date", values="Mark", aggfunc="last")
+        out.columns = out.columns.strftime("%Y-%m-%d")
+        return out.fillna("").rename_axis(index="Name", columns=None)
+
+    return _pivot("wide", team, fy, build)
+
+
+def monthly_percentages(team, fy):
+    """Attendance % per member (and the whole team) per month."""
+    def build(log):
+        log = log.assign(Month=log["Date"].dt.to_period("M"), Present=log["Status"].astype(str).str.strip().str.lower().eq("present"))
+        out = log.pivot_table(index="Name", columns="Month", values="Present", aggfunc="mean", observed=True)
+        out.loc["Team"] = log.groupby("Month")["Present"].mean()
+        out = (100 * out).round(1)
+        out.columns = out.columns.strftime("%b %Y")
+        return out.rename_axis(index="Name", columns=None)
+
+    return _pivot("monthly", team, fy, build)
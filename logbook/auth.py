@@ -0,0 +1,328 @@
+import base64
+import getpass
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from logbook import cache, config, locking, storage
+
+# Sign-in for the logbook. Passwords are stored only as salted PBKDF2-SHA256
+# hashes, in CREDENTIALS_PATH, one entry per User_ID:
+#
+#   {"name", "email", "role", "active", "hash": "pbkdf2_sha256$<iterations>$<salt>$<digest>"}
+#
+# The users of Users_Table.xlsx are imported on first use. The larger
+# data/raw/Password.xlsx is imported on request
+# (python -m logbook.auth import-passwords), since hashing hundreds of
+# passwords at a deliberate work factor takes a while.
+#
+# A User_ID that several rows of a workbook share identifies none of them;
+# those users are stored under their email or, failing that, their name.
+#
+# Each process holds the file as two dicts, by User_ID and by lower-cased
+# User_ID, email or (unique) name, re-read only when another process
+# replaces the file. A verified
+# sign-in is kept in the Streamlit session together with the hash it was
+# checked against, so current_user() on every rerun is a dictionary lookup
+# that still notices a password change or a deactivated user.
+#
+# The work factor is config.PASSWORD_ITERATIONS; a hash made with fewer
+# iterations is upgraded the next time its user signs in.
+SCHEME = "pbkdf2_sha256"
+SESSION_KEY = "auth_user"
+USERS_FILE = "Users_Table.xlsx"
+PASSWORD_WORKBOOK = os.path.join("data", "raw", "Password.xlsx")
+
+# store field -> sheet column, per workbook layout
+USER_COLUMNS = {"user_id": "User_ID", "name": "Name", "role": "Role", "email": "Email", "password": "Password", "active": "Is_Active"}
+PASSWORD_COLUMNS = {"user_id": "EMAIL", "name": "USER_NAME", "email": "EMAIL", "password": "PASSWORD"}
+
+_users = {}  # User_ID -> entry
+_aliases = {}  # lower-cased User_ID, email or unique name -> User_ID
+_signature = None
+_dummy = None  # hash checked for unknown users, so they take as long as known ones
+_lock = threading.RLock()
+log = logging.getLogger(__name__)
+
+
+# --- Hashes ---
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password, iterations=None):
+    iterations = int(iterations or config.PASSWORD_ITERATIONS)
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", str(password).encode("utf-8"), salt, iterations)
+    return f"{SCHEME}${iterations}${_b64(salt)}${_b64(digest)}"
+
+
+def is_hashed(value):
+    return isinstance(value, str) and value.startswith(SCHEME + "$")
+
+
+def verify_password(password, stored):
+    """Whether password matches a stored hash (in constant time)."""
+    try:
+        scheme, iterations, salt, digest = stored.split("$")
+        if scheme != SCHEME:
+            return False
+        candidate = hashlib.pbkdf2_hmac("sha256", str(password).encode("utf-8"), _unb64(salt), int(iterations))
+        return hmac.compare_digest(candidate, _unb64(digest))
+    except (AttributeError, ValueError):
+        return False
+
+
+def needs_rehash(stored):
+    return int(stored.split("$")[1]) < config.PASSWORD_ITERATIONS
+
+
+def _hash_all(passwords, workers=None):
+    # On a thread pool: PBKDF2 releases the GIL
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return list(pool.map(hash_password, passwords))
+
+
+# --- Store ---
+def _text(value):
+    # Sheet cells as stored text: 101.0 -> "101", blanks -> ""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _active(value):
+    text = _text(value).lower()
+    return text not in ("false", "no", "n", "0", "inactive")
+
+
+def _read():
+    """The index, re-read whenever another process has replaced the file."""
+    global _signature
+    signature = cache.signature([config.CREDENTIALS_PATH])
+    with _lock:
+        if signature != _signature:
+            try:
+                with open(config.CREDENTIALS_PATH, encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (FileNotFoundError, ValueError):
+                entries = {}
+            _users.clear()
+            _users.update(entries)
+            names = Counter(e.get("name", "").lower() for e in entries.values())
+            _aliases.clear()
+            _aliases.update({e["name"].lower(): uid for uid, e in entries.items() if e.get("name") and names[e["name"].lower()] == 1})
+            _aliases.update({e["email"].lower(): uid for uid, e in entries.items() if e.get("email")})
+            _aliases.update({uid.lower(): uid for uid in entries})
+            _signature = signature
+        return _users
+
+
+def _load():
+    seed()
+    return _read()
+
+
+def _update(change):
+    """Apply change(users) to the stored users under the file's lock."""
+    global _signature
+    with _lock, locking.lock(config.CREDENTIALS_PATH):
+        _signature = None  # re-read: another process may have written since
+        users = _read()
+        change(users)
+        locking.write_text(config.CREDENTIALS_PATH, json.dumps(users, indent=1))
+        _signature = None  # the next _load() rebuilds the aliases
+
+
+def import_users(path, columns=USER_COLUMNS, replace=False, workers=None):
+    """Add a workbook's users to the store. Users already stored are kept
+    unless replace is set. Passwords are hashed on a thread pool (PBKDF2
+    releases the GIL). Rows left without an identifier of their own are
+    skipped with a warning. Returns the number of users written."""
+    sheet = storage.read_table(path)
+    records = [{field: record.get(col) for field, col in columns.items()} for record in sheet.to_dict("records")]
+    shared = Counter(_text(entry.get("user_id")) for entry in records)
+    keyed, skipped = {}, []
+    for number, entry in enumerate(records, start=2):  # sheet row numbers, after the header
+        password = _text(entry.get("password"))
+        if not password:
+            continue
+        user_id = _text(entry.get("user_id"))
+        if not user_id or shared[user_id] > 1:
+            user_id = _text(entry.get("email")) or _text(entry.get("name"))
+        user_id = user_id.lower() if "@" in user_id else user_id
+        if not user_id or user_id in keyed:
+            skipped.append(number)
+            continue
+        keyed[user_id] = (entry, password)
+    if skipped:
+        log.warning("%s: rows %s skipped, no unique User_ID, email or name", path, ", ".join(map(str, skipped)))
+    stored = _read()
+    rows = [(user_id, entry, password) for user_id, (entry, password) in keyed.items() if replace or user_id not in stored]
+    hashes = _hash_all([password for _, _, password in rows], workers)
+
+    def change(users):
+        for (user_id, entry, _), hashed in zip(rows, hashes):
+            if replace or user_id not in users:
+                users[user_id] = {
+                    "name": _text(entry.get("name")),
+                    "email": _text(entry.get("email")).lower(),
+                    "role": _text(entry.get("role")) or "User",
+                    "active": _active(entry.get("active")),
+                    "hash": hashed,
+                }
+
+    _update(change)
+    return len(rows)
+
+
+def seed():
+    """Create the store from Users_Table.xlsx, once."""
+    if os.path.exists(config.CREDENTIALS_PATH):
+        return 0
+    with _lock, locking.lock(config.CREDENTIALS_PATH):
+        if os.path.exists(config.CREDENTIALS_PATH):
+            return 0  # another process seeded it while we waited
+        workbook = os.path.join(config.DATA_DIR, USERS_FILE)
+        if not os.path.exists(workbook):
+            locking.write_text(config.CREDENTIALS_PATH, "{}")
+            return 0
+        return import_users(workbook)
+
+
+def set_password(user_id, password):
+    hashed = hash_password(password)  # outside the lock: it's the slow part
+    _update(lambda users: users[user_id].update(hash=hashed))
+
+
+def has_users():
+    return bool(_load())
+
+
+# --- Sign-in ---
+def find(identifier):
+    """The User_ID for a User_ID, email or name, or None."""
+    users = _load()
+    identifier = _text(identifier)
+    if identifier in users:
+        return identifier
+    return _aliases.get(identifier.lower())
+
+
+def authenticate(identifier, password):
+    """The user (with its user_id) if password matches an active user, else None."""
+    global _dummy
+    user_id = find(identifier)
+    entry = _users.get(user_id) if user_id else None
+    if entry is None:
+        _dummy = _dummy or hash_password(secrets.token_hex(8))
+        verify_password(password, _dummy)
+        return None
+    if not entry.get("active", True) or not verify_password(password, entry["hash"]):
+        return None
+    if needs_rehash(entry["hash"]):
+        set_password(user_id, password)
+    return dict(_load()[user_id], user_id=user_id)
+
+
+def _public(user_id, entry):
+    return {"user_id": user_id, "name": entry.get("name"), "email": entry.get("email"), "role": entry.get("role")}
+
+
+def login(session, identifier, password):
+    """Verify a password and remember the user in session (st.session_state).
+    Returns the user, or None."""
+    user = authenticate(identifier, password)
+    if user is None:
+        session.pop(SESSION_KEY, None)
+        return None
+    session[SESSION_KEY] = {"user_id": user["user_id"], "hash": user["hash"]}
+    return _public(user["user_id"], user)
+
+
+def current_user(session):
+    """The signed-in user, while their password and active flag are unchanged."""
+    signed_in = session.get(SESSION_KEY)
+    if not signed_in:
+        return None
+    entry = _load().get(signed_in["user_id"])
+    if entry is None or not entry.get("active", True) or entry["hash"] != signed_in["hash"]:
+        session.pop(SESSION_KEY, None)
+        return None
+    return _public(signed_in["user_id"], entry)
+
+
+def logout(session):
+    session.pop(SESSION_KEY, None)
+
+
+def allowed(session, *roles):
+    """Whether the session may open a page restricted to roles. Open to
+    everyone until an active user holds one of the roles, so a store
+    without such a user doesn't lock the page for good."""
+    users = _load()
+    if not any(e.get("active", True) and (not roles or e.get("role") in roles) for e in users.values()):
+        return True
+    user = current_user(session)
+    return user is not None and (not roles or user["role"] in roles)
+
+
+# --- Member passwords ---
+def hash_member_passwords():
+    """Replace plaintext passwords in the member table with hashes, once."""
+    from logbook import data
+
+    with locking.lock(config.table_path("members")):
+        members = data.load("members")
+        if "Password" not in members.columns:
+            return 0
+        plain = [(int(m), _text(p)) for m, p in zip(members["Member ID"], members["Password"]) if _text(p) and not is_hashed(_text(p))]
+        if plain:
+            hashes = _hash_all([p for _, p in plain])
+            data.apply_changes("members", edited={m: {"Password": h} for (m, _), h in zip(plain, hashes)})
+        return len(plain)
+
+
+def hash_columns(df):
+    """df with the plaintext in its password columns (config.PASSWORD_HEADERS)
+    replaced by hashes. Blanks and values already hashed are kept."""
+    changes = {}
+    for col in config.password_columns(df.columns):
+        values = [_text(v) for v in df[col]]
+        plain = [i for i, v in enumerate(values) if v and not is_hashed(v)]
+        for i, hashed in zip(plain, _hash_all([values[i] for i in plain])):
+            values[i] = hashed
+        changes[col] = [v or None for v in values]
+    return df.assign(**changes) if changes else df
+
+
+# python -m logbook.auth import-passwords [workbook]
+# python -m logbook.auth set-password USER_ID
+if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s")
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "import-passwords":
+        count = import_users(sys.argv[2] if len(sys.argv) > 2 else PASSWORD_WORKBOOK, PASSWORD_COLUMNS)
+        print(f"Imported {count} users into {config.CREDENTIALS_PATH}")
+    elif command == "set-password" and len(sys.argv) > 2:
+        user_id = find(sys.argv[2])
+        if user_id is None:
+            sys.exit(f"No user {sys.argv[2]}")
+        set_password(user_id, getpass.getpass(f"New password for {user_id}: "))
+    else:
+        sys.exit("usage: python -m logbook.auth import-passwords [workbook] | set-password USER_ID")
@@ -0,0 +1,73 @@
+import os
+import threading
+from collections import OrderedDict
+
+from logbook import config, storage
+
+# Parsed tables shared by every Streamlit session in the process. An entry is
+# reused while its source files keep the same (inode, mtime, size); writers
+# in this process also call invalidate() because two appends within the
+# mtime resolution can leave the signature unchanged. Holds up to
+# config.TABLE_CACHE_ENTRIES tables.
+_entries = OrderedDict()  # path -> (signature, DataFrame)
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0}
+
+
+def signature(paths):
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        # The inode changes whenever a writer renames a new file into place
+        sig.append((path, st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+def table_signature(path):
+    return signature([path, storage.journal_path(path)])
+
+
+def read_table(path, copy=True, prepare=None):
+    """storage.read_table() through the cache.
+
+    prepare(df) runs once per parse, before the frame is cached. Pass
+    copy=False only when the caller won't modify the frame.
+    """
+    sig = table_signature(path)
+    with _lock:
+        entry = _entries.get(path)
+        if entry is not None and entry[0] == sig:
+            _entries.move_to_end(path)
+            stats["hits"] += 1
+            df = entry[1]
+            return df.copy() if copy else df
+    stats["misses"] += 1
+    df = storage.read_table(path)
+    if prepare is not None:
+        df = prepare(df)
+    with _lock:
+        _entries[path] = (sig, df)
+        _entries.move_to_end(path)
+        while len(_entries) > config.TABLE_CACHE_ENTRIES:
+            _entries.popitem(last=False)
+    return df.copy() if copy else df
+
+
+def cached(path):
+    """Whether path's current contents are in the cache."""
+    sig = table_signature(path)
+    with _lock:
+        entry = _entries.get(path)
+        return entry is not None and entry[0] == sig
+
+
+def invalidate(path=None):
+    """Drop one cached table, or everything when path is None."""
+    with _lock:
+        if path is None:
+            _entries.clear()
+        else:
+            _entries.pop(path, None)
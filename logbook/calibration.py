@@ -0,0 +1,133 @@
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from logbook import config, data, locking, storage
+
+# Calibration history of the gas testing instruments. The equipment table
+# keeps one row per instrument with its current Previous/Test/Due dates; the
+# calibrations table keeps every test, each optionally linked to the meeting
+# (meetings Row ID) it was raised in. record() logs a test and moves the
+# instrument's current dates along.
+#
+# Gas_Testing_Table.xlsx (SN, Meeting_ID, Equipment name, Test date, Due
+# date) and the dates already in the equipment table seed the history once,
+# on first use.
+#
+# Timelines are served from an index rebuilt only when the log changes: the
+# log sorted by (SN, Test date) with each SN's [start, end) slice. One
+# instrument's history is one slice of the sorted log, however many
+# instruments there are.
+WORKBOOK = "Gas_Testing_Table.xlsx"
+LOG_COLUMNS = ["SN", "Meeting_ID", "Test date", "Due date", "Remarks"]
+
+# frame: log sorted by SN then Test date; spans: SN -> (start, end)
+TimelineIndex = namedtuple("TimelineIndex", ["frame", "spans"])
+
+_index = None  # (source signature, TimelineIndex)
+_lock = threading.Lock()
+
+
+def workbook_path():
+    return os.path.join(config.DATA_DIR, WORKBOOK)
+
+
+def _key(value):
+    # SN / Meeting_ID as stored in any table: 3, 3.0 and "3" are the same instrument
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or not str(value).strip():
+        return None
+    number = pd.to_numeric(value, errors="coerce")
+    return int(number) if not pd.isna(number) and float(number).is_integer() else str(value).strip()
+
+
+# --- History ---
+def seed():
+    """Fill an empty history from the workbook and the equipment table, once."""
+    if data.exists("calibrations"):
+        return 0
+    with locking.lock(config.table_path("calibrations")):
+        if data.exists("calibrations"):
+            return 0  # another process seeded it while we waited
+        equipment = data.load("equipment", columns=["SN", "Previous Test date", "Test date ", "Due date"])
+        frames = [
+            equipment[["SN", "Previous Test date"]].rename(columns={"Previous Test date": "Test date"}),
+            equipment[["SN", "Test date ", "Due date"]].rename(columns={"Test date ": "Test date"}),
+        ]
+        if os.path.exists(workbook_path()):
+            sheet = storage.read_table(workbook_path())
+            frames.append(sheet.rename(columns=lambda c: str(c).strip()))
+        log = pd.concat([f.reindex(columns=LOG_COLUMNS) for f in frames], ignore_index=True)
+        log = log.assign(SN=log["SN"].map(_key), Meeting_ID=log["Meeting_ID"].map(_key), **{"Test date": pd.to_datetime(log["Test date"], errors="coerce")})
+        # The workbook comes last, so a test it also lists keeps its meeting link
+        log = log.dropna(subset=["SN", "Test date"]).drop_duplicates(["SN", "Test date"], keep="last")
+        data.append("calibrations", log.to_dict("records"))
+        return len(log)
+
+
+def record(sn, test_date, due_date, meeting_id=None, remarks=None):
+    """Log a calibration; it becomes the instrument's current test unless an
+    equal or later one is already recorded."""
+    seed()
+    test_date = pd.Timestamp(test_date)
+    data.append("calibrations", [{"SN": _key(sn), "Meeting_ID": _key(meeting_id), "Test date": test_date, "Due date": due_date, "Remarks": remarks}])
+    with locking.lock(config.table_path("equipment")):
+        equipment = data.load("equipment", columns=["Row ID", "SN", "Test date "])
+        edited = {}
+        for row in equipment[equipment["SN"].map(_key) == _key(sn)].to_dict("records"):
+            current = row["Test date "]
+            if pd.isna(current) or test_date > current:
+                changes = {"Test date ": test_date, "Due date": due_date}
+                if not pd.isna(current):
+                    changes["Previous Test date"] = current
+                edited[int(row["Row ID"])] = changes
+        if edited:
+            data.apply_changes("equipment", edited=edited)
+
+
+def index():
+    """The timeline index over the current log."""
+    global _index
+    source = data.source_signature("calibrations")
+    with _lock:
+        if _index is not None and _index[0] == source:
+            return _index[1]
+    log = data.view("calibrations", columns=["Row ID"] + LOG_COLUMNS)
+    log = log.assign(SN=log["SN"].map(_key), Meeting_ID=log["Meeting_ID"].map(_key)).dropna(subset=["SN"])
+    order = log.assign(_sn=log["SN"].astype(str)).sort_values(["_sn", "Test date"], kind="stable").index
+    frame = log.loc[order].reset_index(drop=True)
+    sns = frame["SN"].astype(str).to_numpy()
+    starts = np.flatnonzero(np.r_[True, sns[1:] != sns[:-1]]) if len(sns) else np.array([], dtype=int)
+    ends = np.r_[starts[1:], len(sns)].astype(int)
+    spans = {frame["SN"].iat[s]: (int(s), int(e)) for s, e in zip(starts, ends)}
+    built = TimelineIndex(frame, spans)
+    with _lock:
+        _index = (source, built)
+    return built
+
+
+# --- Queries ---
+def timeline(sn):
+    """Every calibration of one instrument, oldest first."""
+    idx = index()
+    start, end = idx.spans.get(_key(sn), (0, 0))
+    return idx.frame.iloc[start:end]
+
+
+def summary():
+    """The equipment table with each instrument's calibration count and the
+    last meeting one of its calibrations was linked to."""
+    idx = index()
+    equipment = data.load("equipment")
+    linked = idx.frame.dropna(subset=["Meeting_ID"]).groupby("SN")["Meeting_ID"].last()
+    keys = equipment["SN"].map(_key)
+    counts = {sn: end - start for sn, (start, end) in idx.spans.items()}
+    return equipment.assign(Calibrations=keys.map(counts).fillna(0).astype(int), **{"Last meeting": keys.map(linked)})
+
+
+def meetings(ids=None):
+    """Meeting points by Row ID, for labelling links (all meetings when ids is None)."""
+    filters = None if ids is None else {"Row ID": [i for i in ids if i is not None]}
+    return data.load("meetings", filters=filters, columns=["Row ID", "Team Name", "Point of discussion", "Target date"])
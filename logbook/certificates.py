@@ -0,0 +1,206 @@
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+import urllib.parse
+from collections import OrderedDict
+
+from logbook import config, locking
+
+# Uploads are stored once per distinct content under
+# certificates/blobs/<first 2 hex digits>/<sha256>. index.json next to them
+# records each blob's size, extension and the training SNs referencing it;
+# a blob is deleted when its last reference is released. data.append() and
+# data.apply_changes() keep the references in step with the training rows
+# through update(). The human-readable name built by the Training page is
+# kept in the record and used as the download file name.
+#
+# Files are only read when someone asks to download one. Recently served
+# files stay in an LRU of up to config.CERTIFICATE_CACHE_BYTES shared by all
+# sessions, keyed on (path, mtime, size) so a replaced file is never served
+# stale.
+CHUNK_SIZE = 1024 * 1024
+TABLE = "training"  # the table whose rows reference certificates
+
+_files = OrderedDict()  # (path, mtime_ns, size) -> bytes
+_cached_bytes = 0
+_lock = threading.Lock()
+
+
+# --- Content-addressed store ---
+def blob_path(sha):
+    return os.path.join(config.CERTIFICATE_BLOB_DIR, sha[:2], sha)
+
+
+def store(upload):
+    """Hash and write an upload chunk by chunk; returns (sha256, path, size).
+
+    Content that is already stored isn't written a second time.
+    """
+    os.makedirs(config.CERTIFICATE_BLOB_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=config.CERTIFICATE_BLOB_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if hasattr(upload, "seek"):
+                upload.seek(0)
+            for chunk in iter(lambda: upload.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        sha = digest.hexdigest()
+        path = blob_path(sha)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return sha, path, size
+
+
+def _load_index():
+    try:
+        with open(config.CERTIFICATE_INDEX_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    locking.write_text(config.CERTIFICATE_INDEX_PATH, json.dumps(index, indent=1, sort_keys=True))
+
+
+def _index_locked():
+    # Other processes (and sessions) update the same index
+    return locking.lock(config.CERTIFICATE_INDEX_PATH)
+
+
+def _ref(sn):
+    # 5, 5.0 and "5" are the same record
+    try:
+        return str(int(float(sn)))
+    except (TypeError, ValueError):
+        return str(sn)
+
+
+def _sha(row):
+    sha = row.get("Certificate SHA256")
+    return sha if isinstance(sha, str) and sha else None
+
+
+def add_ref(sha, ref, size=None, ext=""):
+    with _index_locked():
+        index = _load_index()
+        entry = index.setdefault(sha, {"size": size, "ext": ext, "refs": []})
+        if _ref(ref) not in entry["refs"]:
+            entry["refs"].append(_ref(ref))
+        _save_index(index)
+
+
+def release(sha, ref):
+    """Drop one reference; returns True if the blob was deleted."""
+    with _index_locked():
+        index = _load_index()
+        entry = index.get(sha)
+        if entry is None:
+            return False
+        if _ref(ref) in entry["refs"]:
+            entry["refs"].remove(_ref(ref))
+        deleted = not entry["refs"]
+        if deleted:
+            del index[sha]
+            path = blob_path(sha)
+            if os.path.exists(path):
+                os.remove(path)
+            evict(path)
+        _save_index(index)
+        return deleted
+
+
+def update(table, rows, removed=()):
+    """Reference the certificates of written training rows and release those
+    of removed rows (deleted, or the previous version of edited ones) that
+    the written rows don't keep."""
+    if table != TABLE:
+        return
+    kept = {(_ref(row.get("SN")), _sha(row)) for row in rows}
+    for row in removed:
+        if _sha(row) and (_ref(row.get("SN")), _sha(row)) not in kept:
+            release(_sha(row), row.get("SN"))
+    for row in rows:
+        sha = _sha(row)
+        if sha and os.path.exists(blob_path(sha)):
+            ext = os.path.splitext(str(row.get("Certificate File Name") or ""))[1].lower()
+            add_ref(sha, row.get("SN"), size=os.path.getsize(blob_path(sha)), ext=ext)
+
+
+
+# --- Serving ---
+def path_for(link, file_name=None, sha=None):
+    """Local path of a record's certificate, or None if it isn't on disk."""
+    candidates = []
+    if isinstance(sha, str) and sha:
+        candidates.append(blob_path(sha))
+    if isinstance(link, str) and link:
+        candidates.append(urllib.parse.unquote(link))
+    if isinstance(file_name, str) and file_name:
+        candidates.append(os.path.join(config.CERTIFICATE_DIR, file_name))
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def mime_type(file_name):
+    return mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+
+
+def read(path):
+    """File bytes through the LRU."""
+    global _cached_bytes
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _lock:
+        if key in _files:
+            _files.move_to_end(key)
+            return _files[key]
+    with open(path, "rb") as f:
+        content = f.read()
+    if len(content) > config.CERTIFICATE_CACHE_BYTES:
+        return content
+    with _lock:
+        if key not in _files:
+            _files[key] = content
+            _cached_bytes += len(content)
+        while _cached_bytes > config.CERTIFICATE_CACHE_BYTES:
+            _, evicted = _files.popitem(last=False)
+            _cached_bytes -= len(evicted)
+    return content
+
+
+def option_label(row):
+    name = row.get("Certificate File Name")
+    return f"{row.get('SN')} - {row.get('Name')} ({name if isinstance(name, str) and name else 'no file'})"
+
+
+def records_with_files(df):
+    """Rows that reference a certificate (existence is checked on download)."""
+    has_file = df["Certificate File Name"].notna() & (df["Certificate File Name"].astype(str) != "")
+    if "Certificate Link" in df.columns:
+        has_file |= df["Certificate Link"].notna() & (df["Certificate Link"].astype(str) != "")
+    return df[has_file]
+
+
+def evict(path=None):
+    """Drop cached bytes for one file, or all of them."""
+    global _cached_bytes
+    with _lock:
+        for key in [k for k in _files if path is None or k[0] == path]:
+            _cached_bytes -= len(_files.pop(key))
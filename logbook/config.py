@@ -0,0 +1,175 @@
+import json
+import os
+
+# --- Runtime settings ---
+# Paths and limits come from SETTINGS_PATH (edited on the Settings page),
+# falling back to DEFAULT_SETTINGS. configure() derives every module-level
+# value below from them; it runs once on import and again whenever settings
+# are saved, so modules read config.<NAME> at call time, never at import.
+SETTINGS_PATH = os.environ.get("LOGBOOK_SETTINGS", "logbook_settings.json")
+DEFAULT_SETTINGS = {
+    "data_dir": os.path.join("data", "processed", "Database"),
+    # "csv" keeps the CSV/XLSX files as the source of truth, "sqlite" serves
+    # everything from DB_PATH (migrated from the files on first use)
+    "backend": "csv",
+    "page_size": 50,  # rows per page in paginated table views
+    "table_cache_entries": 32,  # parsed tables kept per process (logbook/cache.py)
+    "certificate_cache_mb": 32,  # served certificate bytes kept per process
+    "figure_cache_mb": 16,  # dashboard figure JSON kept per process (logbook/figures.py)
+    "mirror_refresh_seconds": 30,  # Excel mirror check interval (logbook/mirror.py)
+    "alert_check_seconds": 3600,  # due-date alert check interval (logbook/alerts.py)
+    "report_workers": 2,  # worker processes rendering reports
+    "password_iterations": 600000,  # PBKDF2 work factor for stored passwords (logbook/auth.py)
+}
+
+# Due-date thresholds in days, shared by due-status buckets (logbook/due.py)
+# and alert stages (logbook/alerts.py)
+URGENT_DAYS = 10
+INCOMING_DAYS = 30
+
+CERTIFICATE_DIR = "certificates"
+# Uploaded certificates, stored once per distinct content (see logbook/certificates.py)
+CERTIFICATE_BLOB_DIR = os.path.join(CERTIFICATE_DIR, "blobs")
+CERTIFICATE_INDEX_PATH = os.path.join(CERTIFICATE_BLOB_DIR, "index.json")
+
+# --- Logbook tables: name -> (file in DATA_DIR, columns) ---
+TABLE_FILES = {
+    "meetings": (
+        "Meeting_Table.csv",
+        ["Row ID", "Team Name", "Audit Level", "Point of discussion", "Severity (High/Low)", "Responsibility", "Target date", "Status (Done/Pending)", "Remarks", "FY"],
+    ),
+    "members": (
+        "attendance_data.csv",
+        ["Member ID", "Team Name", "Name", "Password"],
+    ),
+    # One row per member per day; see logbook/attendance.py
+    "attendance": (
+        "attendance_log.csv",
+        ["Date", "Member ID", "Status", "FY"],
+    ),
+    "audit": (
+        "audit_data.csv",
+        ["Row ID", "Audit Level", "Point", "Area", "Department", "Responsibility", "Target date", "Status (Done/Pending)", "Remarks", "FY"],
+    ),
+    "training": (
+        "entrant_attendant_data.csv",
+        ["SN", "Name", "Role", "Training date", "Due date", "Agency", "Certificate File Name", "Certificate Link", "Certificate SHA256"],
+    ),
+    "equipment": (
+        "equipment_data.csv",
+        ["Row ID", "SN", "Equipment name", "Previous Test date", "Test date ", "Due date"],
+    ),
+    # Every calibration of a gas testing instrument (by equipment SN), with
+    # the meeting (meetings Row ID) it was raised in; see logbook/calibration.py
+    "calibrations": (
+        "calibration_log.csv",
+        ["Row ID", "SN", "Meeting_ID", "Test date", "Due date", "Remarks"],
+    ),
+}
+
+
+def read_settings():
+    """DEFAULT_SETTINGS overlaid with the settings file; LOGBOOK_BACKEND wins."""
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open(SETTINGS_PATH, encoding="utf-8") as f:
+            settings.update({k: v for k, v in json.load(f).items() if k in DEFAULT_SETTINGS})
+    except (FileNotFoundError, ValueError):
+        pass
+    if os.environ.get("LOGBOOK_BACKEND"):
+        settings["backend"] = os.environ["LOGBOOK_BACKEND"]
+    return settings
+
+
+def configure(settings):
+    """Derive the paths and limits below from a settings dict."""
+    global SETTINGS, DATA_DIR, DB_PATH, AGGREGATES_PATH, CREDENTIALS_PATH, MIRROR_DIR, SNAPSHOT_DIR, OUTBOX_DIR, REPORT_DIR, TABLES
+    global BACKEND, PAGE_SIZE, TABLE_CACHE_ENTRIES, CERTIFICATE_CACHE_BYTES, MIRROR_REFRESH_SECONDS, ALERT_CHECK_SECONDS, REPORT_WORKERS
+    global FIGURE_CACHE_BYTES, PASSWORD_ITERATIONS
+    SETTINGS = dict(DEFAULT_SETTINGS, **settings)
+
+    # --- Data locations ---
+    DATA_DIR = SETTINGS["data_dir"]
+    DB_PATH = os.path.join(DATA_DIR, "logbook.db")
+    AGGREGATES_PATH = os.path.join(DATA_DIR, "aggregates.json")
+    # Users and their password hashes (see logbook/auth.py)
+    CREDENTIALS_PATH = os.path.join(DATA_DIR, "credentials.json")
+    # Parquet copies of the XLSX workbooks (see logbook/mirror.py)
+    MIRROR_DIR = os.path.join(DATA_DIR, ".mirror")
+    # Memory-mapped Arrow copies of whole tables for dashboards (see logbook/snapshots.py)
+    SNAPSHOT_DIR = os.path.join(DATA_DIR, ".snapshots")
+    # Due-date alert digests (see logbook/alerts.py)
+    OUTBOX_DIR = os.path.join(DATA_DIR, "outbox")
+    # Cached report outputs (see logbook/reports.py)
+    REPORT_DIR = os.path.join(DATA_DIR, "reports")
+    TABLES = {name: (os.path.join(DATA_DIR, file), columns) for name, (file, columns) in TABLE_FILES.items()}
+
+    # --- Limits ---
+    BACKEND = str(SETTINGS["backend"]).lower()
+    PAGE_SIZE = int(SETTINGS["page_size"])
+    TABLE_CACHE_ENTRIES = int(SETTINGS["table_cache_entries"])
+    CERTIFICATE_CACHE_BYTES = int(SETTINGS["certificate_cache_mb"]) * 1024 * 1024
+    FIGURE_CACHE_BYTES = int(SETTINGS["figure_cache_mb"]) * 1024 * 1024
+    MIRROR_REFRESH_SECONDS = int(SETTINGS["mirror_refresh_seconds"])
+    ALERT_CHECK_SECONDS = int(SETTINGS["alert_check_seconds"])
+    REPORT_WORKERS = int(SETTINGS["report_workers"])
+    PASSWORD_ITERATIONS = int(SETTINGS["password_iterations"])
+
+
+configure(read_settings())
+
+# Integer key column of each table edited through st.data_editor (and of the
+# audit points and training records, which the search index and the workbook
+# import address by key). Keys are
+# assigned on write and never reused, so edits address rows by key rather
+# than by position.
+KEY_COLUMNS = {"meetings": "Row ID", "members": "Member ID", "audit": "Row ID", "training": "SN", "equipment": "Row ID", "calibrations": "Row ID"}
+
+# Tables with a stored "FY" column, and the date column it is derived from.
+# The label is computed when rows are written so reads never derive it.
+FY_SOURCES = {"meetings": "Target date", "attendance": "Date", "audit": "Target date"}
+
+# Tables the file backend stores as one CSV per combination of these
+# columns' values rather than one file (see logbook/partitions.py), so a
+# reader filtered on them opens only the matching files.
+PARTITIONS = {"audit": ["Audit Level", "FY"]}
+
+# Declared in-memory types (see logbook/schema.py). Low-cardinality text
+# loads as categoricals and dates are parsed to datetime64 once, when a table
+# is read, so pages filter and count on codes and never reparse dates.
+CATEGORY_COLUMNS = {
+    "meetings": ["Team Name", "Audit Level", "Severity (High/Low)", "Responsibility", "Status (Done/Pending)"],
+    "members": ["Team Name"],
+    "attendance": ["Status"],
+    "audit": ["Audit Level", "Area", "Department", "Responsibility", "Status (Done/Pending)"],
+    "training": ["Role", "Agency"],
+    "equipment": ["Equipment name"],
+}
+DATE_COLUMNS = {
+    "meetings": ["Target date"],
+    "attendance": ["Date"],
+    "audit": ["Target date"],
+    "training": ["Training date", "Due date"],
+    "equipment": ["Previous Test date", "Test date ", "Due date"],
+    "calibrations": ["Test date", "Due date"],
+}
+
+# Columns the pages filter on; the SQLite backend indexes each one it finds.
+INDEXED_COLUMNS = ["Row ID", "Team Name", "Member ID", "Status (Done/Pending)", "Status", "Audit Level", "FY", "Date", "Target date", "Due date", "SN", "Meeting_ID"]
+
+# Headers of password columns in any table or workbook (compared in lower
+# case). They are left out of the Parquet mirrors and hashed on their way
+# into SQLite, so no copy holds a plaintext password.
+PASSWORD_HEADERS = {"password"}
+
+
+def table_path(table):
+    return TABLES[table][0]
+
+
+def table_columns(table):
+    return list(TABLES[table][1])
+
+
+def password_columns(columns):
+    return [c for c in columns if str(c).strip().lower() in PASSWORD_HEADERS]
@@ -0,0 +1,375 @@
+import os
+
+import pandas as pd
+
+from logbook import aggregates, alerts, cache, certificates, config, db, locking, partitions, schema, search, snapshots, storage
+
+# Data-access layer used by the pages. Every function takes a table name from
+# config.TABLES and dispatches to the CSV/XLSX files or to SQLite depending on
+# config.BACKEND, so pages never touch paths or file formats themselves.
+# Tables in config.PARTITIONS are spread over several files by the file
+# backend (see logbook/partitions.py); readers open only the partitions their
+# filters can match.
+
+_max_keys = {}  # table -> (source signature, largest key) as of this process's last write
+
+
+def use_sqlite():
+    return config.BACKEND == "sqlite"
+
+
+# --- File backend helpers ---
+def _prepare(table):
+    # Once per parse: derived columns missing from older files, then the
+    # declared dtypes, so cached frames are already typed
+    return lambda df: schema.typed(table, schema.prepare(table, df))
+
+
+def _read_file(table, copy=True, filters=None):
+    # filters only narrow which partitions are read; callers still apply them
+    if partitions.partitioned(table):
+        return _read_partitions(table, partitions.files(table, filters), copy)
+    try:
+        return cache.read_table(config.table_path(table), copy=copy, prepare=_prepare(table))
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=config.table_columns(table))
+
+
+def _read_partitions(table, paths, copy=True):
+    frames = []
+    for path in paths:
+        try:
+            frames.append(cache.read_table(path, copy=copy, prepare=_prepare(table)))
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            continue  # removed by a merge since it was listed
+    if not frames:
+        return pd.DataFrame(columns=config.table_columns(table))
+    if len(frames) == 1:
+        return frames[0]
+    # Each partition has its own categories; re-declare them over the union
+    return schema.typed(table, pd.concat([schema.editable(f) for f in frames], ignore_index=True))
+
+
+def _read_columns(table, columns, filters=None):
+    # A table nobody has read whole yet is parsed for these columns only
+    # (usecols), and the narrow frame isn't cached. Once the table is cached
+    # it is sliced from there instead.
+    paths = partitions.files(table, filters) if partitions.partitioned(table) else [config.table_path(table)]
+    if any(cache.cached(path) for path in paths):
+        return _read_file(table, copy=False, filters=filters)
+    frames = []
+    for path in paths:
+        try:
+            frames.append(storage.read_table(path, columns=columns))
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            continue
+        except (KeyError, ValueError):  # an older file without one of the columns yet
+            return _read_file(table, copy=False, filters=filters)
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return schema.typed(table, frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True))
+
+
+def _parse_file(table):
+    # Bypasses the cache: used to build snapshots, which replace it for dashboards
+    try:
+        if partitions.partitioned(table):
+            frames = [storage.read_table(p) for p in partitions.files(table)]
+            if not frames:
+                return pd.DataFrame(columns=config.table_columns(table))
+            return _prepare(table)(pd.concat(frames, ignore_index=True))
+        return _prepare(table)(storage.read_table(config.table_path(table)))
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=config.table_columns(table))
+
+
+def _write_file(table, df, replace=()):
+    # replace: partition files df supersedes (removed if df has no rows for them)
+    if partitions.partitioned(table):
+        partitions.write(table, df, replace)
+        return
+    locking.write_csv(config.table_path(table), schema.stored(table, df))
+    cache.invalidate(config.table_path(table))
+
+
+def _write_lock(table):
+    # Held around every read-modify-write of a table, whichever the backend,
+    # so keys and merges are computed from what the last writer left
+    return locking.lock(config.table_path(table))
+
+
+def ensure_columns(table, paths=None):
+    """Rewrite a table file once if it predates one of the table's columns.
+
+    Appends can't add a column, so this runs before them; it only reads the
+    header when there is nothing to do. For a partitioned table paths limits
+    the check to those partition files.
+    """
+    if use_sqlite():
+        return
+    if partitions.partitioned(table):
+        partitions.migrate(table)
+        paths = [p for p in (partitions.files(table) if paths is None else paths) if os.path.exists(p)]
+    else:
+        path = config.table_path(table)
+        if storage.is_excel(path) or not os.path.exists(path):
+            return
+        paths = [path]
+    with _write_lock(table):
+        for path in paths:
+            header = storage.read_header(path)
+            if header and any(c not in header for c in config.table_columns(table)):
+                _write_file(table, schema.prepare(table, storage.read_table(path)), replace=[path])
+
+
+def _apply_filters(df, filters=None, date_range=None):
+    mask = pd.Series(True, index=df.index)
+    for col, value in (filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            mask &= df[col].isin(list(value))
+        else:
+            mask &= df[col] == value
+    if date_range:
+        col, start, end = date_range
+        dates = pd.to_datetime(df[col], errors="coerce")
+        mask &= (dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end))
+    return df[mask].copy()
+
+
+# --- Reads ---
+def _needed(columns, filters=None, date_range=None):
+    # The columns to read to answer a query for columns
+    return list(dict.fromkeys(list(columns) + list(filters or {}) + ([date_range[0]] if date_range else [])))
+
+
+def _project(df, columns):
+    return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+
+def load(table, filters=None, date_range=None, columns=None):
+    """Rows of a table with its declared dtypes, optionally restricted by
+    equality filters, a half-open (column, start, end) date range and a list
+    of columns."""
+    if use_sqlite():
+        return schema.typed(table, db.select(table, filters, date_range, columns))
+    if columns is None:
+        df = _read_file(table, copy=False, filters=filters)
+    else:
+        df = _read_columns(table, _needed(columns, filters, date_range), filters)
+    if not filters and not date_range:
+        return _project(df, columns).copy()
+    return _project(_apply_filters(df, filters, date_range), columns)
+
+
+def page(table, filters=None, date_range=None, sort_by=None, ascending=True, offset=0, limit=None):
+    """One page of matching rows plus the total match count."""
+    limit = limit or config.PAGE_SIZE
+    if use_sqlite():
+        df, total = db.page(table, filters, date_range, sort_by, ascending, offset, limit)
+        return schema.typed(table, df), total
+    df = _read_file(table, copy=False, filters=filters)
+    if filters or date_range:
+        df = _apply_filters(df, filters, date_range)
+    if sort_by:
+        df = df.sort_values(sort_by, ascending=ascending, kind="stable")
+    return df.iloc[offset:offset + limit].copy(), len(df)
+
+
+def source_signature(table):
+    if use_sqlite():
+        # Any committed write touches the database or its WAL file
+        return cache.signature([config.DB_PATH, config.DB_PATH + "-wal"])
+    if partitions.partitioned(table):
+        return partitions.signature(table)
+    return cache.table_signature(config.table_path(table))
+
+
+def _snapshot_rows(table):
+    return schema.typed(table, db.select(table)) if use_sqlite() else _parse_file(table)
+
+
+def _republish(table):
+    # Called under the write lock, so a dashboard's next view() maps the new
+    # version instead of building it. Tables no dashboard reads are skipped.
+    if snapshots.available() and snapshots.published(table):
+        snapshots.publish(table, _snapshot_rows(table), source_signature(table))
+
+
+def view(table, columns=None, filters=None, date_range=None):
+    """Read-only rows for dashboards, served from the table's memory-mapped
+    snapshot (see logbook/snapshots.py); takes the same filters as load().
+
+    Without pyarrow this is load() restricted to columns.
+    """
+    if not snapshots.available():
+        return load(table, filters, date_range, columns)
+    needed = None if columns is None else _needed(columns, filters, date_range)
+    df = snapshots.read(table, source_signature(table), lambda: _snapshot_rows(table), columns=needed)
+    if filters or date_range:
+        df = _apply_filters(df, filters, date_range)
+    return _project(df, columns)
+
+
+def exists(table):
+    """Whether the table has been written to at all."""
+    if use_sqlite():
+        return db.has_rows(table)
+    if partitions.partitioned(table):
+        return bool(partitions.files(table))
+    path = config.table_path(table)
+    return any(os.path.exists(p) and os.path.getsize(p) > 0 for p in (path, storage.journal_path(path)))
+
+
+def distinct(table, column, filters=None):
+    if use_sqlite():
+        return db.distinct(table, column, filters)
+    return sorted(_apply_filters(_read_file(table, copy=False, filters=filters), filters)[column].dropna().unique())
+
+
+def financial_years(table):
+    """FY labels present in a table's stored FY column, newest first."""
+    return sorted((str(v) for v in distinct(table, "FY")), reverse=True)
+
+
+# --- Writes ---
+def _largest_key(table, key):
+    # Only the key column is parsed; the largest key is reused while no other
+    # writer has touched the table since this process's last append
+    source = source_signature(table)
+    entry = _max_keys.get(table)
+    if entry is not None and entry[0] == source:
+        return entry[1]
+    paths = partitions.files(table) if partitions.partitioned(table) else [config.table_path(table)]
+    largest = None
+    for path in paths:
+        try:
+            keys = storage.read_table(path, columns=[key])[key]
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            continue
+        except ValueError:  # an older file without the key column yet
+            keys = _read_file(table, copy=False)[key]
+        current = pd.to_numeric(keys, errors="coerce").max()
+        if not pd.isna(current) and (largest is None or current > largest):
+            largest = int(current)
+    _max_keys[table] = (source, largest)
+    return largest
+
+
+def _next_key(table):
+    key = schema.key_column(table)
+    if use_sqlite():
+        current = db.max_value(table, key)
+    else:
+        current = _largest_key(table, key)
+    return 1 if current is None or pd.isna(current) else int(current) + 1
+
+
+def _new_rows(table, rows):
+    rows = [schema.row_with_fy(table, dict(r)) for r in rows]
+    key = schema.key_column(table)
+    if key and rows:
+        start = _next_key(table)
+        for row in rows:
+            if pd.isna(pd.to_numeric(row.get(key), errors="coerce")):
+                row[key] = start
+                start += 1
+    return rows
+
+
+def append(table, rows):
+    """Write new rows; returns them as stored, with their assigned keys."""
+    with _write_lock(table):
+        rows = _new_rows(table, rows)
+        if not rows:
+            return rows
+        if use_sqlite():
+            db.insert_rows(table, rows)
+        elif partitions.partitioned(table):
+            # Each row goes to the end of its own partition file
+            groups = partitions.split_rows(table, rows)
+            ensure_columns(table, list(groups))
+            for path, group in groups.items():
+                storage.append_rows(path, group, columns=config.table_columns(table))
+                cache.invalidate(path)
+        else:
+            ensure_columns(table)
+            storage.append_rows(config.table_path(table), rows, columns=config.table_columns(table))
+            cache.invalidate(config.table_path(table))
+        key = schema.key_column(table)
+        if key and not use_sqlite():
+            # _new_rows() looked the largest key up before this write
+            written = pd.to_numeric(pd.Series([r.get(key) for r in rows]), errors="coerce").max()
+            largest = max(v for v in (written, _max_keys.get(table, (None, 0))[1] or 0) if not pd.isna(v))
+            _max_keys[table] = (source_signature(table), int(largest))
+        aggregates.update(table, rows)
+        alerts.update(table, rows)
+        search.update(table, rows)
+        certificates.update(table, rows)
+        _republish(table)
+    return rows
+
+
+def _merged(table, key, df, added, edited, deleted):
+    # Plain text columns, so edits may bring values no row had before
+    df = schema.editable(df)
+    keys = pd.to_numeric(df[key], errors="coerce")
+    for row_key, values in edited.items():
+        for col, value in values.items():
+            if col != "FY":
+                df.loc[keys == row_key, col] = schema.cell(table, col, value)
+    df = df[~keys.isin(deleted)]
+    if added:
+        df = pd.concat([df, schema.typed(table, pd.DataFrame(added))], ignore_index=True)
+    return schema.with_fy(table, df)
+
+
+def _merge_partitions(table, key, added, edited, deleted):
+    # Only the partitions holding touched rows are merged and rewritten,
+    # plus any partition an edit moves rows into or new rows land in
+    touched = list(edited) + list(deleted)
+    holding = [
+        p for p in partitions.files(table)
+        if pd.to_numeric(_read_partitions(table, [p], copy=False)[key], errors="coerce").isin(touched).any()
+    ]
+    df = _merged(table, key, _read_partitions(table, holding), added, edited, deleted)
+    receiving = [p for p in partitions.split_frame(table, df) if p not in holding and os.path.exists(p)]
+    if receiving:
+        df = pd.concat([df, schema.editable(_read_partitions(table, receiving, copy=False))], ignore_index=True)
+    _write_file(table, df, replace=holding + receiving)
+
+
+def apply_changes(table, added=(), edited=None, deleted=()):
+    """Apply a change set to a keyed table: new rows, {key: {column: value}}
+    edits and deleted keys. Rows the change set doesn't mention are left as
+    they currently are in storage, whoever wrote them.
+
+    SQLite runs the change set as row-level statements. CSV files can't be
+    updated in place, so edits and deletes are merged into the file's current
+    contents (only the partitions they touch, for a partitioned table); a
+    change set of only new rows is a plain append.
+    """
+    with _write_lock(table):
+        key = schema.key_column(table)
+        edited = {k: schema.row_with_fy(table, dict(v)) for k, v in (edited or {}).items() if v}
+        deleted = list(deleted)
+        touched = list(edited) + deleted
+        if not touched:
+            append(table, added)
+            return
+        added = _new_rows(table, added)
+
+        before = load(table, filters={key: touched})
+        if use_sqlite():
+            db.apply_changes(table, key, added, edited, deleted)
+        elif partitions.partitioned(table):
+            ensure_columns(table)
+            _merge_partitions(table, key, added, edited, deleted)
+        else:
+            ensure_columns(table)
+            _write_file(table, _merged(table, key, _read_file(table), added, edited, deleted))
+        after = load(table, filters={key: list(edited)})
+        aggregates.update(table, after.to_dict("records") + added, removed=before.to_dict("records"))
+        alerts.update(table, after.to_dict("records") + added, deleted=deleted)
+        search.update(table, after.to_dict("records") + added, deleted=deleted)
+        certificates.update(table, after.to_dict("records") + added, removed=before.to_dict("records"))
+        _republish(table)
@@ -0,0 +1,254 @@
+import glob
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+
+from logbook import auth, config, locking, partitions, schema, storage
+
+# One connection per process, shared by every Streamlit session thread.
+_conn = None
+_lock = threading.RLock()
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_value(value):
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return storage.format_value(value) or None
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return value
+
+
+# --- Connection ---
+def _open(path):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # Other processes may hold the write lock; wait as long as for a file lock
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=locking.TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    ensure_schema(conn)
+    if not conn.execute("SELECT 1 FROM _migrations LIMIT 1").fetchone():
+        migrate(conn)
+    return conn
+
+
+@contextmanager
+def connection():
+    """Yield the process-wide connection, holding the lock for the duration."""
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = _open(config.DB_PATH)
+        yield _conn
+
+
+def close():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
+# --- Schema ---
+def _create_table(conn, table, columns):
+    cols = ", ".join(quote(c) for c in columns)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {quote(table)} (id INTEGER PRIMARY KEY, {cols})")
+    existing = table_columns(conn, table)
+    for col in columns:
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(col)}")
+    for col in columns:
+        if col in config.INDEXED_COLUMNS:
+            index = re.sub(r"\W+", "_", f"ix_{table}_{col}").strip("_").lower()
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {quote(index)} ON {quote(table)} ({quote(col)})")
+
+
+def ensure_schema(conn):
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS _migrations (name TEXT PRIMARY KEY, source TEXT, rows INTEGER, migrated_at TEXT)")
+        for table in config.TABLES:
+            _create_table(conn, table, config.table_columns(table))
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({quote(table)})") if row[1] != "id"]
+
+
+# --- Migration ---
+def _slug(filename):
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return re.sub(r"\W+", "_", re.sub(r"^\d+\.", "", stem)).strip("_").lower()
+
+
+def _import_frame(conn, table, df, source):
+    columns = table_columns(conn, table)
+    df = df.rename(columns={"Department": "Team Name"}) if table == "members" else df
+    df = auth.hash_columns(df)  # no plaintext passwords in the database
+    if table in config.TABLES:
+        df = schema.prepare(table, df)
+    keep = [c for c in df.columns if c in columns]
+    rows = [[_sql_value(v) for v in row] for row in df[keep].itertuples(index=False, name=None)]
+    with conn:
+        conn.execute(f"DELETE FROM {quote(table)}")
+        if keep:
+            cols = ", ".join(quote(c) for c in keep)
+            marks = ", ".join("?" for _ in keep)
+            conn.executemany(f"INSERT INTO {quote(table)} ({cols}) VALUES ({marks})", rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO _migrations VALUES (?, ?, ?, ?)",
+            (table, source, len(rows), datetime.now().isoformat(timespec="seconds")),
+        )
+
+
+def migrate(conn, force=False):
+    """One-shot import of data/processed/Database/*.csv|xlsx into SQLite.
+
+    Known logbook tables keep their names from config.TABLES; any other
+    workbook or CSV in the folder becomes a table named after the file.
+    Already-migrated tables are skipped unless force is set.
+    """
+    done = {row[0] for row in conn.execute("SELECT name FROM _migrations")}
+    # Partitioned tables are read from their partition files, not the old single file
+    for table in config.PARTITIONS:
+        paths = partitions.files(table)
+        if paths and (table not in done or force):
+            _import_frame(conn, table, pd.concat([storage.read_table(p) for p in paths], ignore_index=True), partitions.directory(table))
+    sources = {os.path.normpath(path): table for table, (path, _) in config.TABLES.items()}
+    files = sorted(glob.glob(os.path.join(config.DATA_DIR, "*.csv")) + glob.glob(os.path.join(config.DATA_DIR, "*.xlsx")))
+    for path in files:
+        if os.path.basename(path).startswith("~$"):
+            continue
+        table = sources.get(os.path.normpath(path)) or _slug(path)
+        if table in config.PARTITIONS or (table in done and not force):
+            continue
+        try:
+            df = storage.read_table(path)
+        except (pd.errors.EmptyDataError, ValueError):
+            continue
+        if table not in config.TABLES:
+            _create_table(conn, table, [str(c) for c in df.columns])
+            df.columns = [str(c) for c in df.columns]
+        _import_frame(conn, table, df, path)
+
+
+# --- Queries ---
+def _where(filters=None, date_range=None):
+    clauses, params = [], []
+    for col, value in (filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            value = list(value)
+            clauses.append(f"{quote(col)} IN ({', '.join('?' for _ in value)})")
+            params.extend(_sql_value(v) for v in value)
+        else:
+            clauses.append(f"{quote(col)} = ?")
+            params.append(_sql_value(value))
+    if date_range:
+        col, start, end = date_range
+        clauses.append(f"{quote(col)} >= ? AND {quote(col)} < ?")
+        params.extend([start, end])
+    sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return sql, params
+
+
+def has_rows(table):
+    with connection() as conn:
+        return conn.execute(f"SELECT 1 FROM {quote(table)} LIMIT 1").fetchone() is not None
+
+
+def select(table, filters=None, date_range=None, columns=None):
+    with connection() as conn:
+        names = table_columns(conn, table)
+        if columns is not None:
+            names = [c for c in columns if c in names]
+        cols = ", ".join(quote(c) for c in names)
+        where, params = _where(filters, date_range)
+        return pd.read_sql_query(f"SELECT {cols} FROM {quote(table)}{where} ORDER BY id", conn, params=params)
+
+
+def page(table, filters=None, date_range=None, sort_by=None, ascending=True, offset=0, limit=50):
+    where, params = _where(filters, date_range)
+    order = f"{quote(sort_by)} {'ASC' if ascending else 'DESC'}, id" if sort_by else "id"
+    with connection() as conn:
+        cols = ", ".join(quote(c) for c in table_columns(conn, table))
+        total = conn.execute(f"SELECT COUNT(*) FROM {quote(table)}{where}", params).fetchone()[0]
+        df = pd.read_sql_query(
+            f"SELECT {cols} FROM {quote(table)}{where} ORDER BY {order} LIMIT ? OFFSET ?",
+            conn,
+            params=params + [limit, offset],
+        )
+    return df, total
+
+
+def distinct(table, column, filters=None):
+    where, params = _where(filters)
+    sql = f"SELECT DISTINCT {quote(column)} FROM {quote(table)}{where}"
+    sql += (" AND " if where else " WHERE ") + f"{quote(column)} IS NOT NULL ORDER BY 1"
+    with connection() as conn:
+        return [row[0] for row in conn.execute(sql, params)]
+
+
+# --- Writes ---
+def insert_rows(table, rows):
+    rows = [dict(r) for r in rows]
+    if not rows:
+        return
+    with connection() as conn:
+        columns = [c for c in table_columns(conn, table) if any(c in r for r in rows)]
+        cols = ", ".join(quote(c) for c in columns)
+        marks = ", ".join("?" for _ in columns)
+        with conn:
+            conn.executemany(
+                f"INSERT INTO {quote(table)} ({cols}) VALUES ({marks})",
+                [[_sql_value(r.get(c)) for c in columns] for r in rows],
+            )
+
+
+def max_value(table, column):
+    with connection() as conn:
+        return conn.execute(f"SELECT MAX({quote(column)}) FROM {quote(table)}").fetchone()[0]
+
+
+def apply_changes(table, key, added=(), edited=None, deleted=()):
+    """Insert, update (by key) and delete (by key) rows in one transaction."""
+    with connection() as conn:
+        columns = table_columns(conn, table)
+        with conn:
+            for row_key in deleted:
+                conn.execute(f"DELETE FROM {quote(table)} WHERE {quote(key)} = ?", [_sql_value(row_key)])
+            for row_key, values in (edited or {}).items():
+                cols = [c for c in values if c in columns]
+                if not cols:
+                    continue
+                sets = ", ".join(f"{quote(c)} = ?" for c in cols)
+                conn.execute(
+                    f"UPDATE {quote(table)} SET {sets} WHERE {quote(key)} = ?",
+                    [_sql_value(values[c]) for c in cols] + [_sql_value(row_key)],
+                )
+            for row in added:
+                cols = [c for c in columns if c in row]
+                conn.execute(
+                    f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in cols)}) VALUES ({', '.join('?' for _ in cols)})",
+                    [_sql_value(row[c]) for c in cols],
+                )
+
+
+
+if __name__ == "__main__":
+    # python -m logbook.db  -> re-run the migration from the files
+    with connection() as conn:
+        migrate(conn, force=True)
+        for name, source, count, _ in conn.execute("SELECT * FROM _migrations ORDER BY name"):
+            print(f"{name:<24} {count:>6} rows  <- {source}")
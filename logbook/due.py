@@ -0,0 +1,97 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from logbook import config, data
+
+# Due-date status shared by the equipment and training pages. Days to due are
+# bucketed in one pd.cut over the whole column:
+#
+#   Expired   due before today
+#   Urgent    due within URGENT_DAYS
+#   Incoming  due within INCOMING_DAYS
+#   Other     later
+#
+# For "what's due in the next N days" a table's due dates are kept sorted
+# (with the row keys in the same order) and answered by binary search. The
+# index is rebuilt only when the table changes.
+URGENT_DAYS = config.URGENT_DAYS
+INCOMING_DAYS = config.INCOMING_DAYS
+STATUSES = ["Expired", "Urgent", "Incoming", "Other"]
+
+# dates: sorted datetime64[ns] array; keys: row key (or position) per date
+DueIndex = namedtuple("DueIndex", ["dates", "keys"])
+
+_indexes = {}  # (table, column, key) -> (source signature, DueIndex)
+_lock = threading.Lock()
+
+
+def _today(today=None):
+    return pd.Timestamp(today if today is not None else pd.Timestamp.now()).normalize()
+
+
+# --- Whole-column status ---
+def days_to_due(dates, today=None):
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+    return (dates - _today(today)).dt.days
+
+
+def statuses(dates, today=None):
+    """Categorical status per date (NaN where the date is missing)."""
+    days = days_to_due(dates, today)
+    bins = [-np.inf, -1, URGENT_DAYS, INCOMING_DAYS, np.inf]
+    return pd.cut(days, bins=bins, labels=STATUSES)
+
+
+def status_counts(dates, today=None, include=("Urgent", "Incoming", "Expired")):
+    return statuses(dates, today).value_counts().reindex(list(include), fill_value=0)
+
+
+def month_counts(dates):
+    """Due dates per calendar month, in date order, labelled like "Jul 2025"."""
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce").dropna()
+    counts = dates.dt.to_period("M").value_counts().sort_index()
+    return pd.Series(counts.to_numpy(), index=counts.index.strftime("%b %Y"))
+
+
+# --- Sorted due-date index ---
+def build_index(dates, keys=None):
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+    keys = np.arange(len(dates)) if keys is None else np.asarray(keys)
+    valid = dates.notna().to_numpy()
+    values = dates.to_numpy(dtype="datetime64[ns]")[valid]
+    order = np.argsort(values, kind="stable")
+    return DueIndex(values[order], keys[valid][order])
+
+
+def between(index, start, end):
+    """Keys of rows due in [start, end)."""
+    lo = np.searchsorted(index.dates, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+    hi = np.searchsorted(index.dates, np.datetime64(pd.Timestamp(end), "ns"), side="left")
+    return index.keys[lo:hi]
+
+
+def due_within(index, days, today=None):
+    """Keys of rows due from today through today + days."""
+    today = _today(today)
+    return between(index, today, today + pd.Timedelta(days=days + 1))
+
+
+def table_index(table, column="Due date", key=None):
+    """The index for one table's date column, rebuilt when the table changes.
+
+    Keys are the key column's values, or row positions when key is None.
+    """
+    source = data.source_signature(table)
+    cache_key = (table, column, key)
+    with _lock:
+        entry = _indexes.get(cache_key)
+        if entry is not None and entry[0] == source:
+            return entry[1]
+    rows = data.view(table, columns=[column] + ([key] if key else []))
+    index = build_index(rows[column], rows[key].to_numpy() if key else None)
+    with _lock:
+        _indexes[cache_key] = (source, index)
+    return index
@@ -0,0 +1,64 @@
+import pandas as pd
+
+# st.data_editor keeps the user's edits in st.session_state[<editor key>] as
+#   {"edited_rows": {position: {column: value}}, "added_rows": [{column: value}],
+#    "deleted_rows": [position]}
+# where positions index the frame that was passed in. change_set() turns that
+# into a data.apply_changes() change set addressed by row key.
+#
+# The frame is reloaded on every rerun, and another session may add, delete
+# or reorder rows between an edit and its Save. So the row keys an editor
+# showed are kept in the session from the draw where its edits began
+# (shown_keys()), and positions are mapped through those. The editor's
+# widget key (editor_key()) changes with what it shows (filters, page) and
+# after every save (saved()), so edits are never replayed onto other rows.
+PENDING = ("edited_rows", "added_rows", "deleted_rows")
+
+
+def editor_key(session, name, *scope):
+    """Widget key for an editor showing one scope (filters, sort, page)."""
+    version = session.get(f"{name}:version", 0)
+    return f"{name}:{version}:{scope!r}"
+
+
+def shown_keys(session, widget_key, shown, key):
+    """Row keys of the frame an editor shows, in display order, as of the
+    draw where its pending edits began."""
+    pending = session.get(widget_key) or {}
+    stored = f"{widget_key}:keys"
+    if stored not in session or not any(pending.get(p) for p in PENDING):
+        session[stored] = shown[key].tolist()
+    return session[stored]
+
+
+def saved(session, name, widget_key):
+    """Start a fresh editor after its changes were written."""
+    session.pop(f"{widget_key}:keys", None)
+    session[f"{name}:version"] = session.get(f"{name}:version", 0) + 1
+
+
+def _clean(values, key, date_columns):
+    out = {}
+    for col, value in values.items():
+        if col == key or col.startswith("_"):
+            continue
+        if col in date_columns:
+            value = pd.to_datetime(value, errors="coerce")
+            value = "" if pd.isna(value) else value.strftime("%Y-%m-%d")
+        out[col] = value
+    return out
+
+
+def change_set(keys, state, key, date_columns=()):
+    """Change set from an editor's session state; keys are the row keys it
+    showed, by position (see shown_keys())."""
+    state = state or {}
+    return {
+        "added": [_clean(row, key, date_columns) for row in state.get("added_rows", [])],
+        "edited": {keys[int(pos)]: _clean(values, key, date_columns) for pos, values in state.get("edited_rows", {}).items()},
+        "deleted": [keys[int(pos)] for pos in state.get("deleted_rows", [])],
+    }
+
+
+def summary(changes):
+    return f"{len(changes['added'])} added, {len(changes['edited'])} edited, {len(changes['deleted'])} deleted"
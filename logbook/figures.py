@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from logbook import config, data
+
+# Plotly figures shared by every Streamlit session in the process, stored as
+# figure JSON. A figure is keyed by its chart id, the data version of the
+# tables it is drawn from (data.source_signature) and the filter selections
+# it was drawn for. A rerun caused by an unrelated widget, or another session
+# looking at the same selections, gets the stored figure back without
+# re-aggregating or calling plotly express; any write to one of the tables
+# changes the key.
+#
+# Charts that depend on the date (due in N days, pending after today) pass
+# today as one of their filters. Entries are evicted least recently used
+# once they total more than config.FIGURE_CACHE_BYTES.
+_figures = OrderedDict()  # (chart, data version, filters) -> figure JSON
+_cached_bytes = 0
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0}
+
+
+def figure(chart, tables, build, **filters):
+    """The figure build() makes for these filters, rebuilt only when one of
+    tables changes. build() does the aggregation too and may return None
+    (nothing to plot), which isn't cached."""
+    global _cached_bytes
+    key = (chart, tuple(data.source_signature(t) for t in tables), tuple(sorted(filters.items())))
+    with _lock:
+        text = _figures.get(key)
+        if text is not None:
+            _figures.move_to_end(key)
+            stats["hits"] += 1
+    if text is not None:
+        return pio.from_json(text)
+    stats["misses"] += 1
+    fig = build()
+    if fig is None:
+        return None
+    text = fig.to_json()
+    if len(text) > config.FIGURE_CACHE_BYTES:
+        return fig
+    with _lock:
+        if key not in _figures:
+            _figures[key] = text
+            _cached_bytes += len(text)
+        while _cached_bytes > config.FIGURE_CACHE_BYTES:
+            _, evicted = _figures.popitem(last=False)
+            _cached_bytes -= len(evicted)
+    return fig
+
+
+def clear():
+    global _cached_bytes
+    with _lock:
+        _figures.clear()
+        _cached_bytes = 0
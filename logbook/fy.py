@@ -0,0 +1,42 @@
+import pandas as pd
+
+# Financial years run April-March and are labelled "2025-2026". Everything
+# here works on whole Series at once; categorical input is evaluated on its
+# categories only, and integer input is read as YYYYMMDD.
+START_MONTH = 4
+
+
+def label(start_year):
+    return f"{start_year}-{start_year + 1}"
+
+
+def start_years(dates):
+    """FY start year for each date (nullable Int64; missing/invalid -> <NA>)."""
+    dates = pd.Series(dates)
+    if isinstance(dates.dtype, pd.CategoricalDtype):
+        by_category = start_years(pd.Series(dates.cat.categories))
+        return pd.Series(by_category.to_numpy()[dates.cat.codes], index=dates.index, dtype="Int64").where(dates.cat.codes >= 0)
+    if pd.api.types.is_integer_dtype(dates):
+        years, months = dates // 10000, dates // 100 % 100
+    else:
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce")
+        years, months = dates.dt.year, dates.dt.month
+    return (years - (months < START_MONTH)).astype("Int64")
+
+
+def labels(dates):
+    """FY label for each date as a categorical Series (NaN where the date is invalid)."""
+    years = start_years(dates)
+    uniques = sorted(int(y) for y in years.dropna().unique())
+    names = [label(y) for y in uniques]
+    codes = years.map(dict(zip(uniques, range(len(uniques))))).fillna(-1).astype(int)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=names), index=years.index)
+
+
+def of(value):
+    """FY label for a single date, or None."""
+    ts = pd.to_datetime(value, errors="coerce")
+    if pd.isna(ts):
+        return None
+    return label(ts.year if ts.month >= START_MONTH else ts.year - 1)
@@ -0,0 +1,272 @@
+import multiprocessing
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import pandas as pd
+
+from logbook import alerts, attendance, config, data, locking, schema, settings
+
+# Onboarding a plant's Confined Space workbook (data/raw/1.Confined Space.xlsx)
+# into the logbook tables. Every form sheet starts with a title row, an
+# optional "Date" row and an "SN" header row; FORMS maps each title to the
+# table it feeds. Sheets without a known title (notes, project lists) are
+# skipped.
+#
+# Each sheet is streamed with openpyxl in read-only mode and upserted in
+# chunks of CHUNK_ROWS, so memory stays bounded by one chunk whatever the
+# sheet size. Sheets run in parallel worker processes; sheets feeding the
+# same table take turns on its write lock.
+#
+# Imports are idempotent. A row whose natural key (NATURAL_KEYS) matches an
+# existing row updates it, and only its non-blank cells that differ, so
+# importing the same workbook twice changes nothing. Attendance has no row
+# key to update by: a member's day that is already recorded is left as is.
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+WORKBOOK = os.path.join("data", "raw", "1.Confined Space.xlsx")
+CHUNK_ROWS = 500
+
+# table: sheet header -> table column (headers compared by _normalize);
+# fixed: values every row gets; required: table columns a row must fill
+Form = namedtuple("Form", ["table", "columns", "fixed", "required"])
+AUDIT_COLUMNS = {
+    "Point": "Point",
+    "Area": "Area",
+    "Department": "Department",
+    "Responsibility": "Responsibility",
+    "Target date": "Target date",
+    "Status(Done/Pending)": "Status (Done/Pending)",
+    "Remarks": "Remarks",
+}
+FORMS = {
+    "Attendance of Task force members": Form("attendance", {"Name of the Member": "Name", "Status(Present/Absent)": "Status"}, {}, ["Name", "Status"]),
+    "MoM": Form(
+        "meetings",
+        {
+            "Point of discussion": "Point of discussion",
+            "Severity(High/Low)": "Severity (High/Low)",
+            "Responsibility": "Responsibility",
+            "Target date": "Target date",
+            "Status(Done/ Pending)": "Status (Done/Pending)",
+            "Remarks": "Remarks",
+        },
+        {},
+        ["Point of discussion"],
+    ),
+    "Training Record of PA, AO & AA for Confined Space": Form("training", {"Name": "Name", "Training date": "Training date", "Due date": "Due date"}, {}, ["Name"]),
+    "Entrant Attendant Card details": Form(
+        "training",
+        {"Name": "Name", "Role(Entrant/Attendant)": "Role", "Training date": "Training date", "Due date": "Due date", "Agency": "Agency"},
+        {},
+        ["Name"],
+    ),
+    "Status of L1 Audit": Form("audit", AUDIT_COLUMNS, {"Audit Level": "L1"}, ["Point"]),
+    "Status of L2 Audit": Form("audit", AUDIT_COLUMNS, {"Audit Level": "L2"}, ["Point"]),
+    "Status of L3 Audit": Form("audit", AUDIT_COLUMNS, {"Audit Level": "L3"}, ["Point"]),
+    "Status of Monthly Audit Points": Form("audit", AUDIT_COLUMNS, {"Audit Level": "Monthly Audit"}, ["Point"]),
+    "Details of gas testing equipment": Form("equipment", {"SN": "SN", "Equipment name": "Equipment name", "Test date": "Test date ", "Due date": "Due date"}, {}, ["SN", "Equipment name"]),
+}
+# Columns identifying the same record across imports
+NATURAL_KEYS = {
+    "meetings": ["Team Name", "Point of discussion"],
+    "attendance": ["Date", "Member ID"],
+    "training": ["Name", "Role"],
+    "audit": ["Audit Level", "Point", "Area"],
+    "equipment": ["SN"],
+}
+# Drop-down columns, stored capitalised ("pending" -> "Pending")
+CHOICE_COLUMNS = {"Status", "Status (Done/Pending)", "Severity (High/Low)"}
+
+
+# --- Cells ---
+def _normalize(text):
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+def _blank(value):
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    return bool(pd.isna(value))
+
+
+def _cell(table, column, value):
+    if _blank(value):
+        return None
+    if column in config.DATE_COLUMNS.get(table, ()):
+        value = pd.to_datetime(value, errors="coerce")
+        return None if pd.isna(value) else value.normalize()
+    if isinstance(value, str):
+        value = value.strip()
+        return value.capitalize() if column in CHOICE_COLUMNS else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _identity(row, columns):
+    # Comparable form of a row's natural key: dates as days, numbers as
+    # floats, text without case or surrounding spaces
+    out = []
+    for col in columns:
+        value = row.get(col)
+        if _blank(value):
+            out.append(None)
+        elif isinstance(value, (datetime, date)):
+            out.append(pd.Timestamp(value).normalize())
+        elif not isinstance(value, str) and not pd.isna(pd.to_numeric(value, errors="coerce")):
+            out.append(float(value))
+        else:
+            out.append(_normalize(value))
+    return tuple(out)
+
+
+def _same(a, b):
+    if _blank(a) or _blank(b):
+        return _blank(a) and _blank(b)
+    return _identity({"v": a}, ["v"]) == _identity({"v": b}, ["v"])
+
+
+# --- Upserts ---
+def upsert(table, records, scope=None):
+    """Insert records, or update the existing row with the same natural key.
+
+    scope: equality filters every record satisfies (e.g. its Audit Level),
+    so only that part of the table is read. Returns (added, updated).
+    """
+    on = NATURAL_KEYS[table]
+    key = schema.key_column(table)
+    with locking.lock(config.table_path(table)):  # the table's write lock, across lookup and write
+        existing = data.load(table, filters=scope or None)
+        index = {_identity(row, on): row for row in existing.to_dict("records")}
+        added, edited = [], {}
+        for record in records:
+            identity = _identity(record, on)
+            current = index.get(identity)
+            if current is None:
+                added.append(record)
+                index[identity] = record
+            elif key is None or current.get(key) is None:
+                # Not addressable by key: a repeat within this import, or an
+                # attendance row already recorded
+                if any(r is current for r in added):
+                    current.update({c: v for c, v in record.items() if not _blank(v)})
+            else:
+                changes = {c: v for c, v in record.items() if not _blank(v) and not _same(v, current.get(c))}
+                if changes:
+                    edited.setdefault(int(current[key]), {}).update(changes)
+        if key is None:
+            data.append(table, added)
+        elif added or edited:
+            data.apply_changes(table, added=added, edited=edited)
+    return len(added), len(edited)
+
+
+# --- Sheets ---
+def _preamble(rows):
+    """Read up to the header row: (Form, date from a "Date" row, normalised headers)."""
+    form, day = None, None
+    forms = {_normalize(title): f for title, f in FORMS.items()}
+    for values in rows:
+        cells = [v for v in values if not _blank(v)]
+        if not cells:
+            continue
+        first = _normalize(cells[0])
+        if form is None:
+            form = forms.get(first)
+            if form is None:
+                return None, None, None  # not a form sheet
+        elif first == "sn":
+            return form, day, [_normalize(v) if not _blank(v) else None for v in values]
+        elif first == "date" and len(cells) > 1:
+            day = cells[1]
+    return None, None, None
+
+
+def ingest_sheet(path, sheet, team):
+    """Stream one sheet into its table; returns a summary dict, or None for
+    a sheet that isn't a form."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet].iter_rows(values_only=True)
+        form, day, header = _preamble(rows)
+        if form is None:
+            return None
+        columns = {_normalize(h): c for h, c in form.columns.items()}
+        positions = [(i, columns[h]) for i, h in enumerate(header) if h in columns]
+        summary = {"sheet": sheet.strip(), "table": form.table, "added": 0, "updated": 0, "skipped": 0}
+        if form.table == "attendance" and _cell("attendance", "Date", day) is None:
+            summary["skipped"] = sum(1 for values in rows if any(not _blank(v) for v in values))
+            return summary  # no meeting date to record the day under
+
+        # Every row of the sheet shares these values; upserts read only the matching rows
+        scope = dict(form.fixed)
+        if form.table == "meetings":
+            scope["Team Name"] = team
+        elif form.table == "attendance":
+            scope["Date"] = _cell("attendance", "Date", day)
+
+        def flush(chunk):
+            if form.table == "attendance":
+                ids = attendance.member_ids(team, [r["Name"] for r in chunk])
+                chunk = [{"Date": r["Date"], "Status": r["Status"], attendance.MEMBER_ID: ids[r["Name"]]} for r in chunk if r["Name"] in ids]
+            added, updated = upsert(form.table, chunk, scope=scope)
+            summary["added"] += added
+            summary["updated"] += updated
+
+        chunk = []
+        for values in rows:
+            if all(_blank(v) for v in values):
+                continue
+            record = {col: _cell(form.table, col, values[i] if i < len(values) else None) for i, col in positions}
+            if any(record.get(col) is None for col in form.required):
+                summary["skipped"] += 1
+                continue
+            record.update(scope)
+            chunk.append(record)
+            if len(chunk) >= CHUNK_ROWS:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+        return summary
+    finally:
+        workbook.close()
+
+
+def ingest(path=WORKBOOK, team=None, workers=None):
+    """Import every form sheet of a workbook for a team (the Team Name its
+    meetings and members are recorded under); returns one summary per sheet."""
+    if load_workbook is None:
+        raise RuntimeError("Workbook import needs the openpyxl package")
+    if not team:
+        raise ValueError("A team name is required")
+    workbook = load_workbook(path, read_only=True)
+    sheets = workbook.sheetnames
+    workbook.close()
+    attendance.migrate_legacy()  # before any worker appends to the log
+    workers = workers or min(len(sheets), os.cpu_count() or 1)
+    # spawn: forking a process that runs Streamlit's threads isn't safe. The
+    # workers start from the settings file, so hand them this process's settings.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=settings.apply, initargs=(settings.current(),)) as pool:
+        futures = [pool.submit(ingest_sheet, path, sheet, team) for sheet in sheets]
+        summaries = [f.result() for f in futures]
+    alerts.reload()  # the workers' writes bypassed this process's alert queue
+    return [s for s in summaries if s is not None]
+
+
+# python -m logbook.ingest "Team Name" [workbook]
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit('usage: python -m logbook.ingest "Team Name" [workbook]')
+    for s in ingest(sys.argv[2] if len(sys.argv) > 2 else WORKBOOK, team=sys.argv[1]):
+        print(f"{s['sheet']:<12} -> {s['table']:<10} added {s['added']:>5}  updated {s['updated']:>5}  skipped {s['skipped']:>5}")
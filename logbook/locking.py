@@ -0,0 +1,163 @@
+import contextlib
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+# Write coordination for the files under the data folder, shared by every
+# Streamlit session thread and every process (app, scripts, SQLite builder).
+#
+#   lock(path)         advisory lock on path + ".lock"; held around the whole
+#                      read-modify-write so concurrent writers queue instead of
+#                      overwriting each other. Reentrant within a thread.
+#   replacing(path)    yields a temp path next to path; once written it is
+#                      fsynced and renamed over path, so readers and crashes
+#                      see either the old file or the new one, never a
+#                      truncated mix. The new file keeps the mode of the
+#                      one it replaces (a new file gets 0666 less the umask,
+#                      as open() would give it, not mkstemp's 0600).
+#
+# Waiting for a lock backs off exponentially (with jitter) up to
+# MAX_BACKOFF between attempts and gives up with TimeoutError after TIMEOUT.
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_SUFFIX = ".lock"
+TIMEOUT = 30.0
+MAX_BACKOFF = 0.5
+
+_thread_locks = {}  # absolute path -> threading.RLock
+_registry_lock = threading.Lock()
+_held = threading.local()  # .fds: absolute path -> [fd, depth]
+_UMASK = os.umask(0)  # read once: os.umask can only be read by setting it
+os.umask(_UMASK)
+
+
+# --- Locks ---
+def _try_lock(fd):
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _acquire_file(lock_path, deadline):
+    folder = os.path.dirname(lock_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    delay = 0.005
+    while not _try_lock(fd):
+        if time.monotonic() >= deadline:
+            os.close(fd)
+            raise TimeoutError(f"Timed out waiting for {lock_path}")
+        time.sleep(delay * random.uniform(0.5, 1.5))
+        delay = min(delay * 2, MAX_BACKOFF)
+    return fd
+
+
+def _fds():
+    if not hasattr(_held, "fds"):
+        _held.fds = {}
+    return _held.fds
+
+
+@contextlib.contextmanager
+def lock(path, timeout=TIMEOUT):
+    """Hold the write lock of path for the duration of the block."""
+    key = os.path.abspath(path)
+    deadline = time.monotonic() + timeout
+    with _registry_lock:
+        thread_lock = _thread_locks.setdefault(key, threading.RLock())
+    # Other threads of this process wait here; the file lock covers other processes
+    if not thread_lock.acquire(timeout=timeout):
+        raise TimeoutError(f"Timed out waiting for {key}{LOCK_SUFFIX}")
+    try:
+        fds = _fds()
+        if key in fds:
+            fds[key][1] += 1
+        else:
+            fds[key] = [_acquire_file(key + LOCK_SUFFIX, deadline), 1]
+        try:
+            yield
+        finally:
+            fds[key][1] -= 1
+            if fds[key][1] == 0:
+                fd = fds.pop(key)[0]
+                _unlock(fd)
+                os.close(fd)
+    finally:
+        thread_lock.release()
+
+
+# --- Atomic replacement ---
+def fsync_dir(folder):
+    """Persist a rename in folder (a no-op where directories can't be opened)."""
+    try:
+        fd = os.open(folder or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def fsync_file(path):
+    with open(path, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+@contextlib.contextmanager
+def replacing(path):
+    """Yield a temp path (same folder and extension) that replaces path on success."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    name = os.path.basename(path)
+    fd, tmp_path = tempfile.mkstemp(dir=folder or ".", prefix=f".{name}.", suffix=".tmp" + os.path.splitext(name)[1])
+    os.close(fd)
+    try:
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        yield tmp_path
+        fsync_file(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    fsync_dir(folder)
+
+
+def write_csv(path, df):
+    with replacing(path) as tmp_path:
+        df.to_csv(tmp_path, index=False)
+
+
+def write_text(path, text):
+    with replacing(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
@@ -0,0 +1,167 @@
+import glob
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from logbook import config
+
+# Parquet copies of the Excel workbooks. openpyxl parsing is the slowest I/O
+# the app does, so each sheet that gets read is also written to
+# MIRROR_DIR/<workbook>__<sheet>.parquet together with the workbook's
+# (mtime, size). Later reads are served from the mirror, optionally only the
+# requested columns, until the workbook changes (storage.compact() rewriting
+# it included). A background thread refreshes stale mirrors so the parse
+# usually happens off the page's path.
+#
+# Password columns (config.PASSWORD_HEADERS) are never written to a mirror;
+# a read that asks for one goes to the workbook.
+#
+# Parquet support comes from pyarrow; without it every read goes straight to
+# the workbook.
+_lock = threading.Lock()
+_watcher = None
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+
+def _sheet_key(sheet_name):
+    return "first" if sheet_name in (0, None) else str(sheet_name)
+
+
+def mirror_path(path, sheet_name=0):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(config.MIRROR_DIR, f"{stem}__{_sheet_key(sheet_name)}.parquet")
+
+
+def _signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _meta_path(target):
+    return target + ".json"
+
+
+def _fresh_meta(path, target):
+    """The mirror's metadata if it is current, else None. Mirrors from before
+    password columns were withheld count as stale."""
+    try:
+        with open(_meta_path(target), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["source"] == _signature(path) and "withheld" in meta and os.path.exists(target):
+            return meta
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return None
+
+
+def _is_fresh(path, target):
+    return _fresh_meta(path, target) is not None
+
+
+def _to_parquet(df, target):
+    tmp_path = target + ".tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except (TypeError, ValueError):
+        # Mixed-type object columns (numbers and text typed into one Excel
+        # column) can't be stored by Arrow; keep them as text instead.
+        text = {c: df[c].astype("string") for c in df.columns if df[c].dtype == object}
+        df.assign(**text).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, target)
+
+
+def refresh(path, sheet_name=0):
+    """Parse one sheet and (re)write its mirror; returns the parsed frame."""
+    target = mirror_path(path, sheet_name)
+    signature = _signature(path)
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    if not HAVE_ARROW:
+        return df
+    withheld = [str(c) for c in config.password_columns(df.columns)]
+    os.makedirs(config.MIRROR_DIR, exist_ok=True)
+    with _lock:
+        try:
+            _to_parquet(df.drop(columns=withheld), target)
+        except Exception:
+            return df  # the workbook stays readable; just no mirror for it
+        with open(_meta_path(target), "w", encoding="utf-8") as f:
+            json.dump({"source": signature, "workbook": path, "sheet": _sheet_key(sheet_name), "withheld": withheld}, f)
+    return df
+
+
+def read_workbook(path, columns=None, sheet_name=0, **kwargs):
+    """Read one sheet of a workbook, from its mirror when that is current.
+
+    columns limits what is loaded from the mirror (and passes usecols to
+    openpyxl on a miss). Other keyword arguments disable the mirror since
+    they change what the sheet parses to.
+    """
+    if not HAVE_ARROW or kwargs:
+        return pd.read_excel(path, sheet_name=sheet_name, usecols=columns, **kwargs)
+    start_watcher()
+    target = mirror_path(path, sheet_name)
+    meta = _fresh_meta(path, target)
+    if meta is not None:
+        if meta["withheld"] and (columns is None or any(str(c) in meta["withheld"] for c in columns)):
+            return pd.read_excel(path, sheet_name=sheet_name, usecols=columns)
+        try:
+            return pd.read_parquet(target, columns=columns)
+        except Exception:
+            pass
+    df = refresh(path, sheet_name)
+    return df[columns] if columns is not None else df
+
+
+def workbooks():
+    return sorted(p for p in glob.glob(os.path.join(config.DATA_DIR, "*.xlsx")) if not os.path.basename(p).startswith("~$"))
+
+
+def refresh_stale():
+    """Rebuild the mirror of every workbook sheet whose source changed."""
+    refreshed = []
+    for meta in glob.glob(os.path.join(config.MIRROR_DIR, "*.parquet.json")):
+        try:
+            with open(meta, encoding="utf-8") as f:
+                info = json.load(f)
+        except ValueError:
+            continue
+        path = info.get("workbook")
+        if not path or not os.path.exists(path):
+            continue
+        sheet = 0 if info.get("sheet") == "first" else info.get("sheet")
+        if not _is_fresh(path, mirror_path(path, sheet)):
+            refresh(path, sheet)
+            refreshed.append(mirror_path(path, sheet))
+    for path in workbooks():
+        if not os.path.exists(mirror_path(path)):
+            refresh(path)
+            refreshed.append(mirror_path(path))
+    return refreshed
+
+
+def _watch(interval=None):
+    while True:
+        try:
+            refresh_stale()
+        except Exception:
+            pass  # a half-written workbook is picked up on the next pass
+        time.sleep(interval or config.MIRROR_REFRESH_SECONDS)
+
+
+def start_watcher(interval=None):
+    """Start the background refresh thread once per process."""
+    global _watcher
+    if not HAVE_ARROW or _watcher is not None:
+        return
+    with _lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, args=(interval,), daemon=True, name="logbook-mirror")
+            _watcher.start()
@@ -0,0 +1,137 @@
+import glob
+import itertools
+import os
+import re
+import shutil
+
+import pandas as pd
+
+from logbook import cache, config, locking, schema, storage
+
+# Partitioned tables (config.PARTITIONS) are stored by the file backend as
+# one CSV per combination of partition values, in a folder named after the
+# table's file:
+#
+#   audit_data/L1/2025-2026.csv
+#   audit_data/Monthly_Audit/2024-2025.csv
+#
+# Values become folder/file names through _slug() (blank ones go to BLANK).
+# Rows keep their values, so readers pick files by slug and still filter the
+# rows. An append touches one file and a merge rewrites only the files that
+# change. A table's old single file is split into partitions the first time
+# the table is used, and is left in place.
+BLANK = "_none"
+
+
+def partitioned(table):
+    return table in config.PARTITIONS
+
+
+def columns(table):
+    return config.PARTITIONS[table]
+
+
+def directory(table):
+    return os.path.splitext(config.table_path(table))[0]
+
+
+def _slug(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return BLANK
+    return re.sub(r"[^\w.-]+", "_", str(value).strip()).strip("._") or BLANK
+
+
+def path(table, values, root=None):
+    """The file holding rows with these partition values."""
+    parts = [_slug(v) for v in values]
+    return os.path.join(root or directory(table), *parts[:-1], parts[-1] + ".csv")
+
+
+# --- Finding partitions ---
+def files(table, filters=None):
+    """Partition files that can hold rows matching equality filters (a value
+    or a list of values) on the partition columns, in path order."""
+    migrate(table)
+    choices = []
+    for col in columns(table):
+        value = (filters or {}).get(col)
+        if value is None:
+            choices.append(["*"])
+        elif isinstance(value, (list, tuple, set)):
+            choices.append(sorted({glob.escape(_slug(v)) for v in value}))
+        else:
+            choices.append([glob.escape(_slug(value))])
+    found = set()
+    for combo in itertools.product(*choices):
+        found.update(glob.glob(os.path.join(directory(table), *combo[:-1], combo[-1] + ".csv")))
+    return sorted(found)
+
+
+def signature(table):
+    """Changes whenever a partition file is written, added or removed."""
+    migrate(table)
+    paths = []
+    for root, dirs, names in os.walk(directory(table)):
+        dirs.sort()
+        paths.append(root)  # its mtime moves when a file is added or removed
+        paths += [os.path.join(root, n) for n in sorted(names) if n.endswith(".csv") and not n.startswith(".")]
+    return cache.signature(paths)
+
+
+# --- Splitting rows ---
+def split_rows(table, rows):
+    """{partition file: [row dicts]}"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(path(table, [row.get(c) for c in columns(table)]), []).append(row)
+    return groups
+
+
+def split_frame(table, df, root=None):
+    """{partition file: DataFrame of its rows}"""
+    if df.empty:
+        return {}
+    slugs = {col: df[col].astype(object).map(_slug) for col in columns(table)}
+    paths = pd.Series(
+        [os.path.join(root or directory(table), *parts[:-1], parts[-1] + ".csv") for parts in zip(*slugs.values())],
+        index=df.index,
+    )
+    return {p: group for p, group in df.groupby(paths, sort=True)}
+
+
+# --- Writes ---
+def write(table, df, replace=(), root=None):
+    """Write df's rows to their partition files, each replaced atomically.
+    Files in replace that df has no rows for are removed. Caller holds the
+    table's write lock."""
+    groups = split_frame(table, df, root)
+    for p, group in groups.items():
+        locking.write_csv(p, schema.stored(table, group))
+        cache.invalidate(p)
+    for p in set(replace) - set(groups):
+        with locking.lock(p):
+            if os.path.exists(p):
+                os.remove(p)
+        cache.invalidate(p)
+    return sorted(groups)
+
+
+def migrate(table):
+    """Split the table's single file into partitions, once.
+
+    The partitions are written to a temporary folder that is renamed into
+    place, so readers never see half a table.
+    """
+    legacy = config.table_path(table)
+    if os.path.isdir(directory(table)) or not os.path.exists(legacy):
+        return
+    with locking.lock(legacy):  # the table's write lock
+        if os.path.isdir(directory(table)):
+            return  # another process migrated it while we waited
+        df = schema.prepare(table, storage.read_table(legacy))
+        tmp_dir = f"{directory(table)}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        write(table, schema.typed(table, df), root=tmp_dir)
+        os.rename(tmp_dir, directory(table))
+        locking.fsync_dir(os.path.dirname(directory(table)))
@@ -0,0 +1,238 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from logbook import attendance, config, data, due, locking
+
+# Reports for the Reports page. Each report is a function returning
+# {sheet name: DataFrame}; render() writes that as a multi-sheet workbook, a
+# zip of CSVs or a PDF of tables.
+#
+# Rendering runs in a process pool so a large export never blocks a
+# Streamlit script thread. Outputs are cached in REPORT_DIR under a name
+# hashed from the report, format, parameters and the source signature of
+# every table the report reads: asking again before the data changes
+# returns the finished file without a new job.
+#
+# PDF output uses fpdf2 when it is installed.
+try:
+    from fpdf import FPDF
+except ImportError:
+    FPDF = None
+
+EXTENSIONS = {"xlsx": "xlsx", "csv": "zip", "pdf": "pdf"}
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "application/zip",
+    "pdf": "application/pdf",
+}
+MAX_OUTPUTS = 50  # cached files kept in REPORT_DIR
+
+_jobs = {}  # job id -> {"report", "format", "params", "path", "future", "submitted"}
+_pool = None
+_lock = threading.Lock()
+
+
+# --- Reports ---
+def _status(series):
+    return series.astype(str).str.strip().str.lower()
+
+
+def meeting_closure(fy=None):
+    df = data.load("meetings", filters={"FY": fy} if fy else None, columns=["FY", "Team Name", "Status (Done/Pending)"])
+    df = df.assign(Done=_status(df["Status (Done/Pending)"]).eq("done"), Pending=_status(df["Status (Done/Pending)"]).eq("pending"))
+    sheets = {}
+    for name, keys in (("By FY", ["FY"]), ("By team", ["FY", "Team Name"])):
+        out = df.groupby(keys, observed=True).agg(Points=("Done", "size"), Done=("Done", "sum"), Pending=("Pending", "sum"))
+        out["Closure %"] = (100 * out["Done"] / out["Points"]).round(1)
+        sheets[name] = out.reset_index()
+    return sheets
+
+
+def attendance_percentage(fy=None):
+    log = attendance.load_long(filters={"FY": fy} if fy else None)
+    log = log.assign(Present=_status(log["Status"]).eq("present"))
+    sheets = {}
+    for name, keys in (("By team", ["Team Name"]), ("By member", ["Team Name", "Name"])):
+        out = log.groupby(keys, observed=True).agg(Days=("Present", "size"), Present=("Present", "sum"))
+        out["Attendance %"] = (100 * out["Present"] / out["Days"]).round(1)
+        sheets[name] = out.reset_index()
+    return sheets
+
+
+def audit_pending():
+    df = data.load("audit")
+    pending = df[_status(df["Status (Done/Pending)"]).eq("pending")]
+    by_level = pending.groupby("Audit Level", observed=True).size().rename("Pending").reset_index()
+    by_department = pending.groupby(["Audit Level", "Department"], observed=True).size().rename("Pending").reset_index()
+    return {"By level": by_level, "By department": by_department, "Pending points": pending.sort_values(["Audit Level", "Target date"])}
+
+
+def compliance():
+    sheets, summary = {}, []
+    for table, title in (("equipment", "Equipment"), ("training", "Training")):
+        df = data.load(table).drop(columns=["Certificate Link", "Certificate SHA256"], errors="ignore")
+        df = df.assign(**{"Days to due": due.days_to_due(df["Due date"]).to_numpy(), "Due status": due.statuses(df["Due date"]).to_numpy()})
+        counts = df["Due status"].value_counts().reindex(due.STATUSES, fill_value=0)
+        summary.append({"Register": title, **counts.to_dict(), "Compliant %": round(100 * counts["Other"] / max(counts.sum(), 1), 1)})
+        attention = df[df["Due status"].isin(["Expired", "Urgent", "Incoming"])]
+        sheets[f"{title} attention"] = attention.sort_values("Due date")
+    return {"Summary": pd.DataFrame(summary), **sheets}
+
+
+# name -> (title, builder, tables read, takes an FY)
+REPORTS = {
+    "meeting_closure": ("FY-wise meeting closure", meeting_closure, ["meetings"], True),
+    "attendance": ("Attendance % per team and member", attendance_percentage, ["attendance", "members"], True),
+    "audit_pending": ("Audit points pending by level", audit_pending, ["audit"], False),
+    "compliance": ("Equipment and training compliance", compliance, ["equipment", "training"], False),
+}
+
+
+# --- Rendering (runs in the worker processes) ---
+def _write_pdf(sheets, path, title):
+    pdf = FPDF(orientation="L")
+    pdf.set_auto_page_break(True, margin=10)
+
+    def text(value):
+        value = "" if value is None or (not isinstance(value, str) and pd.isna(value)) else str(value)
+        return value.encode("latin-1", "replace").decode("latin-1")
+
+    for name, df in sheets.items():
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 8, text(f"{title} - {name}"), new_x="LMARGIN", new_y="NEXT")
+        width = pdf.epw / max(len(df.columns), 1)
+        chars = max(int(width / 1.6), 4)
+        pdf.set_font("Helvetica", "B", 7)
+        for col in df.columns:
+            pdf.cell(width, 6, text(col)[:chars], border=1)
+        pdf.ln()
+        pdf.set_font("Helvetica", "", 7)
+        for row in df.itertuples(index=False, name=None):
+            for value in row:
+                if isinstance(value, pd.Timestamp):
+                    value = value.strftime("%Y-%m-%d")
+                pdf.cell(width, 5, text(value)[:chars], border=1)
+            pdf.ln()
+    pdf.output(path)
+
+
+def render(report, fmt, params, path):
+    """Build a report and write it to path; returns path."""
+    title, build = REPORTS[report][:2]
+    sheets = build(**(params or {}))
+    with locking.replacing(path) as tmp_path:
+        if fmt == "xlsx":
+            with pd.ExcelWriter(tmp_path, engine="openpyxl") as writer:
+                for name, df in sheets.items():
+                    df.to_excel(writer, sheet_name=name[:31], index=False)
+        elif fmt == "csv":
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                for name, df in sheets.items():
+                    buffer = io.StringIO()
+                    df.to_csv(buffer, index=False)
+                    archive.writestr(f"{report}_{name.replace(' ', '_').lower()}.csv", buffer.getvalue())
+        elif fmt == "pdf":
+            if FPDF is None:
+                raise RuntimeError("PDF reports need the fpdf2 package")
+            _write_pdf(sheets, tmp_path, title)
+        else:
+            raise ValueError(f"Unknown report format: {fmt}")
+    return path
+
+
+# --- Jobs ---
+def formats():
+    return [f for f in EXTENSIONS if f != "pdf" or FPDF is not None]
+
+
+def output_path(report, fmt, params=None):
+    """Cache file for a report over the current data."""
+    version = [data.source_signature(t) for t in REPORTS[report][2]]
+    digest = hashlib.sha256(json.dumps([report, fmt, params or {}, version], sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return os.path.join(config.REPORT_DIR, f"{report}-{digest}.{EXTENSIONS[fmt]}")
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs Streamlit's threads isn't safe
+        _pool = ProcessPoolExecutor(max_workers=config.REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown():
+    """Retire the worker pool (running jobs still finish); the next job
+    starts a pool of config.REPORT_WORKERS."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _prune():
+    try:
+        names = [os.path.join(config.REPORT_DIR, n) for n in os.listdir(config.REPORT_DIR) if not n.startswith(".")]
+    except FileNotFoundError:
+        return
+    names.sort(key=os.path.getmtime, reverse=True)
+    busy = {job["path"] for job in _jobs.values() if job["future"] is not None and not job["future"].done()}
+    for path in names[MAX_OUTPUTS:]:
+        if path not in busy:
+            os.remove(path)
+
+
+def submit(report, fmt, params=None):
+    """Queue a report and return its job id; a cached output is reused."""
+    path = output_path(report, fmt, params)
+    job_id = os.path.basename(path)
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is not None and job["future"] is not None and not job["future"].done():
+            return job_id  # already rendering
+        future = None
+        if not os.path.exists(path):
+            os.makedirs(config.REPORT_DIR, exist_ok=True)
+            _prune()
+            future = _executor().submit(render, report, fmt, params, path)
+        _jobs[job_id] = {"report": report, "format": fmt, "params": params or {}, "path": path, "future": future, "submitted": time.time()}
+    return job_id
+
+
+def status(job_id):
+    """("queued" | "running" | "done" | "failed" | "unknown", error message)."""
+    job = _jobs.get(job_id)
+    if job is None:
+        return "unknown", None
+    future = job["future"]
+    if future is None:
+        return ("done", None) if os.path.exists(job["path"]) else ("failed", "output was removed")
+    if not future.done():
+        return ("running" if future.running() else "queued"), None
+    error = future.exception()
+    return ("failed", str(error)) if error is not None else ("done", None)
+
+
+def job(job_id):
+    return _jobs.get(job_id)
+
+
+def file_name(job_id):
+    job = _jobs[job_id]
+    suffix = f"_{job['params']['fy']}" if job["params"].get("fy") else ""
+    return f"{job['report']}{suffix}.{EXTENSIONS[job['format']]}"
+
+
+def read(job_id):
+    with open(_jobs[job_id]["path"], "rb") as f:
+        return f.read()
@@ -0,0 +1,99 @@
+import pandas as pd
+
+from logbook import config, fy
+
+# Columns the app derives rather than the user typing them (the stored FY
+# label and the integer row key of editable tables), and the declared
+# in-memory dtypes every table is loaded with.
+
+
+def key_column(table):
+    return config.KEY_COLUMNS.get(table)
+
+
+def with_keys(table, df, start=None):
+    """Give every row an integer key, keeping the ones it already has.
+
+    New keys continue from start (or the current maximum) so a key is
+    never reused within a table.
+    """
+    key = key_column(table)
+    if key is None:
+        return df
+    df = df.copy()
+    if key not in df.columns:
+        df.insert(0, key, pd.NA)
+    ids = pd.to_numeric(df[key], errors="coerce")
+    missing = ids.isna()
+    if missing.any():
+        if start is None:
+            start = int(ids.max()) + 1 if ids.notna().any() else 1
+        ids[missing] = range(start, start + int(missing.sum()))
+    df[key] = ids.astype(int)
+    return df
+
+
+def with_fy(table, df):
+    """df with its FY column (re)derived from the table's date column."""
+    source = config.FY_SOURCES.get(table)
+    if source is None or source not in df.columns:
+        return df
+    return df.assign(FY=fy.labels(df[source]).to_numpy())
+
+
+def row_with_fy(table, row):
+    source = config.FY_SOURCES.get(table)
+    if source is None or source not in row:
+        return row
+    return dict(row, FY=fy.of(row.get(source)))
+
+
+def prepare(table, df):
+    """Add any column a table file was written without: derived ones are
+    computed, anything else is left empty."""
+    if key_column(table) and key_column(table) not in df.columns:
+        df = with_keys(table, df)
+    if table in config.FY_SOURCES and "FY" not in df.columns:
+        df = with_fy(table, df)
+    missing = [c for c in config.table_columns(table) if c not in df.columns]
+    if missing:
+        df = df.assign(**{c: pd.NA for c in missing})
+    return df
+
+
+# --- Declared dtypes ---
+def typed(table, df):
+    """df with the table's declared dtypes: categorical text and datetime64
+    dates (config.CATEGORY_COLUMNS / config.DATE_COLUMNS)."""
+    changes = {}
+    for col in config.CATEGORY_COLUMNS.get(table, ()):
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            changes[col] = df[col].astype("category")
+    for col in config.DATE_COLUMNS.get(table, ()):
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            changes[col] = pd.to_datetime(df[col], errors="coerce")
+    return df.assign(**changes) if changes else df
+
+
+def cell(table, column, value):
+    """value converted for assignment into a typed frame's column."""
+    if column in config.DATE_COLUMNS.get(table, ()):
+        return pd.to_datetime(value, errors="coerce")
+    return value
+
+
+def editable(df):
+    """df with categoricals as plain text, for editors and merges that may
+    introduce values outside the current categories."""
+    categorical = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    return df.astype({c: object for c in categorical}) if categorical else df
+
+
+def stored(table, df):
+    """df as written to a CSV file: dates back to YYYY-MM-DD."""
+    changes = {
+        col: df[col].dt.strftime("%Y-%m-%d")
+        for col in config.DATE_COLUMNS.get(table, ())
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col])
+    }
+    return df.assign(**changes) if changes else df
@@ -0,0 +1,153 @@
+import os
+import re
+import sqlite3
+import threading
+
+import pandas as pd
+
+from logbook import config, locking
+
+# Full-text search over meeting (MoM) points and audit points: an SQLite FTS5
+# index in DATA_DIR/search.db, kept next to the tables for either backend. Each row is one
+# document whose rowid encodes (table, key), so data.append()/apply_changes()
+# replace or delete single documents through update(). As with the aggregate
+# store, the index records each table's source signature and a table changed
+# outside the app is reindexed before the next search.
+#
+# Queries match every word as a prefix ("pump lea" finds "pump leakage") and
+# hits are ranked by bm25, with the point text weighted highest.
+SOURCES = {
+    # table -> (key column, {index column: table column})
+    "meetings": ("Row ID", {"point": "Point of discussion", "remarks": "Remarks", "responsibility": "Responsibility", "area": None, "department": "Team Name"}),
+    "audit": ("Row ID", {"point": "Point", "remarks": "Remarks", "responsibility": "Responsibility", "area": "Area", "department": "Department"}),
+}
+FIELDS = ["point", "remarks", "responsibility", "area", "department"]
+WEIGHTS = [4.0, 2.0, 1.5, 1.0, 1.0]
+_TABLE_IDS = {"meetings": 1, "audit": 2}
+
+_conn = None
+_conn_path = None  # the file _conn is open on
+_lock = threading.RLock()
+
+
+def _rowid(table, key):
+    return int(key) * 8 + _TABLE_IDS[table]
+
+
+# --- Index ---
+def _open():
+    global _conn, _conn_path
+    path = os.path.join(config.DATA_DIR, "search.db")
+    if _conn is None or _conn_path != path:
+        if _conn is not None:
+            _conn.close()  # DATA_DIR moved
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=locking.TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(source UNINDEXED, key UNINDEXED, {', '.join(FIELDS)}, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS sources (source TEXT PRIMARY KEY, signature TEXT)")
+        conn.commit()
+        _conn, _conn_path = conn, path
+    return _conn
+
+
+def _text(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    return str(value)
+
+
+def _documents(table, rows):
+    key_col, fields = SOURCES[table]
+    for row in rows:
+        key = pd.to_numeric(row.get(key_col), errors="coerce")
+        if pd.isna(key):
+            continue
+        yield [_rowid(table, key), table, int(key)] + [_text(row.get(col)) if col else "" for col in fields.values()]
+
+
+def _signature(table):
+    from logbook import data
+
+    return repr(data.source_signature(table))
+
+
+def _write(conn, table, rows, deleted=()):
+    ids = [(_rowid(table, k),) for k in deleted if not pd.isna(pd.to_numeric(k, errors="coerce"))]
+    docs = list(_documents(table, rows))
+    conn.executemany("DELETE FROM docs WHERE rowid = ?", ids + [(d[0],) for d in docs])
+    conn.executemany(f"INSERT INTO docs (rowid, source, key, {', '.join(FIELDS)}) VALUES ({', '.join('?' * (3 + len(FIELDS)))})", docs)
+
+
+def rebuild(table):
+    from logbook import data
+
+    key_col, fields = SOURCES[table]
+    with _lock:
+        conn = _open()
+        signature = _signature(table)
+        rows = data.load(table, columns=[key_col] + [c for c in fields.values() if c]).to_dict("records")
+        with conn:
+            conn.execute("DELETE FROM docs WHERE source = ?", (table,))
+            _write(conn, table, rows)
+            conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?)", (table, signature))
+
+
+def update(table, rows=(), deleted=()):
+    """Reindex written rows and drop deleted keys; called after each write."""
+    if table not in SOURCES:
+        return
+    with _lock:
+        conn = _open()
+        if conn.execute("SELECT 1 FROM sources WHERE source = ?", (table,)).fetchone() is None:
+            return  # never indexed; the first search builds it
+        with conn:
+            _write(conn, table, rows, deleted)
+            conn.execute("UPDATE sources SET signature = ? WHERE source = ?", (_signature(table), table))
+
+
+def _ensure_current(tables):
+    with _lock:
+        conn = _open()
+        stored = dict(conn.execute("SELECT source, signature FROM sources"))
+    for table in tables:
+        if stored.get(table) != _signature(table):
+            rebuild(table)
+
+
+# --- Queries ---
+def match_expression(text):
+    """FTS5 query for free text: every word, as a prefix, must match."""
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search(text, tables=None, limit=50):
+    """Best matches as a DataFrame: Source, Row ID, Match, the indexed fields and Score."""
+    tables = list(tables or SOURCES)
+    expression = match_expression(text)
+    columns = ["Source", "Row ID", "Match"] + [f.title() for f in FIELDS] + ["Score"]
+    if not expression:
+        return pd.DataFrame(columns=columns)
+    _ensure_current(tables)
+    marks = ", ".join("?" for _ in tables)
+    sql = (
+        f"SELECT source, key, snippet(docs, -1, '**', '**', ' … ', 12), {', '.join(FIELDS)}, "
+        f"bm25(docs, 0, 0, {', '.join(str(w) for w in WEIGHTS)}) AS score "
+        f"FROM docs WHERE docs MATCH ? AND source IN ({marks}) ORDER BY score LIMIT ?"
+    )
+    with _lock:
+        rows = _open().execute(sql, [expression] + tables + [limit]).fetchall()
+    df = pd.DataFrame(rows, columns=columns)
+    df["Score"] = -df["Score"]  # bm25 is lower-is-better
+    return df
+
+
+def close():
+    global _conn, _conn_path
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = _conn_path = None
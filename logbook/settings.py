@@ -0,0 +1,79 @@
+import json
+import os
+
+from logbook import alerts, cache, certificates, config, db, figures, locking, reports, search, snapshots
+
+# Saving and applying runtime settings (config.DEFAULT_SETTINGS) for the
+# Settings page. Saved settings take effect in this process straight away:
+# config is re-derived, and anything holding state built from the old values
+# is reset so it is rebuilt lazily.
+LIMITS = {
+    # setting -> (minimum, maximum)
+    "page_size": (10, 1000),
+    "table_cache_entries": (1, 256),
+    "certificate_cache_mb": (0, 1024),
+    "figure_cache_mb": (0, 1024),
+    "mirror_refresh_seconds": (5, 86400),
+    "alert_check_seconds": (60, 86400),
+    "report_workers": (1, max(os.cpu_count() or 1, 1)),
+    "password_iterations": (100000, 5000000),
+}
+BACKENDS = ["csv", "sqlite"]
+
+_applied_signature = cache.signature([config.SETTINGS_PATH])  # read by config on import
+
+
+def current():
+    return dict(config.SETTINGS)
+
+
+def validate(settings):
+    """Settings with numbers as ints; raises ValueError naming the bad setting."""
+    settings = dict(config.DEFAULT_SETTINGS, **settings)
+    if str(settings["backend"]).lower() not in BACKENDS:
+        raise ValueError(f"backend must be one of {', '.join(BACKENDS)}")
+    settings["backend"] = str(settings["backend"]).lower()
+    if not str(settings["data_dir"]).strip():
+        raise ValueError("data_dir can't be empty")
+    if not os.path.isdir(settings["data_dir"]):
+        raise ValueError(f"data_dir {settings['data_dir']} is not a folder")
+    for name, (low, high) in LIMITS.items():
+        value = int(settings[name])
+        if not low <= value <= high:
+            raise ValueError(f"{name} must be between {low} and {high}")
+        settings[name] = value
+    return settings
+
+
+def apply(settings):
+    """Make settings current in this process."""
+    global _applied_signature
+    old = current()
+    config.configure(settings)
+    _applied_signature = cache.signature([config.SETTINGS_PATH])
+    cache.invalidate()
+    snapshots.discard()
+    if old["data_dir"] != config.DATA_DIR or old["backend"] != config.BACKEND:
+        db.close()
+        search.close()
+        alerts.reload()
+    if old["report_workers"] != config.REPORT_WORKERS:
+        reports.shutdown()
+    if old["certificate_cache_mb"] != config.SETTINGS["certificate_cache_mb"]:
+        certificates.evict()
+    if old["figure_cache_mb"] != config.SETTINGS["figure_cache_mb"]:
+        figures.clear()
+
+
+def save(settings):
+    """Validate, write SETTINGS_PATH and apply; returns the saved settings."""
+    settings = validate(settings)
+    locking.write_text(config.SETTINGS_PATH, json.dumps(settings, indent=1, sort_keys=True))
+    apply(settings)
+    return settings
+
+
+def refresh():
+    """Re-apply the settings file if another process saved it since."""
+    if cache.signature([config.SETTINGS_PATH]) != _applied_signature:
+        apply(config.read_settings())
@@ -0,0 +1,143 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from logbook import config
+
+# Read-only copies of whole tables in Arrow IPC format in SNAPSHOT_DIR. Every
+# reader memory-maps the file, so the table's bytes live once in the OS page
+# cache however many sessions and worker processes are showing dashboards.
+#
+# Each version of a table gets its own file, <table>.<digest>.arrow, named
+# after the source signature it was built from, so a published file is never
+# replaced while readers have it mapped (Windows refuses to replace or delete
+# a mapped file). data.append() and data.apply_changes() publish a new
+# version of every table that has a snapshot as part of the write; a table
+# changed outside the app is rebuilt on its first read. Older versions are
+# removed once nothing maps them.
+#
+# Numeric and string columns are handed to pandas without copying (strings as
+# pyarrow-backed StringDtype), so the frames are for reading only.
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+_mapped = {}  # table -> (path, pyarrow.Table)
+_lock = threading.Lock()
+
+
+def available():
+    return pa is not None
+
+
+def _normal(source):
+    return json.loads(json.dumps(source))  # tuples -> lists, so equal signatures name one file
+
+
+def snapshot_path(table, source):
+    digest = hashlib.sha256(json.dumps(_normal(source)).encode()).hexdigest()[:16]
+    return os.path.join(config.SNAPSHOT_DIR, f"{table}.{digest}.arrow")
+
+
+def _versions(table):
+    return glob.glob(os.path.join(glob.escape(config.SNAPSHOT_DIR), f"{glob.escape(table)}.*.arrow"))
+
+
+def published(table):
+    """Whether the table has a snapshot, i.e. a dashboard has read it."""
+    return bool(_versions(table))
+
+
+def _arrow_table(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Numbers and text mixed in one column; store it as text
+        text = {c: df[c].astype("string") for c in df.columns if df[c].dtype == object}
+        return pa.Table.from_pandas(df.assign(**text), preserve_index=False)
+
+
+def _prune(table, keep):
+    for path in _versions(table):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # still mapped somewhere (Windows); removed by a later publish
+
+
+def publish(table, df, source):
+    """Write df as the snapshot of the given source version of the table."""
+    path = snapshot_path(table, source)
+    arrow = _arrow_table(df)
+    os.makedirs(config.SNAPSHOT_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=config.SNAPSHOT_DIR, prefix=f"{table}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        # Uncompressed, so readers can map the buffers as they are on disk
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, arrow.schema) as writer:
+            writer.write_table(arrow)
+        if os.path.exists(path):
+            os.remove(tmp_path)  # another process published this version first
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    with _lock:
+        if _mapped.get(table, (path,))[0] != path:
+            _mapped.pop(table)  # let go of the old version so it can be removed
+    _prune(table, keep=path)
+
+
+def _open(table, source):
+    """The mapped snapshot of the given source version, or None."""
+    path = snapshot_path(table, source)
+    with _lock:
+        entry = _mapped.get(table)
+        if entry is not None and entry[0] == path:
+            return entry[1]
+    try:
+        arrow = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    except FileNotFoundError:
+        return None
+    with _lock:
+        _mapped[table] = (path, arrow)
+    return arrow
+
+
+def _to_pandas(arrow):
+    strings = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return arrow.to_pandas(split_blocks=True, types_mapper=strings.get)
+
+
+def read(table, source, build, columns=None):
+    """The table as a read-only DataFrame over its memory-mapped snapshot.
+
+    source is the signature of the data the snapshot must have been built
+    from; when that version has no snapshot yet, build() is called for the
+    current rows and published first. columns limits the frame to those columns.
+    """
+    arrow = _open(table, source)
+    if arrow is None:
+        publish(table, build(), source)
+        arrow = _open(table, source)
+    if columns is not None:
+        arrow = arrow.select([c for c in columns if c in arrow.column_names])
+    return _to_pandas(arrow)
+
+
+def discard(table=None):
+    """Forget this process's mapping of one table's snapshot, or all of them."""
+    with _lock:
+        if table is None:
+            _mapped.clear()
+        else:
+            _mapped.pop(table, None)
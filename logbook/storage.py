@@ -0,0 +1,137 @@
+import csv
+import os
+from datetime import date, datetime
+
+import pandas as pd
+
+from logbook import locking, mirror
+
+# Excel tables can't be appended to in place, so new rows go to a CSV journal
+# next to the workbook and are folded back in once the journal is this long.
+COMPACT_EVERY = 50
+JOURNAL_SUFFIX = ".journal.csv"
+
+
+def is_excel(path):
+    return os.path.splitext(path)[1].lower() in (".xlsx", ".xls")
+
+
+def journal_path(path):
+    return path + JOURNAL_SUFFIX
+
+
+# --- Helpers ---
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (pd.Timestamp, datetime)):
+        if value != value:  # NaT
+            return ""
+        if value.hour == value.minute == value.second == value.microsecond == 0:
+            return value.date().isoformat()
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value != value:  # NaN
+        return ""
+    return value
+
+
+def read_header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
+
+def _needs_newline(path):
+    # Hand-edited files sometimes lack the final newline; check only the last byte.
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) not in (b"\n", b"\r")
+
+
+def _append_csv(path, rows, columns=None):
+    header = None
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        header = read_header(path)
+    write_header = not header
+    if write_header:
+        header = list(columns) if columns else list(rows[0].keys())
+    newline = not write_header and _needs_newline(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        if newline:
+            f.write("\n")
+        # Columns the file doesn't know about are dropped, same as selecting
+        # df[columns] before the old full rewrite.
+        writer = csv.DictWriter(f, fieldnames=header, extrasaction="ignore", lineterminator="\n")
+        if write_header:
+            writer.writeheader()
+        for row in rows:
+            writer.writerow({k: format_value(v) for k, v in row.items()})
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _journal_length(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+# --- Public API ---
+def append_rows(path, rows, columns=None):
+    """Append rows (dicts) to a table without reading or rewriting it.
+
+    CSV tables get the rows appended as lines. Excel tables get them written
+    to a journal that is compacted into the workbook every COMPACT_EVERY rows.
+    Runs under the table's write lock (see logbook/locking.py).
+    """
+    rows = [dict(r) for r in rows]
+    if not rows:
+        return
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with locking.lock(path):
+        if not is_excel(path):
+            _append_csv(path, rows, columns)
+            return
+        journal = journal_path(path)
+        _append_csv(journal, rows, columns)
+        if _journal_length(journal) >= COMPACT_EVERY:
+            compact(path)
+
+
+def read_table(path, columns=None, **kwargs):
+    """Read a CSV/Excel table, including any rows still in its journal.
+
+    Workbooks are read through their Parquet mirror (see logbook/mirror.py);
+    columns limits the read to those columns.
+    """
+    if not is_excel(path):
+        return pd.read_csv(path, usecols=columns, **kwargs)
+    journal = journal_path(path)
+    frames = []
+    if os.path.exists(path):
+        frames.append(mirror.read_workbook(path, columns=columns, **kwargs))
+    if os.path.exists(journal):
+        pending = pd.read_csv(journal)
+        frames.append(pending if columns is None else pending.reindex(columns=columns))
+    if not frames:
+        raise FileNotFoundError(path)
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def compact(path):
+    """Fold an Excel table's journal back into the workbook."""
+    journal = journal_path(path)
+    with locking.lock(path):
+        if not is_excel(path) or not os.path.exists(journal):
+            return
+        df = read_table(path)
+        with locking.replacing(path) as tmp_path:
+            df.to_excel(tmp_path, index=False)
+        os.remove(journal)
@@ -1,7 +1,7 @@
 # pages/attendance.py
 import streamlit as st
 import pandas as pd
-import os
+from logbook import attendance as attendance_store
 
 def show_attendance():
     st.title("Attendance Page")
@@ -10,20 +10,24 @@ def show_attendance():
     with st.form(key='attendance_form'):
         st.header("Attendance Entry")
         
+        team = st.selectbox("Team Name", sorted(attendance_store.members()["Team Name"].dropna().unique()))
         name = st.text_input("Name")
         attendance = st.selectbox("Attendance", ["Present", "Absent"])
         date = st.date_input("Date", pd.to_datetime("today"))
 
         submit_button = st.form_submit_button("Submit Attendance")
         if submit_button:
-            st.success(f"Attendance submitted for {name}")
-            # Save to DataFrame or file
-            attendance_data = pd.DataFrame([[name, attendance, date]], columns=["Name", "Attendance", "Date"])
-            file_path = "attendance_data.xlsx"
-            if os.path.exists(file_path):
-                existing_data = pd.read_excel(file_path)
-                attendance_data = pd.concat([existing_data, attendance_data], ignore_index=True)
-            attendance_data.to_excel(file_path, index=False)
+            if name.strip():
+                # Recorded in the per-member attendance log shared with the Attendance page;
+                # a name the member table doesn't have yet is added to the team first
+                attendance_store.member_ids(team, [name.strip()])
+                rows = attendance_store.mark(date, team, {name.strip(): attendance == "Present"})
+                if rows:
+                    st.success(f"Attendance submitted for {name.strip()}")
+                else:
+                    st.error(f"Attendance for {name.strip()} was not saved")
+            else:
+                st.error("Please enter a name")
     
     # Download option
     st.subheader("Download Attendance Format")
@@ -35,6 +39,8 @@ def show_attendance():
     if uploaded_file:
         data = pd.read_excel(uploaded_file)
         st.write(data)
+        if st.button("Import into attendance log"):
+            st.success(f"Imported {attendance_store.import_wide(data, team)} attendance marks")
 
 # Run the function in main
 if __name__ == "__main__":
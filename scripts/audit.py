@@ -1,7 +1,7 @@
 # pages/audit.py
 import streamlit as st
 import pandas as pd
-import os
+from logbook import storage
 
 def show_audit():
     st.title("Audit Page")
@@ -27,10 +27,7 @@ def show_audit():
             audit_data = pd.DataFrame([[point, audit_type, responsibilities, status, audit_date, severity, target_date, department, area]],
                                       columns=["Point of Discussion", "Audit Type", "Responsibilities", "Status", "Audit Date", "Severity", "Target Date", "Department", "Area"])
             file_path = "audit_data.xlsx"
-            if os.path.exists(file_path):
-                existing_data = pd.read_excel(file_path)
-                audit_data = pd.concat([existing_data, audit_data], ignore_index=True)
-            audit_data.to_excel(file_path, index=False)
+            storage.append_rows(file_path, audit_data.to_dict("records"), columns=list(audit_data.columns))
     
     # Download option
     st.subheader("Download Audit Format")
@@ -1,7 +1,7 @@
 # pages/mom.py
 import streamlit as st
 import pandas as pd
-import os
+from logbook import storage
 
 def show_mom():
     st.title("MOM (Minutes of Meeting) Page")
@@ -24,10 +24,7 @@ def show_mom():
             mom_data = pd.DataFrame([[point, responsibilities, status, mom_date, severity, target_date]],
                                     columns=["Point of Discussion", "Responsibilities", "Status", "MOM Date", "Severity", "Target Date"])
             file_path = "mom_data.xlsx"
-            if os.path.exists(file_path):
-                existing_data = pd.read_excel(file_path)
-                mom_data = pd.concat([existing_data, mom_data], ignore_index=True)
-            mom_data.to_excel(file_path, index=False)
+            storage.append_rows(file_path, mom_data.to_dict("records"), columns=list(mom_data.columns))
     
     # Download option
     st.subheader("Download MOM Format")
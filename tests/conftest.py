@@ -0,0 +1,12 @@
+import pytest
+
+from logbook import config, settings
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Point the logbook at an empty data folder for one test."""
+    previous = settings.current()
+    settings.apply(dict(config.DEFAULT_SETTINGS, data_dir=str(tmp_path), backend="csv"))
+    yield tmp_path
+    settings.apply(previous)
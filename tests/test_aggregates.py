@@ -0,0 +1,23 @@
+from logbook import aggregates, attendance, data
+
+
+def test_present_counts_follow_member_renames(data_dir):
+    attendance.mark("2025-05-02", "Team A", dict.fromkeys(attendance.member_ids("Team A", ["Ravi", "Meena"]), True))
+    assert aggregates.teams("attendance") == ["Team A"]
+    assert aggregates.financial_years("attendance") == ["2025-2026"]
+    assert sorted(aggregates.present_counts("Team A", "2025-2026")["Member Name"]) == ["Meena", "Ravi"]
+
+    ravi = attendance.member_ids("Team A", ["Ravi"])["Ravi"]
+    data.apply_changes("members", edited={ravi: {"Name": "Ravi Kumar", "Team Name": "Team B"}})
+    assert aggregates.present_counts("Team A", "2025-2026")["Member Name"].tolist() == ["Meena"]
+    assert aggregates.present_counts("Team B", "2025-2026")["Member Name"].tolist() == ["Ravi Kumar"]
+
+
+def test_incremental_counts_match_rebuild_after_a_move(data_dir):
+    meeting = {"Team Name": "Team A", "Responsibility": "Ravi", "Severity (High/Low)": "High", "Status (Done/Pending)": "Pending"}
+    first, second = data.append("meetings", [dict(meeting, **{"Target date": "2025-05-02"}), dict(meeting, **{"Target date": "2024-05-02"})])
+    data.append("meetings", [dict(meeting, **{"Team Name": "Team B", "Target date": "2025-06-02"})])
+    data.apply_changes("meetings", edited={second["Row ID"]: {"Team Name": "Team B", "Status (Done/Pending)": "Done"}}, deleted=[first["Row ID"]])
+    incremental = aggregates.counts("meetings")
+    assert "Team A" not in incremental["team_fy"] and "Team A" not in incremental["responsibility"]
+    assert incremental == aggregates.rebuild("meetings")
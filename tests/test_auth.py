@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from logbook import auth, config, db, mirror, storage
+
+
+@pytest.fixture
+def users(data_dir, monkeypatch):
+    monkeypatch.setattr(config, "PASSWORD_ITERATIONS", 1000)
+    # Users_Table.xlsx gives every user the same User_ID and no email
+    pd.DataFrame(
+        {
+            "User_ID": [1, 1, 1],
+            "Name": ["Asha Rao", "Vikram Das", "Vikram Das"],
+            "Role": ["Admin", "User", "User"],
+            "Email": [None, None, None],
+            "Password": ["alpha", "beta", "gamma"],
+            "Is_Active": [None, None, None],
+        }
+    ).to_excel(data_dir / auth.USERS_FILE, index=False)
+    return data_dir
+
+
+def test_shared_user_ids_fall_back_to_names(users):
+    assert auth.seed() == 2  # the repeated name is skipped
+    assert auth.find("asha rao") == "Asha Rao"
+    session = {}
+    assert auth.login(session, "Asha Rao", "alpha")["role"] == "Admin"
+    assert auth.allowed(session, "Admin")
+    assert not auth.allowed({}, "Admin")
+
+
+def test_pages_stay_open_without_an_admin(users, monkeypatch):
+    auth.seed()
+    auth._update(lambda stored: stored["Asha Rao"].update(active=False))
+    assert auth.allowed({}, "Admin")
+    assert not auth.allowed({})  # signing in is still needed for pages open to any user
+
+
+def test_copies_of_the_workbook_hold_no_plaintext_passwords(users):
+    workbook = str(users / auth.USERS_FILE)
+    assert storage.read_table(workbook)["Password"].tolist() == ["alpha", "beta", "gamma"]
+    assert "Password" not in pd.read_parquet(mirror.mirror_path(workbook)).columns
+    assert storage.read_table(workbook, columns=["Name"])["Name"].tolist() == ["Asha Rao", "Vikram Das", "Vikram Das"]
+    assert storage.read_table(workbook)["Password"].tolist() == ["alpha", "beta", "gamma"]
+
+    with db.connection() as conn:
+        stored = [row[0] for row in conn.execute('SELECT "Password" FROM users_table ORDER BY id')]
+    assert all(auth.is_hashed(h) and auth.verify_password(p, h) for p, h in zip(["alpha", "beta", "gamma"], stored))
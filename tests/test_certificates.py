@@ -0,0 +1,17 @@
+import io
+import os
+
+from logbook import certificates, config, data
+
+
+def test_blob_is_deleted_with_its_last_record(data_dir, monkeypatch):
+    monkeypatch.setattr(config, "CERTIFICATE_BLOB_DIR", str(data_dir / "blobs"))
+    monkeypatch.setattr(config, "CERTIFICATE_INDEX_PATH", str(data_dir / "blobs" / "index.json"))
+    sha, path, _ = certificates.store(io.BytesIO(b"%PDF-1.4 certificate"))
+    row = {"Name": "Asha", "Certificate File Name": "asha.pdf", "Certificate SHA256": sha}
+    first, second = data.append("training", [row, dict(row, Name="Ravi")])
+
+    data.apply_changes("training", deleted=[first["SN"]])
+    assert os.path.exists(path)
+    data.apply_changes("training", deleted=[second["SN"]])
+    assert not os.path.exists(path)
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from logbook import cache, config, data, storage
+
+
+def test_append_assigns_unused_keys(data_dir):
+    data.append("training", [{"SN": 1, "Name": "Asha"}, {"SN": 5, "Name": "Ravi"}])
+    data.apply_changes("training", deleted=[1])
+    written = data.append("training", [{"Name": "Meena"}, {"Name": "Vikram"}])
+    assert [row["SN"] for row in written] == [6, 7]
+    assert data.load("training")["SN"].tolist() == [5, 6, 7]
+
+
+def test_append_sees_keys_written_by_another_process(data_dir):
+    data.append("meetings", [{"Team Name": "Team A", "Point of discussion": "First"}])
+    # Another process appends directly; the remembered largest key is stale
+    storage.append_rows(config.table_path("meetings"), [{"Row ID": 7, "Team Name": "Team A", "Point of discussion": "Elsewhere"}], columns=config.table_columns("meetings"))
+    written = data.append("meetings", [{"Team Name": "Team A", "Point of discussion": "Next"}])
+    assert written[0]["Row ID"] == 8
+
+
+def test_load_parses_only_the_requested_columns(data_dir, monkeypatch):
+    data.append("meetings", [{"Team Name": "Team A", "Point of discussion": "First", "Target date": "2025-05-02"}])
+    cache.invalidate()
+    reads, original = [], storage.read_table
+
+    def read_table(path, columns=None):
+        reads.append(columns)
+        return original(path, columns=columns)
+
+    monkeypatch.setattr(storage, "read_table", read_table)
+    df = data.load("meetings", filters={"Team Name": "Team A"}, columns=["Row ID", "Target date"])
+    assert reads == [["Row ID", "Target date", "Team Name"]]
+    assert df.columns.tolist() == ["Row ID", "Target date"]
+    assert df["Target date"].tolist() == [pd.Timestamp("2025-05-02")]
+    assert not cache.cached(config.table_path("meetings"))
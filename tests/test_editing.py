@@ -0,0 +1,28 @@
+import pandas as pd
+
+from logbook import editing
+
+
+def test_edits_map_to_the_rows_shown_when_they_began():
+    session = {}
+    key = editing.editor_key(session, "editor", {"Team Name": "A"}, 1)
+    first = pd.DataFrame({"Row ID": [10, 11, 12]})
+    assert editing.shown_keys(session, key, first, "Row ID") == [10, 11, 12]
+
+    # The user edits row 1 and deletes row 2; another session then adds a row
+    session[key] = {"edited_rows": {1: {"Status (Done/Pending)": "Done"}}, "deleted_rows": [2], "added_rows": []}
+    reloaded = pd.DataFrame({"Row ID": [9, 10, 11, 12]})
+    keys = editing.shown_keys(session, key, reloaded, "Row ID")
+    changes = editing.change_set(keys, session[key], "Row ID")
+    assert changes["edited"] == {11: {"Status (Done/Pending)": "Done"}}
+    assert changes["deleted"] == [12]
+
+    editing.saved(session, "editor", key)
+    fresh = editing.editor_key(session, "editor", {"Team Name": "A"}, 1)
+    assert fresh != key
+    assert editing.shown_keys(session, fresh, reloaded, "Row ID") == [9, 10, 11, 12]
+
+
+def test_editor_key_follows_the_filters():
+    session = {}
+    assert editing.editor_key(session, "editor", {"Team Name": "A"}, 1) != editing.editor_key(session, "editor", {"Team Name": "B"}, 1)
@@ -0,0 +1,19 @@
+import os
+import pkgutil
+import subprocess
+import sys
+
+import pytest
+
+import logbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(logbook.__file__)))
+MODULES = sorted(m.name for m in pkgutil.iter_modules(logbook.__path__))
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_imports_on_its_own(module):
+    # A fresh interpreter per module, so an import cycle can't hide behind
+    # modules an earlier test already loaded
+    result = subprocess.run([sys.executable, "-c", f"import logbook.{module}"], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
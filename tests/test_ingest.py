@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from logbook import attendance, data, ingest
+
+TABLES = ["meetings", "attendance", "equipment", "members"]
+
+
+def _workbook(path, ravi_status="Present"):
+    book = Workbook()
+    mom = book.active
+    mom.title = "MoM"
+    mom.append(["MoM"])
+    mom.append(["SN", "Point of discussion", "Severity(High/Low)", "Responsibility", "Target date", "Status(Done/ Pending)", "Remarks"])
+    mom.append([1, "Replace gas detector", "High", "Ravi", datetime(2025, 5, 2), "pending", None])
+    mom.append([2, "Update permit register", "Low", "Meena", datetime(2025, 6, 1), "Done", "Checked"])
+    present = book.create_sheet("Attendance")
+    present.append(["Attendance of Task force members"])
+    present.append(["Date", datetime(2025, 5, 2)])
+    present.append(["SN", "Name of the Member", "Status(Present/Absent)"])
+    present.append([1, "Ravi", ravi_status])
+    present.append([2, "Meena", "Absent"])
+    equipment = book.create_sheet("Equipment")
+    equipment.append(["Details of gas testing equipment"])
+    equipment.append(["SN", "Equipment name", "Test date", "Due date"])
+    equipment.append([101, "Gas monitor", datetime(2025, 1, 10), datetime(2026, 1, 10)])
+    notes = book.create_sheet("Notes")
+    notes.append(["Not a form"])
+    book.save(path)
+    return str(path)
+
+
+def _counts(summaries):
+    return {s["table"]: (s["added"], s["updated"]) for s in summaries}
+
+
+def test_second_import_changes_nothing(data_dir):
+    path = _workbook(data_dir / "plant.xlsx")
+    first = ingest.ingest(path, team="Team A", workers=1)
+    assert _counts(first) == {"meetings": (2, 0), "attendance": (2, 0), "equipment": (1, 0)}
+    tables = {table: data.load(table) for table in TABLES}
+
+    assert _counts(ingest.ingest(path, team="Team A", workers=1)) == {"meetings": (0, 0), "attendance": (0, 0), "equipment": (0, 0)}
+    for table, before in tables.items():
+        assert data.load(table).equals(before), table
+
+    # A member's day that is already recorded is left as is
+    _workbook(path, ravi_status="Absent")
+    assert _counts(ingest.ingest(path, team="Team A", workers=1))["attendance"] == (0, 0)
+    log = attendance.load_long()
+    assert dict(zip(log["Name"], log["Status"])) == {"Ravi": "Present", "Meena": "Absent"}
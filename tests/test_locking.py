@@ -0,0 +1,51 @@
+import csv
+import multiprocessing
+import os
+import random
+import stat
+
+from logbook import locking, storage
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_replacing_keeps_the_file_mode(tmp_path):
+    path = tmp_path / "table.csv"
+    locking.write_text(path, "a\n")
+    assert _mode(path) == 0o666 & ~locking._UMASK
+    os.chmod(path, 0o640)
+    locking.write_text(path, "b\n")
+    assert _mode(path) == 0o640
+
+
+# Each worker process appends rows to a CSV through storage.append_rows() and
+# increments a counter file with a locked read-modify-write. Lost updates or
+# torn lines show up as a wrong count.
+def _stress_worker(folder, worker, rounds):
+    table = os.path.join(folder, "rows.csv")
+    counter = os.path.join(folder, "counter.txt")
+    for i in range(rounds):
+        storage.append_rows(table, [{"worker": worker, "seq": i, "payload": "x" * random.randint(0, 200)}], columns=["worker", "seq", "payload"])
+        with locking.lock(counter):
+            try:
+                with open(counter, encoding="utf-8") as f:
+                    value = int(f.read() or 0)
+            except FileNotFoundError:
+                value = 0
+            locking.write_text(counter, str(value + 1))
+
+
+def test_concurrent_writers_lose_nothing(tmp_path):
+    workers, rounds = 6, 50
+    procs = [multiprocessing.Process(target=_stress_worker, args=(str(tmp_path), w, rounds)) for w in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+    with open(tmp_path / "rows.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len({(r["worker"], r["seq"]) for r in rows}) == workers * rounds
+    assert (tmp_path / "counter.txt").read_text(encoding="utf-8") == str(workers * rounds)
@@ -0,0 +1,17 @@
+from logbook import data, search
+
+
+def test_append_indexes_points(data_dir):
+    data.append("audit", [{"Audit Level": "L1", "Point": "Gas leak near pump", "Area": "Unit 2", "Target date": "2025-06-01"}])
+    data.append("meetings", [{"Team Name": "Team A", "Point of discussion": "Scaffolding check", "Target date": "2025-06-01"}])
+
+    hits = search.search("lea")
+    assert hits["Source"].tolist() == ["audit"]
+    assert "**leak**" in hits["Match"].iat[0]
+    assert search.search("scaff")["Source"].tolist() == ["meetings"]
+
+
+def test_deleted_rows_leave_the_index(data_dir):
+    data.append("meetings", [{"Team Name": "Team A", "Point of discussion": "Scaffolding check", "Target date": "2025-06-01"}])
+    data.apply_changes("meetings", deleted=[1])
+    assert search.search("scaffolding").empty
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from logbook import data, snapshots
+
+
+def test_view_reads_appended_rows(data_dir):
+    data.append("equipment", [{"SN": 1, "Equipment name": "Gas monitor", "Due date": "2025-07-01"}])
+    df = data.view("equipment", columns=["SN", "Due date"])
+    assert df["SN"].tolist() == [1]
+    assert df["Due date"].tolist() == [pd.Timestamp("2025-07-01")]
+
+
+def test_writes_publish_a_new_snapshot_version(data_dir):
+    data.append("equipment", [{"SN": 1, "Equipment name": "Gas monitor", "Due date": "2025-07-01"}])
+    first = data.view("equipment", columns=["SN"])
+    data.append("equipment", [{"SN": 2, "Equipment name": "Harness", "Due date": "2025-08-01"}])
+    assert snapshots._versions("equipment") == [snapshots.snapshot_path("equipment", data.source_signature("equipment"))]
+    assert first["SN"].tolist() == [1]  # frames already handed out keep their version
+    assert data.view("equipment", columns=["SN"])["SN"].tolist() == [1, 2]